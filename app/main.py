@@ -1,13 +1,42 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
-from app.routers import login_router, repositories_router, user_router, teams_router
+from app.routers import login_router, repositories_router, user_router, teams_router, diagnostics_router, webhooks_router
+from app.services.event_poller import event_poller
+from app.services.github_async import async_github
+from app.services.http_pool import http_pool
+from app.services.metadata_store import metadata_store
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.snapshot_refresher import snapshot_refresher
 from starlette.middleware.sessions import SessionMiddleware
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abrir el almacen local con la ruta configurada en METADATA_DB_PATH
+    metadata_store.open()
+    # Precalcular en segundo plano las estadisticas que sirven los routers
+    snapshot_refresher.start()
+    # Guardar en el registro local los eventos nuevos de los repositorios
+    event_poller.start()
+    yield
+    await event_poller.stop()
+    await snapshot_refresher.stop()
+    # Cerrar las conexiones del cliente asincrono de GitHub
+    await async_github.aclose()
+    await http_pool.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    # El limite de GitHub se informa como 429 con el tiempo que falta para reintentar
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(math.ceil(exc.wait))})
 
 # Cargar la clave secreta desde el archivo .env
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -25,6 +54,10 @@ app.include_router(repositories_router.repository_router, tags=["Repositorio"])
 app.include_router(user_router.user_router, tags=["Usuario"])
 # Incluir el router de equipos:
 app.include_router(teams_router.teams_router, tags=["Teams"])
+# Incluir el router de diagnostico:
+app.include_router(diagnostics_router.diagnostics_router, tags=["Diagnóstico"])
+# Incluir el router de webhooks:
+app.include_router(webhooks_router.webhooks_router, tags=["Webhooks"])
 
 templates = Jinja2Templates(directory="./view")
 
@@ -41,3 +41,18 @@ class RepositoryStats(BaseModel):
     issues: Optional[int]
     branches: Optional[int]
     percentagesLanguages: Optional[List[str]]
+
+# CLASE INTERNA CON LOS DATOS DE UN REPOSITORIO RECOLECTADOS EN UNA SOLA PASADA:
+class RepositorySnapshot(BaseModel):
+    name: str
+    owner: str
+    createDate: Optional[datetime]
+    lastUseDate: Optional[datetime]
+    state: str
+    prsOpen: int
+    prsClosed: int
+    prsDependabot: int
+    issues: int
+    collaborators: List[str]
+    languages: Dict[str, int]
+    branches: Optional[int] = None
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Dict, List, Optional
 from pydantic import BaseModel
+from app.models.repository_model import RepositoriesStats
 
 
 class Member(BaseModel):
@@ -12,7 +13,21 @@ class Team(BaseModel):
     name: str
     members_count: int
     members: List[Member]
+    slug: Optional[str] = None
  
 class TeamsResponse(BaseModel):
     total_teams: int
-    teams: list[Team]
\ No newline at end of file
+    teams: list[Team]
+
+class UserTeamsResponse(BaseModel):
+    login: str
+    total_teams: int
+    teams: List[Team]
+
+class TeamStats(RepositoriesStats):
+    team: str
+    slug: str
+    members_count: int
+    window_days: int
+    actions_per_day: int
+    actions_by_day: Dict[str, int]
@@ -7,11 +7,14 @@ class UserStats(BaseModel):
     repos_count: int
     languages: Dict[str, str]
     actions_per_day: int
+    actions_by_day: Dict[str, int] = {}
 
 class UsersStats(BaseModel):
     users_statistics: Dict[str, UserStats]
+    window_days: int = 1
 
 class Event(BaseModel):
+    id: Optional[str] = None
     type: str
     repo: str
     date: str
@@ -0,0 +1,80 @@
+from fastapi import APIRouter
+from app.services.http_cache import http_cache
+from app.services.http_pool import http_pool
+from app.services.metadata_store import metadata_store
+from app.services.rate_limiter import rate_limiter
+from app.services.session_cache import session_user_cache
+from app.services.single_flight import single_flight
+from app.services.snapshot_refresher import snapshot_refresher
+from app.services.team_graph import team_graph
+from app.services.token_pool import token_pool
+
+diagnostics_router = APIRouter()
+
+@diagnostics_router.get("/diagnostics/cache")
+def get_cache_statistics():
+    """
+    Obtiene los contadores de la cache HTTP de GitHub.
+    Returns: dict: Entradas guardadas, aciertos (respuestas 304), fallos y descartes.
+    """
+    return http_cache.stats()
+
+@diagnostics_router.get("/diagnostics/connections")
+def get_connection_statistics():
+    """
+    Obtiene el estado de las conexiones keep-alive compartidas hacia GitHub.
+    Returns: dict: Tamano de los pools, si se usa HTTP/2 y, por host, conexiones creadas, peticiones y conexiones libres.
+    """
+    return http_pool.stats()
+
+@diagnostics_router.get("/diagnostics/store")
+def get_store_statistics():
+    """
+    Obtiene el estado del almacen local de metadatos.
+    Returns: dict: Filas guardadas de repositorios y equipos y la antiguedad de la mas vieja.
+    """
+    return metadata_store.stats()
+
+@diagnostics_router.get("/diagnostics/snapshots")
+def get_snapshot_statistics():
+    """
+    Obtiene el estado de los snapshots calculados en segundo plano.
+    Returns: dict: El intervalo de actualizacion y la antiguedad en segundos de cada snapshot.
+    """
+    return snapshot_refresher.stats()
+
+@diagnostics_router.get("/diagnostics/teams")
+def get_team_graph_statistics():
+    """
+    Obtiene el estado del grafo en memoria de equipos y miembros.
+    Returns: dict: La vigencia en segundos, equipos y miembros cargados, su antiguedad, aciertos y fallos.
+    """
+    return team_graph.stats()
+
+@diagnostics_router.get("/diagnostics/sessions")
+def get_session_statistics():
+    """
+    Obtiene el estado de la cache de usuarios autenticados por sesion.
+    Returns: dict: La vigencia en segundos, las sesiones guardadas, aciertos y fallos.
+    """
+    return session_user_cache.stats()
+
+@diagnostics_router.get("/diagnostics/single-flight")
+def get_single_flight_statistics():
+    """
+    Obtiene cuantas peticiones identicas se juntaron en un mismo calculo.
+    Returns: dict: Calculos en vuelo y, por endpoint, calculos ejecutados y peticiones que esperaron uno ya en curso.
+    """
+    return single_flight.stats()
+
+@diagnostics_router.get("/diagnostics/rate-limit")
+def get_rate_limit_statistics():
+    """
+    Obtiene el presupuesto del limite de peticiones de GitHub y el estado de cada token del pool.
+    Returns: dict: Por token, limite, peticiones restantes, segundos para el reset, tiempo
+    bloqueado y, para los tokens del pool, si esta sano y cuantas peticiones ha enviado.
+    """
+    budgets = rate_limiter.stats()
+    for key, health in token_pool.stats().items():
+        budgets[key] = {**budgets.get(key, {}), **health}
+    return budgets
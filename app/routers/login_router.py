@@ -4,6 +4,9 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from authlib.integrations.starlette_client import OAuth
 from github import Github
 from starlette.templating import Jinja2Templates
+from app.services.github_async import GITHUB_PAGE_SIZE
+from app.services.rate_limiter import raise_if_rate_limited
+from app.services.session_cache import session_user_cache
 import os
 
 logging_router = APIRouter()
@@ -25,11 +28,20 @@ def get_current_user(request: Request):
     if not token:
         raise HTTPException(status_code=401, detail="No authenticated")
     
+    # El cliente y el usuario de la sesion se reutilizan mientras no venzan o se cierre la sesion
+    session_user = session_user_cache.get(token)
+    if session_user is not None:
+        return session_user.user
+
     try:
-        github = Github(token)
+        # Paginas del tamano que espera iterate_pages y sin pausa fija entre peticiones:
+        # el rate_limiter ya espacia las del cliente de la sesion
+        github = Github(token, per_page=GITHUB_PAGE_SIZE, seconds_between_requests=None)
         user = github.get_user()
+        session_user_cache.store(token, github, user)
         return user
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener el usuario: {e}")
 
 @logging_router.get("/", response_class=HTMLResponse)
@@ -53,6 +65,7 @@ async def login(request: Request, redirect_to: str = "/inicio"):
 @logging_router.get("/relogin")
 async def relogin(request: Request, redirect_to: str = "/inicio"):
     logging.info("Ruta /relogin llamada")
+    session_user_cache.invalidate(request.session.get('user'))
     request.session.clear()
     redirect_uri = request.url_for('auth')
     request.session['redirect_to'] = redirect_to
@@ -71,6 +84,7 @@ async def auth(request: Request):
 @logging_router.get("/logout")
 async def logout(request: Request):
     logging.info("Ruta /logout llamada")
+    session_user_cache.invalidate(request.session.get('user'))
     request.session.clear()
     response = RedirectResponse(url='/logout_redirect')
     response.delete_cookie('session')
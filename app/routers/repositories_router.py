@@ -1,38 +1,139 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
-from app.services.repository_service import RepositoryService
+import base64
+import json
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.repository_service import (
+    COMMIT_FIELDS,
+    FAST_REPOSITORIES_APPROXIMATE,
+    FAST_STATISTICS_APPROXIMATE,
+    FAST_STATISTICS_OMITTED,
+    RepositoryService
+)
+from app.services.single_flight import single_flight
+from app.services.rate_limiter import raise_if_rate_limited
+from app.services.snapshot_refresher import snapshot_refresher
 from app.models.repository_model import Repository, RepositoriesStats, RepositoryStats, Repositories
 
 repository_router = APIRouter()
 repository_service = RepositoryService()
+snapshot_refresher.register("repositories_statistics", lambda: repository_service.get_statistics_of_repositories_async())
+
+# Repositorios por pagina cuando se pide un cursor sin limite.
+DEFAULT_PAGE_LIMIT = 100
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"]
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError(offset)
+        return offset
+    except Exception:
+        raise HTTPException(status_code=400, detail="El cursor no es valido")
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(Repositories.model_fields)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in Repositories.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(unknown)}")
+    return requested
 
 @repository_router.get("/repositories", response_model=List[Repositories])
-def get_repositories():
+async def get_repositories(request: Request, response: Response, fast: bool = False,
+                           fields: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=1000),
+                           cursor: Optional[str] = None):
     '''
     Obtiene todos los repositorios.
+    Con la cabecera "Accept: application/x-ndjson" la respuesta es un repositorio por linea,
+    enviado apenas esta listo.
+
+    Args:
+        "fast": Si es True el estado y la fecha de ultimo uso salen solo del listado; los campos
+        aproximados se indican en la cabecera X-Approximate-Fields.
+        "fields": Los campos que se quieren separados por comas (por ejemplo "name,owner");
+        lastUseDate y state solo se calculan si se piden.
+        "limit": El numero maximo de repositorios; la siguiente pagina se pide con el cursor
+        de la cabecera X-Next-Cursor (tambien en la cabecera Link rel="next").
+        "cursor": El cursor de la pagina que se quiere.
             
     Returns:
         List: Retornara una lista de repositorios y a su vez cada repositorio
         mostrara una lista con sus detalles.
     '''
     try:
-        repositories = repository_service.get_repositories()
+        selected_fields = parse_fields(fields)
+        # Sin campos del ultimo commit, el listado alcanza para armar la respuesta
+        listing_only = fast or not COMMIT_FIELDS.intersection(selected_fields)
+        headers = {"X-Approximate-Fields": ",".join(FAST_REPOSITORIES_APPROXIMATE)} if fast else {}
+
+        if "application/x-ndjson" in request.headers.get("accept", ""):
+            return StreamingResponse(stream_repositories(listing_only, selected_fields), media_type="application/x-ndjson", headers=headers)
+
+        if fields or limit or cursor:
+            offset = decode_cursor(cursor) if cursor else 0
+            repositories, next_offset = await single_flight.run(
+                single_flight.key("repositories_page", tuple(selected_fields), limit or DEFAULT_PAGE_LIMIT, offset, fast),
+                lambda: repository_service.get_repositories_page_async(selected_fields, limit or DEFAULT_PAGE_LIMIT, offset, fast)
+            )
+            if next_offset is not None:
+                next_cursor = encode_cursor(next_offset)
+                headers["X-Next-Cursor"] = next_cursor
+                headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+            return JSONResponse(jsonable_encoder(repositories), headers=headers)
+
+        response.headers.update(headers)
+        if fast:
+            return await single_flight.run(single_flight.key("repositories_fast"), lambda: repository_service.get_repositories_fast_async())
+        repositories = await single_flight.run(single_flight.key("repositories"), lambda: repository_service.get_repositories_async())
         return repositories
+    except HTTPException as e:
+        raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener repositorios: {str(e)}")
 
+async def stream_repositories(fast: bool, fields: List[str]):
+    '''
+    Convierte los repositorios a lineas NDJSON con los campos pedidos. Si algo falla a mitad del
+    envio ya no se puede cambiar el codigo de estado, por eso el error se envia como la ultima linea.
+    '''
+    try:
+        async for repository in repository_service.stream_repositories_async(fast):
+            yield repository.model_dump_json(include=set(fields)) + "\n"
+    except Exception as e:
+        print(f"Error al enviar los repositorios: {e}")
+        yield json.dumps({"error": f"Error al obtener repositorios: {str(e)}"}) + "\n"
+
 @repository_router.get("/repositories/statistics", response_model=RepositoriesStats)
-def get_statistics_of_repositories():
+async def get_statistics_of_repositories(response: Response, fast: bool = False):
     '''
     Obtiene las estadisticas o conteos totales de todos los repositorios.
+    Se responden desde el ultimo snapshot calculado en segundo plano; su antiguedad
+    va en las cabeceras X-Snapshot-Age y X-Snapshot-Built-At.
+
+    Args:
+        "fast": Si es True los conteos salen solo del listado; los campos aproximados van en
+        X-Approximate-Fields y los que quedan vacios en X-Omitted-Fields.
 
     Returns:
         RepositoriesStats: Un modelo que contiene los conteos de los detalles de un repositorio.
     '''
     try:
-        repository_statics = repository_service.get_statistics_of_repositories()
-        return repository_statics
+        if fast:
+            response.headers["X-Approximate-Fields"] = ",".join(FAST_STATISTICS_APPROXIMATE)
+            response.headers["X-Omitted-Fields"] = ",".join(FAST_STATISTICS_OMITTED)
+            return await single_flight.run(single_flight.key("repositories_statistics_fast"), lambda: repository_service.get_statistics_fast_async())
+        snapshot = await snapshot_refresher.get_or_refresh("repositories_statistics")
+        response.headers.update(snapshot.headers())
+        return snapshot.value
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas de los repositorios: {str(e)}")
 
 @repository_router.get("/repository/{repo_name}", response_model=Repository)
@@ -47,13 +148,16 @@ def get_repository_detail(repo_name: str):
         Repository: Un modelo que contiene los atributos del repositorio.
     '''
     try:
-        repository_detail = repository_service.get_repository_detail(repo_name)
+        repository_detail = single_flight.run_sync(single_flight.key("repository", repo_name), lambda: repository_service.get_repository_detail(repo_name))
         return repository_detail
+    except HTTPException as e:
+        raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener detalles del repositorio: {str(e)}")
 
 @repository_router.get("/repository/{repo_name}/statistics", response_model=RepositoryStats)
-def get_statistics_by_detail(repo_name: str):
+async def get_statistics_by_detail(repo_name: str):
     '''
     Muestra las estadisticas o conteos de los detalles del repositorio.
 
@@ -65,7 +169,13 @@ def get_statistics_by_detail(repo_name: str):
         RepositoryStats: Un modelo que contiene los atributos del repositorio.
     '''
     try:
-        statistics_by_detail = repository_service.get_statistics_by_detail(repo_name)
+        statistics_by_detail = await single_flight.run(
+            single_flight.key("repository_statistics", repo_name),
+            lambda: repository_service.get_statistics_by_detail_async(repo_name)
+        )
         return statistics_by_detail
+    except HTTPException as e:
+        raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas detalladas del repositorio: {str(e)}")
@@ -1,22 +1,64 @@
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.services.teams_service import TeamsService, teams_service
-from app.models.teams_model import TeamsResponse
+from app.services.rate_limiter import raise_if_rate_limited
+from app.services.single_flight import single_flight
+from app.services.snapshot_refresher import snapshot_refresher
+from app.models.teams_model import TeamsResponse, TeamStats, UserTeamsResponse
 
 teams_router = APIRouter()
+snapshot_refresher.register("teams", lambda: teams_service.get_teams_async())
 
 @teams_router.get("/orgs/teams", response_model=TeamsResponse)
-def get_teams():
+async def get_teams(response: Response):
     """
-    Obtiene todos los equipos de una organización en GitHub.
+    Obtiene todos los equipos de una organización en GitHub desde el ultimo snapshot.
     Args:
         org_name (str): El nombre de la organización.
     Returns:
         TeamsResponse: Una respuesta con la lista de equipos y sus detalles.
     """
     try:
-        return teams_service.get_teams()
+        snapshot = await snapshot_refresher.get_or_refresh("teams")
+        response.headers.update(snapshot.headers())
+        return snapshot.value
     except HTTPException as e:
         raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener los equipos: {str(e)}")
+
+@teams_router.get("/orgs/members/{login}/teams", response_model=UserTeamsResponse)
+async def get_user_teams(login: str):
+    """
+    Obtiene los equipos de la organización a los que pertenece un usuario.
+    Args:
+        login (str): El login del usuario.
+    Returns:
+        UserTeamsResponse: El usuario y la lista de sus equipos.
+    """
+    try:
+        return await teams_service.get_user_teams_async(login)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise_if_rate_limited(e)
+        raise HTTPException(status_code=500, detail=f"Error al obtener los equipos del usuario: {str(e)}")
+
+@teams_router.get("/orgs/teams/{team}/statistics", response_model=TeamStats)
+async def get_team_statistics(team: str, days: int = Query(1, ge=1, le=90)):
+    """
+    Obtiene las estadísticas sumadas de los repositorios de un equipo.
+    Args:
+        team (str): El slug del equipo.
+        days (int): Los dias de acciones que se cuentan (1 es solo hoy, 7 una semana, 30 un mes).
+    Returns:
+        TeamStats: Los conteos de pull requests, issues, dependabot, lenguajes y acciones del equipo.
+    """
+    try:
+        return await single_flight.run(single_flight.key("team_statistics", team, days), lambda: teams_service.get_team_statistics_async(team, days))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise_if_rate_limited(e)
+        raise HTTPException(status_code=500, detail=f"Error al obtener las estadisticas del equipo: {str(e)}")
@@ -1,42 +1,86 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
+import base64
+import json
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from github import Github
 from app.services.user_service import user_service
 from app.models.user_model import Event, UsersStats
 from app.routers.login_router import get_current_user
+from app.services.rate_limiter import raise_if_rate_limited
+from app.services.single_flight import single_flight
+from app.services.snapshot_refresher import snapshot_refresher
 
 user_router = APIRouter()
+snapshot_refresher.register("users_statistics", lambda: user_service.get_statistics_of_users_async())
+
+# Eventos por pagina cuando no se pide un limite.
+DEFAULT_EVENTS_LIMIT = 100
+
+def encode_event_cursor(event: Event) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"date": event.date, "id": event.id}).encode()).decode()
+
+def decode_event_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(data["date"]), int(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="El cursor no es valido")
 
 @user_router.get("/users/statistics/", response_model=UsersStats)
-def get_statistics_of_users():
+async def get_statistics_of_users(response: Response, days: int = Query(1, ge=1, le=90)):
     """
-    Obtiene estadísticas de los usuarios.
+    Obtiene estadísticas de los usuarios desde el ultimo snapshot calculado en segundo plano.
+    Args:
+        days (int): Los dias de acciones que se cuentan (1 es solo hoy, 7 una semana, 30 un mes);
+        las ventanas de mas de un dia se calculan en la peticion.
     Returns: UsersStats: Una respuesta con las estadísticas de los usuarios.
     """
     try:
-        return user_service.get_statistics_of_users()
+        if days > 1:
+            return await single_flight.run(single_flight.key("users_statistics", days), lambda: user_service.get_statistics_of_users_async(days))
+        snapshot = await snapshot_refresher.get_or_refresh("users_statistics")
+        response.headers.update(snapshot.headers())
+        return snapshot.value
     except HTTPException as e:
         raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas de usuarios: {str(e)}")
 
 @user_router.get("/users/activity", response_model=List[Event])
-def get_user_events(user: Github = Depends(get_current_user)) -> List[Event]:
+def get_user_events(request: Request, user: Github = Depends(get_current_user),
+                    limit: int = Query(DEFAULT_EVENTS_LIMIT, ge=1, le=1000), before: Optional[str] = None) -> List[Event]:
     """
-    Obtiene los eventos del usuario logueado.
+    Obtiene los eventos del usuario logueado, del mas nuevo al mas viejo.
     Args:
         user (Github): El usuario logueado.
+        limit (int): El numero maximo de eventos; la siguiente pagina se pide con el cursor de
+        la cabecera X-Next-Cursor (tambien en la cabecera Link rel="next").
+        before (str): El cursor de la pagina que se quiere.
     Returns: List[Event]: Una lista con los eventos del usuario.
     """
     try:
-        return user_service.get_user_events(user)
+        cursor = decode_event_cursor(before) if before else None
+        key = single_flight.key("users_activity", limit, before, token=request.session.get("user"))
+        # Se pide un evento de mas para saber si hay otra pagina
+        events = single_flight.run_sync(key, lambda: user_service.get_user_events(user, limit + 1, cursor))
+        headers = {}
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = encode_event_cursor(events[-1])
+            headers["X-Next-Cursor"] = next_cursor
+            headers["Link"] = f'<{request.url.include_query_params(before=next_cursor)}>; rel="next"'
+        return JSONResponse(jsonable_encoder(events), headers=headers)
     except HTTPException as e:
         raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener eventos del usuario: {str(e)}")
 
 @user_router.get("/perfil")
-def perfil_info(user: Github = Depends(get_current_user)):
+def perfil_info(request: Request, user: Github = Depends(get_current_user)):
     """
     Obtiene la información del perfil del usuario logueado.
     Args:
@@ -44,8 +88,10 @@ def perfil_info(user: Github = Depends(get_current_user)):
     Returns: dict: Un diccionario con la información del perfil del usuario.
     """
     try:
-        return user_service.get_perfil_info(user)
+        key = single_flight.key("perfil", token=request.session.get("user"))
+        return single_flight.run_sync(key, lambda: user_service.get_perfil_info(user))
     except HTTPException as e:
         raise e
     except Exception as e:
+        raise_if_rate_limited(e)
         raise HTTPException(status_code=500, detail=f"Error al obtener la información del perfil: {str(e)}")
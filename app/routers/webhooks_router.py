@@ -0,0 +1,36 @@
+import json
+from fastapi import APIRouter, HTTPException, Request
+from app.services.webhook_service import webhook_service
+
+webhooks_router = APIRouter()
+
+@webhooks_router.post("/webhooks/github")
+async def receive_github_webhook(request: Request):
+    '''
+    Recibe los eventos del webhook de GitHub (push, pull_request, issues, repository,
+    membership y team) y los aplica a los datos guardados de repositorios y equipos.
+    La firma de la cabecera X-Hub-Signature-256 se verifica con GITHUB_WEBHOOK_SECRET.
+
+    Returns:
+        Dict: El evento, la accion, si se modificaron repositorios o equipos y si la entrega
+        ya se habia recibido.
+    '''
+    if not webhook_service.secret:
+        raise HTTPException(status_code=503, detail="Falta GITHUB_WEBHOOK_SECRET en el archivo .env")
+    body = await request.body()
+    if not webhook_service.verify_signature(body, request.headers.get("X-Hub-Signature-256")):
+        raise HTTPException(status_code=401, detail="La firma del webhook no es valida")
+
+    event = request.headers.get("X-GitHub-Event", "")
+    delivery_id = request.headers.get("X-GitHub-Delivery")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El cuerpo del webhook no es JSON")
+    if webhook_service.is_duplicate(delivery_id):
+        return {"event": event, "duplicate": True}
+    try:
+        return {**webhook_service.apply(event, payload), "duplicate": False}
+    except Exception as e:
+        webhook_service.forget(delivery_id)
+        raise HTTPException(status_code=500, detail=f"Error al aplicar el evento del webhook: {str(e)}")
@@ -0,0 +1,4 @@
+from app.services.github_transport import install_transport
+
+# Se instala antes de que los servicios importen token_1 y creen el cliente de GitHub
+install_transport()
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+import httpx
+from app.services.github_async import AsyncGithubClient, parse_github_date
+from app.services.metadata_store import MetadataStore, metadata_store
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class ActivityEngine:
+    '''
+    Cuenta las acciones (pull requests e issues creados y commits) de un repositorio por dia,
+    pidiendo a GitHub solo la ventana de fechas que hace falta: los commits e issues con
+    since=, y los pull requests ordenados del mas nuevo al mas viejo hasta salir de la ventana.
+    Los dias ya terminados se guardan en el almacen local y no se vuelven a pedir; el dia de
+    hoy (en UTC) siempre se consulta.
+    '''
+
+    def __init__(self, client: AsyncGithubClient, store: Optional[MetadataStore] = None):
+        self.client = client
+        self.store = store or metadata_store
+
+    async def get_actions(self, full_name: str, days: int = 1, today: Optional[date] = None) -> Dict[date, int]:
+        '''
+        Obtiene las acciones por dia de un repositorio en una ventana que termina hoy.
+
+        Args:
+            "full_name": El nombre completo ("propietario/nombre") del repositorio.
+            "days": El tamano de la ventana en dias (1 es solo hoy, 7 una semana, 30 un mes).
+            "today": El ultimo dia de la ventana; por defecto hoy en UTC.
+
+        Returns:
+            Dict: Las acciones de cada dia de la ventana, del mas viejo al mas nuevo.
+        '''
+        today = today or utc_today()
+        window = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+        actions = self.store.get_activity(full_name, window[:-1])
+        missing = [day for day in window[:-1] if day not in actions]
+
+        # Una sola consulta cubre desde el dia faltante mas viejo hasta hoy
+        fetched = await self.count_range(full_name, missing[0] if missing else today, today)
+        self.store.save_activity(full_name, {day: count for day, count in fetched.items() if day < today})
+        actions.update(fetched)
+        return {day: actions.get(day, 0) for day in window}
+
+    async def count_range(self, full_name: str, start: date, end: date) -> Dict[date, int]:
+        '''
+        Cuenta las acciones de cada dia entre start y end (incluidos).
+
+        Args:
+            "full_name": El nombre completo del repositorio.
+            "start": El primer dia.
+            "end": El ultimo dia.
+
+        Returns:
+            Dict: Las acciones por dia, con 0 en los dias sin acciones.
+        '''
+        since = day_start(start)
+        until = day_start(end + timedelta(days=1))
+        results = await asyncio.gather(
+            self.pull_request_dates(full_name, since),
+            self.issue_dates(full_name, since),
+            self.commit_dates(full_name, since, until),
+        )
+        counts = {start + timedelta(days=offset): 0 for offset in range((end - start).days + 1)}
+        for created in (created for dates in results for created in dates):
+            if since <= created < until:
+                counts[created.astimezone(timezone.utc).date()] += 1
+        return counts
+
+    async def pull_request_dates(self, full_name: str, since: datetime) -> List[datetime]:
+        # Ordenados por creacion del mas nuevo al mas viejo: se deja de paginar al salir de la ventana
+        dates = []
+        params = {"state": "all", "sort": "created", "direction": "desc"}
+        async for pull in self.client.paginate(f"/repos/{full_name}/pulls", params, prefetch=False):
+            created = parse_github_date(pull["created_at"])
+            if created < since:
+                break
+            dates.append(created)
+        return dates
+
+    async def issue_dates(self, full_name: str, since: datetime) -> List[datetime]:
+        # since= filtra por actualizacion, asi que la fecha de creacion se revisa en count_range.
+        # El listado de issues incluye los pull requests, que ya se cuentan aparte.
+        params = {"state": "all", "since": since.isoformat().replace("+00:00", "Z")}
+        return [
+            parse_github_date(issue["created_at"])
+            async for issue in self.client.paginate(f"/repos/{full_name}/issues", params)
+            if "pull_request" not in issue
+        ]
+
+    async def commit_dates(self, full_name: str, since: datetime, until: datetime) -> List[datetime]:
+        params = {
+            "since": since.isoformat().replace("+00:00", "Z"),
+            "until": until.isoformat().replace("+00:00", "Z"),
+        }
+        try:
+            return [
+                parse_github_date(commit["commit"]["author"]["date"])
+                async for commit in self.client.paginate(f"/repos/{full_name}/commits", params)
+            ]
+        except httpx.HTTPStatusError as e:
+            # GitHub responde 409 cuando el repositorio esta vacio
+            if e.response.status_code == 409:
+                return []
+            raise
@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, TypeVar
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Numero maximo de repositorios que se consultan en paralelo contra GitHub.
+MAX_WORKERS = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+# Con asyncio no se ocupa un hilo por peticion, por eso el limite puede ser mayor.
+MAX_ASYNC_WORKERS = int(os.getenv("GITHUB_MAX_ASYNC_WORKERS", "32"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_in_pool(func: Callable[[T], R], items: Iterable[T], max_workers: Optional[int] = None) -> List[R]:
+    '''
+    Aplica una funcion a cada elemento usando un pool de hilos con un limite de concurrencia.
+
+    Args:
+        "func": La funcion que se ejecuta por cada elemento (normalmente hace llamadas a GitHub).
+        "items": Los elementos a procesar, por ejemplo la lista paginada de repositorios.
+        "max_workers": El numero maximo de hilos; si no se indica se usa GITHUB_MAX_WORKERS.
+
+    Returns:
+        List: Los resultados en el mismo orden de los elementos recibidos.
+    '''
+    items = list(items)
+    workers = max_workers or MAX_WORKERS
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    # Cada hilo corre con una copia del contexto de quien llama (por ejemplo la prioridad de las peticiones)
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(lambda context, item: context.run(func, item), contexts, items))
+
+
+async def gather_bounded(func: Callable[[T], Awaitable[R]], items: Iterable[T], limit: Optional[int] = None) -> List[R]:
+    '''
+    Ejecuta una corrutina por cada elemento con un limite de corrutinas activas al mismo tiempo.
+
+    Args:
+        "func": La corrutina que se ejecuta por cada elemento.
+        "items": Los elementos a procesar.
+        "limit": El numero maximo de corrutinas activas; si no se indica se usa GITHUB_MAX_ASYNC_WORKERS.
+
+    Returns:
+        List: Los resultados en el mismo orden de los elementos recibidos.
+    '''
+    semaphore = asyncio.Semaphore(limit or MAX_ASYNC_WORKERS)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+async def stream_bounded(func: Callable[[T], Awaitable[R]], items: AsyncIterable[T], limit: Optional[int] = None) -> AsyncIterator[R]:
+    '''
+    Ejecuta una corrutina por cada elemento de un iterable asincrono y entrega cada resultado
+    apenas termina. Solo se leen elementos nuevos mientras haya menos de "limit" corrutinas
+    activas, asi la memoria no crece con el tamano del listado.
+
+    Args:
+        "func": La corrutina que se ejecuta por cada elemento.
+        "items": Los elementos a procesar, por ejemplo un listado paginado de GitHub.
+        "limit": El numero maximo de corrutinas activas; si no se indica se usa GITHUB_MAX_ASYNC_WORKERS.
+
+    Returns:
+        AsyncIterator: Los resultados en el orden en que terminan.
+    '''
+    limit = limit or MAX_ASYNC_WORKERS
+    pending = set()
+    try:
+        async for item in items:
+            pending.add(asyncio.ensure_future(func(item)))
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from app.services.concurrency import gather_bounded
+from app.services.github_async import GITHUB_PAGE_SIZE, AsyncGithubClient, async_github, parse_github_date
+from app.services.metadata_store import MetadataStore, metadata_store
+from app.services.rate_limiter import BACKGROUND, request_priority
+
+load_dotenv()
+
+ORG_NAME = os.getenv("ORG_NAME")
+# Segundos entre cada revision de los feeds de eventos; 0 desactiva el poller.
+EVENT_POLL_TICK = int(os.getenv("EVENT_POLL_TICK", "60"))
+# Feeds que se consultan al mismo tiempo en cada revision.
+EVENT_POLL_CONCURRENCY = int(os.getenv("EVENT_POLL_CONCURRENCY", "4"))
+# Intervalo por defecto si GitHub no envia la cabecera X-Poll-Interval.
+DEFAULT_POLL_INTERVAL = 60
+
+
+class EventPoller:
+    '''
+    Consulta en segundo plano los feeds de eventos de los repositorios del token del servidor
+    y de la organizacion, y agrega los eventos nuevos al registro local (ver MetadataStore.save_events).
+    GitHub solo guarda los eventos recientes; el registro conserva el historial y las consultas
+    de actividad lo leen sin pedirlo de nuevo. Cada feed se consulta cuando vence su
+    X-Poll-Interval, con ETag (un 304 no gasta el limite de peticiones), y las paginas se dejan
+    de pedir al llegar al ultimo evento ya guardado.
+    '''
+
+    def __init__(self, client: Optional[AsyncGithubClient] = None, store: Optional[MetadataStore] = None,
+                 tick: int = EVENT_POLL_TICK, org_name: Optional[str] = ORG_NAME):
+        self.client = client or async_github
+        self.store = store or metadata_store
+        self.tick = tick
+        self.org_name = org_name
+        self.task: Optional[asyncio.Task] = None
+
+    async def list_feeds(self) -> Dict[str, Optional[str]]:
+        '''
+        Obtiene los feeds que se consultan.
+
+        Returns:
+            Dict: La ruta de cada feed y el repositorio al que pertenece (None para la organizacion).
+        '''
+        feeds = {}
+        async for repository in self.client.paginate("/user/repos"):
+            feeds[f"/repos/{repository['full_name']}/events"] = repository["full_name"]
+        if self.org_name:
+            feeds[f"/orgs/{self.org_name}/events"] = None
+        return feeds
+
+    async def poll_feed(self, path: str, repo: Optional[str], last_event_id: Optional[int]) -> int:
+        '''
+        Consulta un feed y guarda sus eventos nuevos.
+
+        Args:
+            "path": La ruta del feed.
+            "repo": El repositorio del feed o None.
+            "last_event_id": El id del evento mas nuevo guardado de este feed.
+
+        Returns:
+            Int: El numero de eventos nuevos.
+        '''
+        response = await self.client.request("GET", path, params={"per_page": GITHUB_PAGE_SIZE})
+        poll_interval = int(response.headers.get("X-Poll-Interval", DEFAULT_POLL_INTERVAL))
+        events: List[dict] = []
+        while True:
+            page = response.json()
+            # Los ids de los eventos crecen con el tiempo: lo demas ya esta guardado
+            new = [event for event in page if last_event_id is None or int(event["id"]) > last_event_id]
+            events.extend(new)
+            next_link = response.links.get("next")
+            if len(new) < len(page) or not next_link:
+                break
+            response = await self.client.request("GET", next_link["url"])
+
+        inserted = self.store.save_events(to_log_entry(event) for event in events)
+        newest = max((int(event["id"]) for event in events), default=last_event_id)
+        self.store.save_event_feed(path, repo, newest, poll_interval)
+        return inserted
+
+    async def poll_once(self) -> int:
+        '''
+        Consulta los feeds cuyo intervalo ya vencio.
+
+        Returns:
+            Int: El numero de eventos nuevos guardados.
+        '''
+        known = self.store.get_event_feeds()
+        now = time.time()
+        due = [
+            (path, repo, known.get(path, {}).get("last_event_id"))
+            for path, repo in (await self.list_feeds()).items()
+            if path not in known or now - known[path]["polled_at"] >= known[path]["poll_interval"]
+        ]
+
+        async def poll(feed):
+            try:
+                return await self.poll_feed(*feed)
+            except Exception as e:
+                print(f"Error al consultar los eventos de {feed[0]}: {e}")
+                return 0
+
+        return sum(await gather_bounded(poll, due, EVENT_POLL_CONCURRENCY))
+
+    async def run(self):
+        # Los eventos se consultan con el presupuesto que no usan los endpoints interactivos
+        request_priority.set(BACKGROUND)
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"Error al consultar los feeds de eventos: {e}")
+            await asyncio.sleep(self.tick)
+
+    def start(self):
+        if self.tick > 0 and self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+def to_log_entry(event: dict) -> dict:
+    return {
+        "id": int(event["id"]),
+        "type": event["type"],
+        "repo": event["repo"]["name"],
+        "actor": (event.get("actor") or {}).get("login"),
+        "org": (event.get("org") or {}).get("login"),
+        "public": event.get("public", True),
+        "created_at": parse_github_date(event["created_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+# Crear una instancia del poller que inicia la aplicacion
+event_poller = EventPoller()
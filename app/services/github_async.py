@@ -0,0 +1,268 @@
+import asyncio
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+import httpx
+from dotenv import load_dotenv
+from token_1 import mytoken
+from app.services.http_cache import CONDITIONAL_HEADERS, http_cache
+from app.services.http_pool import http_pool
+from app.services.rate_limiter import rate_limiter
+from app.services.token_pool import token_pool
+
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "15"))
+# Elementos por pagina en los listados; 100 es el maximo que acepta GitHub.
+GITHUB_PAGE_SIZE = int(os.getenv("GITHUB_PAGE_SIZE", "100"))
+# Paginas de un listado que se piden al mismo tiempo.
+PAGE_PREFETCH_CONCURRENCY = int(os.getenv("GITHUB_PAGE_PREFETCH", "4"))
+
+
+def parse_github_date(value: Optional[str]) -> Optional[datetime]:
+    '''
+    Convierte una fecha ISO 8601 de la API de GitHub (por ejemplo "2023-01-01T10:00:00Z") a datetime.
+
+    Args:
+        "value": La fecha en texto o None.
+
+    Returns:
+        Datetime: La fecha convertida o None si no habia fecha.
+    '''
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class AsyncGithubClient:
+    '''
+    Cliente asincrono para la API REST y GraphQL de GitHub basado en httpx.
+    Permite tener muchas peticiones en vuelo desde un solo proceso sin ocupar un hilo por peticion.
+    '''
+
+    def __init__(self, token: Optional[str], base_url: str = GITHUB_API_URL,
+                 timeout: float = GITHUB_TIMEOUT, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # El cliente httpx se crea en el primer uso para no abrir conexiones al importar, y de
+        # nuevo si cambia el event loop porque las conexiones pertenecen al loop que las abrio
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.default_headers(),
+                timeout=self.timeout,
+                # Sin transporte propio se usan las conexiones keep-alive compartidas del proceso
+                transport=self.transport or http_pool.async_transport(),
+            )
+        return self._client
+
+    def default_headers(self) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    async def send(self, request: httpx.Request, cached: bool = False) -> httpx.Response:
+        '''
+        Envia una peticion con el mejor token del pool, pasando por el planificador del limite
+        de peticiones: espera si el presupuesto del token lo pide y reintenta cuando GitHub
+        responde con el limite secundario o con un token vencido.
+
+        Args:
+            "request": La peticion armada con el cliente httpx.
+            "cached": Si es True la peticion es condicional con la cache de ETag del token que
+            se envia; un 304 se responde con el cuerpo guardado.
+
+        Returns:
+            Response: La respuesta de httpx.
+        '''
+        original = request.headers.get("Authorization")
+        path = str(request.url)[len(self.base_url):]
+        exclude = None
+        attempt = 0
+        revalidate = cached
+        while True:
+            authorization = token_pool.authorization(original, path, exclude)
+            if authorization:
+                request.headers["Authorization"] = authorization
+            cache_key = None
+            if cached:
+                # La llave es la del token que se envia: otro token puede ver datos distintos en la misma URL
+                cache_key = http_cache.key(str(request.url), request.headers.get("Authorization"), request.headers.get("Accept"))
+                for name in CONDITIONAL_HEADERS:
+                    request.headers.pop(name, None)
+                if revalidate:
+                    request.headers.update(http_cache.conditional_headers(cache_key))
+            limit_key = rate_limiter.key(authorization, rate_limiter.resource(path))
+            await rate_limiter.acquire_async(limit_key)
+            response = await self.client.send(request)
+            token_pool.report(authorization, response.status_code)
+            if attempt < rate_limiter.retries and token_pool.should_retry(authorization, response.status_code, path):
+                exclude = token_pool.split(authorization)[1]
+                attempt += 1
+                continue
+            body = response.text if response.status_code in (403, 429) else ""
+            wait = rate_limiter.update(limit_key, response.status_code, response.headers, body)
+            if rate_limiter.should_retry(attempt, wait):
+                attempt += 1
+                continue
+            if cache_key is not None and response.status_code == 304:
+                entry = http_cache.revalidated(cache_key, response.headers)
+                if entry is None:
+                    # La entrada se descarto mientras tanto: se repite la peticion sin condiciones
+                    revalidate = False
+                    continue
+                return httpx.Response(200, headers=entry.headers, content=entry.body, request=request)
+            if cache_key is not None and response.status_code == 200:
+                http_cache.record_miss()
+                http_cache.store(cache_key, response.headers, response.content)
+            return response
+
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      json: Optional[Any] = None) -> httpx.Response:
+        '''
+        Hace una peticion a GitHub y lanza un error si la respuesta no es exitosa.
+        Las peticiones GET son condicionales: si GitHub responde 304 se usa el cuerpo guardado.
+
+        Args:
+            "method": El verbo HTTP.
+            "path": La ruta relativa a la API (por ejemplo "/user/repos") o una URL absoluta.
+            "params": Los parametros de la consulta.
+            "json": El cuerpo de la peticion.
+
+        Returns:
+            Response: La respuesta de httpx.
+        '''
+        request = self.client.build_request(method, path, params=params, json=json)
+        response = await self.send(request, cached=method == "GET")
+        response.raise_for_status()
+        return response
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self.request("GET", path, params=params)
+        return response.json()
+
+    async def paginate(self, path: str, params: Optional[Dict[str, Any]] = None, prefetch: bool = True) -> AsyncIterator[Any]:
+        '''
+        Recorre todas las paginas de un listado con el tamano de pagina maximo. Si la primera
+        pagina trae la cabecera Link rel="last", las demas paginas se piden al mismo tiempo
+        (hasta GITHUB_PAGE_PREFETCH a la vez); si no, se sigue la cabecera Link rel="next".
+
+        Args:
+            "path": La ruta del listado.
+            "params": Los parametros de la consulta.
+            "prefetch": Si es False las paginas se piden de una en una, para listados que se
+            dejan de recorrer antes del final (por ejemplo ordenados por fecha).
+
+        Returns:
+            AsyncIterator: Los elementos del listado, en orden.
+        '''
+        params = {"per_page": GITHUB_PAGE_SIZE, **(params or {})}
+        response = await self.request("GET", path, params=params)
+        for item in response.json():
+            yield item
+
+        last_link = response.links.get("last")
+        if last_link and prefetch:
+            async for item in self.prefetch_pages(last_link["url"]):
+                yield item
+            return
+
+        next_link = response.links.get("next")
+        while next_link:
+            response = await self.request("GET", next_link["url"])
+            for item in response.json():
+                yield item
+            next_link = response.links.get("next")
+
+    async def prefetch_pages(self, last_url: str) -> AsyncIterator[Any]:
+        '''
+        Pide las paginas 2..N de un listado al mismo tiempo y entrega los elementos en orden.
+
+        Args:
+            "last_url": La URL de la ultima pagina (cabecera Link rel="last").
+
+        Returns:
+            AsyncIterator: Los elementos de las paginas 2..N, en orden.
+        '''
+        url = httpx.URL(last_url)
+        pages = int(url.params["page"])
+        pending = deque()
+        next_page = 2
+        try:
+            while next_page <= pages or pending:
+                # Se mantiene una ventana de paginas en vuelo para no cargar todo el listado en memoria
+                while next_page <= pages and len(pending) < PAGE_PREFETCH_CONCURRENCY:
+                    page_url = url.copy_set_param("page", next_page)
+                    pending.append(asyncio.ensure_future(self.request("GET", str(page_url))))
+                    next_page += 1
+                response = await pending.popleft()
+                for item in response.json():
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def count(self, path: str, params: Optional[Dict[str, Any]] = None) -> int:
+        '''
+        Cuenta los elementos de un listado con una sola peticion: se pide un elemento por pagina
+        y el numero de la ultima pagina (cabecera Link rel="last") es el total.
+
+        Args:
+            "path": La ruta del listado.
+            "params": Los parametros de la consulta.
+
+        Returns:
+            Int: El total de elementos del listado.
+        '''
+        params = dict(params or {}, per_page=1)
+        response = await self.request("GET", path, params=params)
+        last_link = response.links.get("last")
+        if last_link:
+            return int(parse_qs(urlparse(last_link["url"]).query)["page"][0])
+        return len(response.json())
+
+    async def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        '''
+        Ejecuta una consulta GraphQL y devuelve el campo "data" de la respuesta.
+        Solo lanza un error si la respuesta no trae datos.
+
+        Args:
+            "query": La consulta GraphQL.
+            "variables": Las variables de la consulta.
+
+        Returns:
+            Dict: Los datos de la respuesta.
+        '''
+        response = await self.request("POST", "/graphql", json={"query": query, "variables": variables or {}})
+        payload = response.json()
+        if payload.get("data") is None:
+            raise ValueError(f"Error en la consulta GraphQL: {payload.get('errors')}")
+        if payload.get("errors"):
+            # GitHub devuelve datos parciales cuando falla un solo campo (por ejemplo sin permisos)
+            print(f"Errores parciales en la consulta GraphQL: {payload['errors']}")
+        return payload["data"]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Crear una instancia del cliente compartida por los servicios
+async_github = AsyncGithubClient(mytoken)
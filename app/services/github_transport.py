@@ -0,0 +1,124 @@
+from typing import Any, Dict, Optional
+from github.Requester import Requester, RequestsResponse
+from app.services.http_cache import CONDITIONAL_HEADERS, http_cache
+from app.services.http_pool import http_pool
+from app.services.rate_limiter import rate_limiter
+from app.services.token_pool import token_pool
+
+
+class CachedResponse:
+    '''
+    Respuesta armada desde la cache con la misma interfaz que RequestsResponse de PyGithub.
+    '''
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.text = body.decode("utf-8")
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self) -> str:
+        return self.text
+
+
+class GithubConnection:
+    '''
+    Clase de conexion que PyGithub usa para hablar con GitHub (ver Requester.injectConnectionClasses).
+    Todas las conexiones comparten la sesion de requests del host (ver http_pool), y las peticiones GET pasan
+    por la cache de ETag: se envia If-None-Match y un 304 se responde con el cuerpo guardado.
+    '''
+    protocol = "https"
+    default_port = 443
+
+    def __init__(self, host: str, port: Optional[int] = None, strict: bool = False, timeout: Optional[int] = None,
+                 retry: Any = None, pool_size: Optional[int] = None, **kwargs: Any):
+        self.host = host
+        self.port = port if port else self.default_port
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        # El retry de PyGithub no se usa: los rechazos por estado los reintenta send con el rate_limiter
+        self.session = http_pool.session(self.protocol, self.host, self.port, pool_size)
+
+    def request(self, verb: str, url: str, input: Any, headers: Dict[str, str]):
+        self.verb = verb
+        self.url = url
+        self.input = input
+        self.headers = headers
+
+    def send(self, headers: Dict[str, str], cached: bool = False):
+        # Cada envio usa el mejor token del pool y pasa por el planificador del limite de peticiones.
+        # Con cached=True la peticion es condicional con la cache de ETag del token que se envia.
+        original = headers.get("Authorization")
+        exclude = None
+        attempt = 0
+        revalidate = cached
+        while True:
+            authorization = token_pool.authorization(original, self.url, exclude)
+            sent = {name: value for name, value in headers.items() if name not in CONDITIONAL_HEADERS}
+            if authorization:
+                sent["Authorization"] = authorization
+            cache_key = None
+            if cached:
+                # La llave es la del token que se envia: otro token puede ver datos distintos en la misma URL
+                cache_key = http_cache.key(f"{self.host}:{self.port}{self.url}", sent.get("Authorization"), sent.get("Accept"))
+                if revalidate:
+                    sent.update(http_cache.conditional_headers(cache_key))
+            limit_key = rate_limiter.key(authorization, rate_limiter.resource(self.url))
+            rate_limiter.acquire(limit_key)
+            response = self.session.request(
+                self.verb,
+                f"{self.protocol}://{self.host}:{self.port}{self.url}",
+                headers=sent,
+                data=self.input,
+                timeout=self.timeout,
+                verify=self.verify,
+                allow_redirects=False,
+            )
+            token_pool.report(authorization, response.status_code)
+            if attempt < rate_limiter.retries and token_pool.should_retry(authorization, response.status_code, self.url):
+                exclude = token_pool.split(authorization)[1]
+                attempt += 1
+                continue
+            body = response.text if response.status_code in (403, 429) else ""
+            wait = rate_limiter.update(limit_key, response.status_code, response.headers, body)
+            if rate_limiter.should_retry(attempt, wait):
+                attempt += 1
+                continue
+            if cache_key is not None and response.status_code == 304:
+                entry = http_cache.revalidated(cache_key, response.headers)
+                if entry is None:
+                    # La entrada se descarto mientras tanto: se repite la peticion sin condiciones
+                    revalidate = False
+                    continue
+                return CachedResponse(200, entry.headers, entry.body)
+            if cache_key is not None and response.status_code == 200:
+                http_cache.record_miss()
+                http_cache.store(cache_key, response.headers, response.content)
+            return RequestsResponse(response)
+
+    def getresponse(self):
+        return self.send(self.headers, cached=self.verb == "GET")
+
+    def close(self):
+        # La sesion es compartida, no se cierra con cada conexion
+        pass
+
+
+class GithubHTTPConnection(GithubConnection):
+    protocol = "http"
+    default_port = 80
+
+
+class GithubHTTPSConnection(GithubConnection):
+    protocol = "https"
+    default_port = 443
+
+
+def install_transport():
+    '''
+    Hace que todos los clientes de PyGithub que se creen desde ahora usen GithubConnection.
+    Debe llamarse antes de crear los clientes (por ejemplo token_1.my_git).
+    '''
+    Requester.injectConnectionClasses(GithubHTTPConnection, GithubHTTPSConnection)
@@ -0,0 +1,156 @@
+import os
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.models.repository_model import RepositorySnapshot
+from app.services.concurrency import gather_bounded
+from app.services.github_async import AsyncGithubClient, parse_github_date
+
+load_dotenv()
+
+# Numero de repositorios que se piden en cada consulta GraphQL.
+GRAPHQL_BATCH_SIZE = int(os.getenv("GRAPHQL_BATCH_SIZE", "20"))
+# GitHub penaliza las consultas GraphQL pesadas en paralelo, por eso se envian pocas a la vez.
+GRAPHQL_MAX_CONCURRENCY = 2
+
+REPOSITORY_FIELDS = """
+    name
+    owner { login }
+    createdAt
+    defaultBranchRef { target { ... on Commit { committedDate } } }
+    collaborators(first: 100) { totalCount pageInfo { hasNextPage endCursor } nodes { login } }
+    prsOpen: pullRequests(states: OPEN) { totalCount }
+    prsClosed: pullRequests(states: [CLOSED, MERGED]) { totalCount }
+    issues(states: OPEN) { totalCount }
+    refs(refPrefix: "refs/heads/") { totalCount }
+    languages(first: 100) { edges { size node { name } } }
+"""
+
+# Paginas siguientes de colaboradores, para los repositorios con mas de 100.
+COLLABORATORS_QUERY = """
+query($owner: String!, $name: String!, $after: String!) {
+    repository(owner: $owner, name: $name) {
+        collaborators(first: 100, after: $after) { pageInfo { hasNextPage endCursor } nodes { login } }
+    }
+}
+"""
+
+
+class GraphQLRepositoryBackend:
+    '''
+    Obtiene los conteos de varios repositorios con una sola consulta GraphQL por lote,
+    en lugar de una peticion REST por cada conteo.
+    '''
+
+    def __init__(self, client: AsyncGithubClient, calculate_state: Callable[[Optional[datetime]], str],
+                 batch_size: int = GRAPHQL_BATCH_SIZE):
+        self.client = client
+        self.calculate_state = calculate_state
+        self.batch_size = batch_size
+
+    def build_query(self, repositories: List[Tuple[str, str]]) -> Tuple[str, Dict[str, str]]:
+        '''
+        Arma la consulta GraphQL de un lote de repositorios. Cada repositorio tiene un alias rN
+        con sus conteos y un alias dN con la busqueda de sus pull requests de dependabot.
+
+        Args:
+            "repositories": Una lista de tuplas (propietario, nombre).
+
+        Returns:
+            Tuple: La consulta y sus variables.
+        '''
+        declarations = []
+        selections = []
+        variables = {}
+        for index, (owner, name) in enumerate(repositories):
+            declarations.append(f"$o{index}: String!, $n{index}: String!, $q{index}: String!")
+            selections.append(f"r{index}: repository(owner: $o{index}, name: $n{index}) {{{REPOSITORY_FIELDS}}}")
+            selections.append(f"d{index}: search(query: $q{index}, type: ISSUE) {{ issueCount }}")
+            variables[f"o{index}"] = owner
+            variables[f"n{index}"] = name
+            variables[f"q{index}"] = f"repo:{owner}/{name} is:pr author:app/dependabot"
+        query = f"query({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}"
+        return query, variables
+
+    def parse_repository(self, node: dict, dependabot: dict) -> RepositorySnapshot:
+        '''
+        Convierte la respuesta GraphQL de un repositorio en un RepositorySnapshot.
+
+        Args:
+            "node": Los datos del alias rN.
+            "dependabot": Los datos del alias dN.
+
+        Returns:
+            RepositorySnapshot: Un modelo con los datos del repositorio.
+        '''
+        target = (node.get("defaultBranchRef") or {}).get("target") or {}
+        date_last_commit = parse_github_date(target.get("committedDate"))
+        collaborators = node.get("collaborators") or {"nodes": []}
+        prs_open = node["prsOpen"]["totalCount"]
+        # La API REST cuenta los pull requests abiertos como issues, se mantiene el mismo conteo
+        issues = node["issues"]["totalCount"] + prs_open
+
+        return RepositorySnapshot(
+            name=node["name"],
+            owner=node["owner"]["login"],
+            createDate=parse_github_date(node["createdAt"]),
+            lastUseDate=date_last_commit,
+            state=self.calculate_state(date_last_commit),
+            prsOpen=prs_open,
+            prsClosed=node["prsClosed"]["totalCount"],
+            prsDependabot=(dependabot or {}).get("issueCount", 0),
+            issues=issues,
+            collaborators=[collaborator["login"] for collaborator in collaborators["nodes"]],
+            languages={edge["node"]["name"]: edge["size"] for edge in node["languages"]["edges"]},
+            branches=node["refs"]["totalCount"],
+        )
+
+    async def fetch_collaborators(self, owner: str, name: str, collaborators: dict) -> dict:
+        '''
+        Completa los colaboradores de un repositorio que tiene mas de los 100 de la primera pagina.
+
+        Args:
+            "owner": El propietario del repositorio.
+            "name": El nombre del repositorio.
+            "collaborators": La primera pagina de colaboradores del lote.
+
+        Returns:
+            Dict: Los colaboradores con los nodos de todas las paginas.
+        '''
+        nodes = list(collaborators["nodes"])
+        page_info = collaborators.get("pageInfo") or {}
+        while page_info.get("hasNextPage"):
+            data = await self.client.graphql(COLLABORATORS_QUERY, {"owner": owner, "name": name, "after": page_info["endCursor"]})
+            page = data["repository"]["collaborators"]
+            nodes.extend(page["nodes"])
+            page_info = page["pageInfo"]
+        return {**collaborators, "nodes": nodes}
+
+    async def fetch_batch(self, repositories: List[Tuple[str, str]]) -> List[RepositorySnapshot]:
+        query, variables = self.build_query(repositories)
+        data = await self.client.graphql(query, variables)
+        snapshots = []
+        for index, (owner, name) in enumerate(repositories):
+            node = data.get(f"r{index}")
+            if node is None:
+                print(f"Error al obtener el repositorio {owner}/{name} por GraphQL")
+                continue
+            collaborators = node.get("collaborators") or {}
+            if (collaborators.get("pageInfo") or {}).get("hasNextPage"):
+                node = {**node, "collaborators": await self.fetch_collaborators(owner, name, collaborators)}
+            snapshots.append(self.parse_repository(node, data.get(f"d{index}")))
+        return snapshots
+
+    async def fetch_snapshots(self, repositories: List[Tuple[str, str]]) -> List[RepositorySnapshot]:
+        '''
+        Obtiene los snapshots de todos los repositorios dividiendolos en lotes de batch_size.
+
+        Args:
+            "repositories": Una lista de tuplas (propietario, nombre).
+
+        Returns:
+            List: Los snapshots en el mismo orden de los repositorios.
+        '''
+        batches = [repositories[index:index + self.batch_size] for index in range(0, len(repositories), self.batch_size)]
+        results = await gather_bounded(self.fetch_batch, batches, GRAPHQL_MAX_CONCURRENCY)
+        return [snapshot for batch in results for snapshot in batch]
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Numero maximo de respuestas guardadas; al superarlo se descarta la menos usada.
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "5000"))
+
+# Cabeceras que no se guardan porque el cuerpo se guarda ya decodificado.
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+# Cabeceras de las peticiones condicionales; se quitan antes de armar las del token que se envia.
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+@dataclass
+class CacheEntry:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    headers: Dict[str, str]
+    body: bytes
+
+
+class HttpCache:
+    '''
+    Cache LRU de respuestas GET de GitHub con su ETag / Last-Modified. Permite enviar peticiones
+    condicionales (If-None-Match) y responder con el cuerpo guardado cuando GitHub devuelve 304,
+    que no se descuenta del limite de peticiones.
+    '''
+
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(url: str, authorization: Optional[str] = None, accept: Optional[str] = None) -> str:
+        # El token hace parte de la llave: cada usuario puede ver datos distintos en la misma URL
+        raw = f"{authorization or ''}\n{accept or ''}\n{url}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        '''
+        Devuelve las cabeceras para hacer una peticion condicional de una URL guardada.
+
+        Args:
+            "key": La llave de la URL (ver HttpCache.key).
+
+        Returns:
+            Dict: Las cabeceras If-None-Match / If-Modified-Since, o un diccionario vacio.
+        '''
+        entry = self.get(key)
+        if entry is None:
+            return {}
+        if entry.etag:
+            return {"If-None-Match": entry.etag}
+        if entry.last_modified:
+            return {"If-Modified-Since": entry.last_modified}
+        return {}
+
+    def store(self, key: str, headers: Mapping[str, str], body: bytes):
+        headers = {name.lower(): value for name, value in headers.items() if name.lower() not in SKIPPED_HEADERS}
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        with self.lock:
+            self.entries[key] = CacheEntry(etag, last_modified, headers, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, key: str, headers: Mapping[str, str]) -> Optional[CacheEntry]:
+        '''
+        Procesa una respuesta 304: cuenta el acierto y devuelve la entrada guardada con las
+        cabeceras nuevas (por ejemplo X-RateLimit-Remaining) encima de las guardadas.
+
+        Args:
+            "key": La llave de la URL.
+            "headers": Las cabeceras de la respuesta 304.
+
+        Returns:
+            CacheEntry: La entrada con las cabeceras actualizadas o None si ya no estaba guardada.
+        '''
+        entry = self.get(key)
+        if entry is None:
+            return None
+        merged = dict(entry.headers)
+        merged.update({name.lower(): value for name, value in headers.items() if name.lower() not in SKIPPED_HEADERS})
+        with self.lock:
+            self.hits += 1
+        return CacheEntry(entry.etag, entry.last_modified, merged, entry.body)
+
+    def record_miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Crear una instancia de la cache compartida por todos los clientes de GitHub
+http_cache = HttpCache()
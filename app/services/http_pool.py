@@ -0,0 +1,180 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Dict, List, Optional
+import httpx
+import requests
+import requests.adapters
+from dotenv import load_dotenv
+from github.Requester import Requester
+from urllib3.util.retry import Retry
+from app.services.concurrency import MAX_ASYNC_WORKERS, MAX_WORKERS
+
+load_dotenv()
+
+# Conexiones abiertas por host para los clientes de PyGithub; debe cubrir los hilos que consultan a GitHub.
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", str(max(MAX_WORKERS * 2, requests.adapters.DEFAULT_POOLSIZE))))
+# Conexiones simultaneas del cliente asincrono; debe cubrir las corrutinas en vuelo.
+GITHUB_ASYNC_POOL_SIZE = int(os.getenv("GITHUB_ASYNC_POOL_SIZE", str(MAX_ASYNC_WORKERS * 2)))
+# Segundos que una conexion sin uso se mantiene abierta para no repetir el handshake TLS.
+GITHUB_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "60"))
+# Usa HTTP/2 en el cliente asincrono si esta instalado el paquete h2 (pip install "httpx[http2]").
+GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "true").lower() == "true"
+# Reintentos de los clientes de PyGithub ante errores de conexion (no ante codigos de estado).
+GITHUB_CONNECT_RETRIES = int(os.getenv("GITHUB_CONNECT_RETRIES", "3"))
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class SharedAsyncTransport(httpx.AsyncHTTPTransport):
+    '''
+    Transporte de httpx compartido por todos los clientes asincronos: cerrar un cliente no
+    cierra las conexiones de los demas; se cierran con HttpPool.aclose al apagar la aplicacion.
+    '''
+
+    async def aclose(self):
+        pass
+
+    async def close_pool(self):
+        await super().aclose()
+
+
+class HttpPool:
+    '''
+    Conexiones keep-alive hacia GitHub compartidas por todo el proceso: una sesion de requests
+    por host para los clientes de PyGithub (el cliente del token del servidor y los de cada
+    sesion de usuario) y un transporte de httpx para los clientes asincronos.
+    '''
+
+    def __init__(self, pool_size: int = GITHUB_POOL_SIZE, async_pool_size: int = GITHUB_ASYNC_POOL_SIZE,
+                 keepalive_expiry: float = GITHUB_KEEPALIVE_EXPIRY, http2: bool = GITHUB_HTTP2):
+        self.pool_size = pool_size
+        self.async_pool_size = async_pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and http2_available()
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, requests.Session] = {}
+        # Las conexiones de httpx pertenecen a un event loop, por eso hay un transporte por loop
+        self.transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SharedAsyncTransport]" = weakref.WeakKeyDictionary()
+
+    def session(self, protocol: str, host: str, port: int, pool_size: Optional[int] = None) -> requests.Session:
+        '''
+        Obtiene la sesion de requests compartida de un host. El adaptador solo reintenta los
+        errores de conexion: los 403, 429 y 5xx llegan a GithubConnection.send, que los
+        reintenta con el rate_limiter (los reintentos de PyGithub esperarian el reset dentro
+        de urllib3 sin que el planificador se entere).
+
+        Args:
+            "protocol": "http" o "https".
+            "host": El host de la API.
+            "port": El puerto.
+            "pool_size": El tamano que pide PyGithub; se usa si es mayor que GITHUB_POOL_SIZE.
+
+        Returns:
+            Session: La sesion con su pool de conexiones.
+        '''
+        key = f"{protocol}://{host}:{port}"
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                # Igual que PyGithub: evita que requests use las credenciales de .netrc
+                session.auth = Requester.noopAuth
+                size = max(pool_size or 0, self.pool_size)
+                adapter = requests.adapters.HTTPAdapter(
+                    max_retries=Retry(
+                        total=GITHUB_CONNECT_RETRIES,
+                        status_forcelist=[],
+                        respect_retry_after_header=False,
+                        raise_on_status=False,
+                    ),
+                    pool_connections=size,
+                    pool_maxsize=size,
+                )
+                session.mount(f"{protocol}://", adapter)
+                self.sessions[key] = session
+            return session
+
+    def async_transport(self) -> SharedAsyncTransport:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            transport = self.transports.get(loop)
+            if transport is None:
+                transport = SharedAsyncTransport(
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=self.async_pool_size,
+                        max_keepalive_connections=self.async_pool_size,
+                        keepalive_expiry=self.keepalive_expiry,
+                    ),
+                )
+                self.transports[loop] = transport
+            return transport
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            transport = self.transports.pop(loop, None)
+        if transport is not None:
+            await transport.close_pool()
+
+    def stats(self) -> dict:
+        '''
+        Obtiene el estado de las conexiones, para ajustar el tamano de los pools a la
+        concurrencia de los workers.
+
+        Returns:
+            Dict: La configuracion y, por host, conexiones creadas, peticiones enviadas y
+            conexiones libres (sync), y conexiones abiertas y libres (async). Los conteos salen
+            de los pools de urllib3 y httpcore; si una version no los expone quedan en None.
+        '''
+        hosts = {}
+        with self.lock:
+            sessions = dict(self.sessions)
+            transports = list(self.transports.values())
+        for session in sessions.values():
+            for adapter in session.adapters.values():
+                pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+                if pools is None:
+                    continue
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    queue = getattr(pool, "pool", None)
+                    hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                        "connections": getattr(pool, "num_connections", None),
+                        "requests": getattr(pool, "num_requests", None),
+                        "idle": queue.qsize() if queue is not None else None,
+                        "max_size": queue.maxsize if queue is not None else None,
+                    }
+        return {
+            "pool_size": self.pool_size,
+            "async_pool_size": self.async_pool_size,
+            "keepalive_expiry": self.keepalive_expiry,
+            "http2": self.http2,
+            "sync": hosts,
+            "async": self.async_stats(transports),
+        }
+
+    @staticmethod
+    def async_stats(transports: List[SharedAsyncTransport]) -> Dict[str, Optional[int]]:
+        # httpx no expone sus conexiones; si cambia el pool interno solo se pierden los conteos
+        connections = []
+        for transport in transports:
+            pool_connections = getattr(getattr(transport, "_pool", None), "connections", None)
+            if pool_connections is None:
+                return {"connections": None, "idle": None}
+            connections.extend(pool_connections)
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+        }
+
+
+# Crear una instancia compartida por todos los clientes de GitHub
+http_pool = HttpPool()
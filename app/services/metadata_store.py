@@ -0,0 +1,408 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from functools import cached_property
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from app.models.repository_model import RepositorySnapshot
+from app.models.teams_model import Team
+
+load_dotenv()
+
+# Archivo de la base de datos local si no se define METADATA_DB_PATH (":memory:" la deja solo en memoria).
+DEFAULT_METADATA_DB_PATH = "metadata.db"
+# Segundos que una fila se considera al dia antes de volver a pedirla a GitHub.
+METADATA_MAX_AGE = int(os.getenv("METADATA_MAX_AGE", "900"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    full_name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    snapshot TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS repositories_name ON repositories (name);
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    team TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS team_repositories (
+    slug TEXT PRIMARY KEY,
+    repositories TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activity (
+    full_name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    actions INTEGER NOT NULL,
+    PRIMARY KEY (full_name, day)
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    actor TEXT,
+    org TEXT,
+    public INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_repo ON events (repo, created_at, id);
+CREATE INDEX IF NOT EXISTS events_actor ON events (actor, created_at, id);
+CREATE INDEX IF NOT EXISTS events_created ON events (created_at, id);
+CREATE TABLE IF NOT EXISTS event_feeds (
+    path TEXT PRIMARY KEY,
+    repo TEXT,
+    last_event_id INTEGER,
+    poll_interval INTEGER NOT NULL,
+    polled_at REAL NOT NULL
+);
+"""
+
+
+class MetadataStore:
+    '''
+    Guarda en SQLite los datos que producen los servicios (snapshots de repositorios con sus
+    pull requests, issues, ramas, lenguajes y colaboradores, y los equipos con sus miembros)
+    junto con la fecha en que se consultaron, para no pedirlos de nuevo a GitHub mientras
+    sigan al dia.
+
+    Cada repositorio es una fila con su snapshot: los pull requests, issues y ramas se guardan
+    como los conteos que sirven las estadisticas y no como una fila por elemento. Guardar cada
+    pull request, issue y rama obligaria a listarlos todos en GitHub, que es justo lo que evitan
+    los conteos por totalCount, GraphQL y la API de busqueda; los webhooks ajustan esos conteos
+    sin volver a consultar. La fecha de consulta es por repositorio.
+
+    La base de datos se abre en el primer uso (o al arrancar la aplicacion), no al importar.
+    '''
+
+    def __init__(self, path: Optional[str] = None, max_age: int = METADATA_MAX_AGE):
+        # Sin ruta se usa METADATA_DB_PATH, que se lee al abrir la base de datos
+        self.path = path
+        self.max_age = max_age
+        self.lock = threading.Lock()
+
+    @cached_property
+    def connection(self) -> sqlite3.Connection:
+        # Los metodos la usan con el candado tomado, asi que se abre una sola vez
+        if self.path is None:
+            self.path = os.getenv("METADATA_DB_PATH", DEFAULT_METADATA_DB_PATH)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def open(self):
+        '''
+        Abre la base de datos si todavia no esta abierta, para que un error en la ruta
+        aparezca al arrancar y no en la primera consulta.
+        '''
+        with self.lock:
+            self.connection
+
+    def is_fresh(self, fetched_at: float, max_age: Optional[int] = None) -> bool:
+        max_age = self.max_age if max_age is None else max_age
+        return time.time() - fetched_at <= max_age
+
+    def get_repository_snapshots(self, full_names: Iterable[str], max_age: Optional[int] = None) -> Dict[str, RepositorySnapshot]:
+        '''
+        Obtiene los snapshots guardados que siguen al dia.
+
+        Args:
+            "full_names": Los nombres completos ("propietario/nombre") de los repositorios.
+            "max_age": Segundos de antiguedad permitidos; por defecto METADATA_MAX_AGE.
+
+        Returns:
+            Dict: Los snapshots al dia por nombre completo; los vencidos o ausentes no se incluyen.
+        '''
+        full_names = list(full_names)
+        snapshots = {}
+        with self.lock:
+            # Se consulta por bloques para no pasar el limite de parametros de SQLite
+            for start in range(0, len(full_names), 500):
+                chunk = full_names[start:start + 500]
+                rows = self.connection.execute(
+                    f"SELECT full_name, snapshot, fetched_at FROM repositories WHERE full_name IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for full_name, snapshot, fetched_at in rows:
+                    if self.is_fresh(fetched_at, max_age):
+                        snapshots[full_name] = RepositorySnapshot.model_validate_json(snapshot)
+        return snapshots
+
+    def get_repository_snapshot(self, full_name: str, max_age: Optional[int] = None) -> Optional[RepositorySnapshot]:
+        return self.get_repository_snapshots([full_name], max_age).get(full_name)
+
+    def save_repository_snapshots(self, snapshots: Iterable[RepositorySnapshot]):
+        now = time.time()
+        rows = [
+            (f"{snapshot.owner}/{snapshot.name}", snapshot.owner, snapshot.name, snapshot.model_dump_json(), now)
+            for snapshot in snapshots
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO repositories (full_name, owner, name, snapshot, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def update_repository_snapshot(self, full_name: str, update: Callable[[RepositorySnapshot], RepositorySnapshot]) -> bool:
+        '''
+        Aplica un cambio a un snapshot guardado sin cambiar la fecha en que se consulto,
+        por ejemplo un evento de webhook que abre o cierra un pull request.
+
+        Args:
+            "full_name": El nombre completo ("propietario/nombre") del repositorio.
+            "update": La funcion que recibe el snapshot y devuelve el snapshot modificado.
+
+        Returns:
+            Bool: True si el repositorio estaba guardado y se modifico.
+        '''
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT snapshot FROM repositories WHERE full_name = ?", (full_name,)).fetchone()
+            if row is None:
+                return False
+            snapshot = update(RepositorySnapshot.model_validate_json(row[0]))
+            self.connection.execute("UPDATE repositories SET snapshot = ? WHERE full_name = ?", (snapshot.model_dump_json(), full_name))
+            return True
+
+    def delete_repository(self, full_name: str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM repositories WHERE full_name = ?", (full_name,))
+
+    def get_teams(self, max_age: Optional[int] = None) -> Optional[List[Team]]:
+        '''
+        Obtiene los equipos guardados si todos siguen al dia.
+
+        Args:
+            "max_age": Segundos de antiguedad permitidos; por defecto METADATA_MAX_AGE.
+
+        Returns:
+            List: Los equipos con sus miembros o None si no hay equipos guardados o alguno esta vencido.
+        '''
+        with self.lock:
+            rows = self.connection.execute("SELECT team, fetched_at FROM teams ORDER BY rowid").fetchall()
+        if not rows or not all(self.is_fresh(fetched_at, max_age) for _, fetched_at in rows):
+            return None
+        return [Team.model_validate_json(team) for team, _ in rows]
+
+    def save_teams(self, teams: List[Team]):
+        '''
+        Reemplaza los equipos guardados; los equipos que ya no existen se borran.
+        '''
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM teams")
+            self.connection.executemany(
+                "INSERT INTO teams (id, name, team, fetched_at) VALUES (?, ?, ?, ?)",
+                [(team.id, team.name, team.model_dump_json(), now) for team in teams],
+            )
+
+    def update_teams(self, update: Callable[[List[Team]], List[Team]]) -> bool:
+        '''
+        Aplica un cambio a los equipos guardados sin cambiar la fecha en que se consultaron.
+
+        Args:
+            "update": La funcion que recibe la lista de equipos y devuelve la lista modificada.
+
+        Returns:
+            Bool: True si habia equipos guardados y se modificaron.
+        '''
+        with self.lock, self.connection:
+            rows = self.connection.execute("SELECT team, fetched_at FROM teams ORDER BY rowid").fetchall()
+            if not rows:
+                return False
+            fetched_at = min(row[1] for row in rows)
+            teams = update([Team.model_validate_json(team) for team, _ in rows])
+            self.connection.execute("DELETE FROM teams")
+            self.connection.executemany(
+                "INSERT INTO teams (id, name, team, fetched_at) VALUES (?, ?, ?, ?)",
+                [(team.id, team.name, team.model_dump_json(), fetched_at) for team in teams],
+            )
+            return True
+
+    def get_team_repositories(self, slug: str, max_age: Optional[int] = None) -> Optional[List[dict]]:
+        '''
+        Obtiene los repositorios guardados de un equipo si siguen al dia.
+
+        Args:
+            "slug": El slug del equipo.
+            "max_age": Segundos de antiguedad permitidos; por defecto METADATA_MAX_AGE.
+
+        Returns:
+            List: Los repositorios del equipo (nombre, nombre completo, propietario y fecha de creacion)
+            o None si no estan guardados o vencieron.
+        '''
+        with self.lock:
+            row = self.connection.execute("SELECT repositories, fetched_at FROM team_repositories WHERE slug = ?", (slug,)).fetchone()
+        if row is None or not self.is_fresh(row[1], max_age):
+            return None
+        return json.loads(row[0])
+
+    def save_team_repositories(self, slug: str, repositories: List[dict]):
+        # Solo se guardan los campos que necesita un snapshot del repositorio
+        rows = [
+            {
+                "name": repository["name"],
+                "full_name": repository["full_name"],
+                "owner": {"login": repository["owner"]["login"]},
+                "created_at": repository.get("created_at"),
+            }
+            for repository in repositories
+        ]
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO team_repositories (slug, repositories, fetched_at) VALUES (?, ?, ?)",
+                (slug, json.dumps(rows), time.time()),
+            )
+
+    def delete_team_repositories(self, slug: str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM team_repositories WHERE slug = ?", (slug,))
+
+    def get_activity(self, full_name: str, days: Iterable[date]) -> Dict[date, int]:
+        '''
+        Obtiene las acciones guardadas de un repositorio en dias ya terminados. Un dia que
+        termino no cambia, por eso estas filas no vencen.
+
+        Args:
+            "full_name": El nombre completo ("propietario/nombre") del repositorio.
+            "days": Los dias que se quieren.
+
+        Returns:
+            Dict: Las acciones por dia; los dias sin guardar no se incluyen.
+        '''
+        days = [day.isoformat() for day in days]
+        if not days:
+            return {}
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT day, actions FROM activity WHERE full_name = ? AND day IN ({','.join('?' * len(days))})",
+                [full_name, *days],
+            ).fetchall()
+        return {date.fromisoformat(day): actions for day, actions in rows}
+
+    def save_activity(self, full_name: str, actions: Dict[date, int]):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO activity (full_name, day, actions) VALUES (?, ?, ?)",
+                [(full_name, day.isoformat(), count) for day, count in actions.items()],
+            )
+
+    def save_events(self, events: Iterable[dict]) -> int:
+        '''
+        Agrega eventos al registro local; los que ya estaban (mismo id) se ignoran.
+
+        Args:
+            "events": Los eventos con id, type, repo, actor, org, public y created_at
+            ("AAAA-MM-DD HH:MM:SS" en UTC).
+
+        Returns:
+            Int: El numero de eventos nuevos.
+        '''
+        rows = [
+            (event["id"], event["type"], event["repo"], event.get("actor"), event.get("org"), int(event["public"]), event["created_at"])
+            for event in events
+        ]
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO events (id, type, repo, actor, org, public, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self.connection.total_changes - before
+
+    def get_events(self, repos: Optional[Iterable[str]] = None, actor: Optional[str] = None,
+                   before: Optional[Tuple[str, int]] = None, limit: Optional[int] = None) -> List[dict]:
+        '''
+        Consulta el registro local de eventos del mas nuevo al mas viejo.
+
+        Args:
+            "repos": Los repositorios ("propietario/nombre") de los que se quieren eventos.
+            "actor": El login del usuario que hizo los eventos.
+            "before": Solo eventos anteriores a esta llave (fecha, id).
+            "limit": El numero maximo de eventos.
+
+        Returns:
+            List: Los eventos como diccionarios.
+        '''
+        conditions, params = [], []
+        if repos is not None:
+            repos = list(repos)
+            conditions.append(f"repo IN ({','.join('?' * len(repos))})")
+            params.extend(repos)
+        if actor is not None:
+            conditions.append("actor = ?")
+            params.append(actor)
+        if before is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        query = "SELECT id, type, repo, actor, org, public, created_at FROM events"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        columns = ("id", "type", "repo", "actor", "org", "public", "created_at")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_event_feeds(self) -> Dict[str, dict]:
+        with self.lock:
+            rows = self.connection.execute("SELECT path, repo, last_event_id, poll_interval, polled_at FROM event_feeds").fetchall()
+        return {
+            path: {"repo": repo, "last_event_id": last_event_id, "poll_interval": poll_interval, "polled_at": polled_at}
+            for path, repo, last_event_id, poll_interval, polled_at in rows
+        }
+
+    def get_polled_repositories(self) -> Set[str]:
+        with self.lock:
+            rows = self.connection.execute("SELECT repo FROM event_feeds WHERE repo IS NOT NULL").fetchall()
+        return {repo for repo, in rows}
+
+    def save_event_feed(self, path: str, repo: Optional[str], last_event_id: Optional[int], poll_interval: int):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO event_feeds (path, repo, last_event_id, poll_interval, polled_at) VALUES (?, ?, ?, ?, ?)",
+                (path, repo, last_event_id, poll_interval, time.time()),
+            )
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM repositories")
+            self.connection.execute("DELETE FROM teams")
+            self.connection.execute("DELETE FROM team_repositories")
+            self.connection.execute("DELETE FROM activity")
+            self.connection.execute("DELETE FROM events")
+            self.connection.execute("DELETE FROM event_feeds")
+
+    def stats(self) -> dict:
+        with self.lock:
+            repositories = self.connection.execute("SELECT COUNT(*), MIN(fetched_at) FROM repositories").fetchone()
+            teams = self.connection.execute("SELECT COUNT(*) FROM teams").fetchone()
+            team_repositories = self.connection.execute("SELECT COUNT(*) FROM team_repositories").fetchone()
+            activity = self.connection.execute("SELECT COUNT(*) FROM activity").fetchone()
+            events = self.connection.execute("SELECT COUNT(*) FROM events").fetchone()
+            feeds = self.connection.execute("SELECT COUNT(*) FROM event_feeds").fetchone()
+        return {
+            "path": self.path,
+            "max_age": self.max_age,
+            "repositories": repositories[0],
+            "oldest_repository_age": round(time.time() - repositories[1], 1) if repositories[1] else None,
+            "teams": teams[0],
+            "team_repositories": team_repositories[0],
+            "activity_days": activity[0],
+            "events": events[0],
+            "event_feeds": feeds[0],
+        }
+
+
+# Crear una instancia del almacen compartido por los servicios
+metadata_store = MetadataStore()
@@ -0,0 +1,70 @@
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, TypeVar
+from github.PaginatedList import PaginatedList
+from token_1 import my_git
+from app.services.github_async import GITHUB_PAGE_SIZE, PAGE_PREFETCH_CONCURRENCY
+
+# token_1 crea el cliente con per_page y seconds_between_requests (ver README); el tamano
+# de pagina se fija tambien aqui porque iterate_pages reconoce la ultima pagina por su largo
+my_git.per_page = GITHUB_PAGE_SIZE
+
+T = TypeVar("T")
+
+
+def iterate_pages(items: Iterable[T], max_workers: Optional[int] = None, page_size: int = GITHUB_PAGE_SIZE) -> Iterator[T]:
+    '''
+    Recorre un listado paginado de PyGithub pidiendo varias paginas al mismo tiempo.
+    La primera pagina se pide sola y si viene incompleta no hay mas; las siguientes se piden
+    en un pool de hilos con una ventana que empieza en una pagina y se duplica con cada
+    pagina completa. El listado termina en la primera pagina incompleta, sin pedir el
+    conteo total, y los elementos se entregan en orden a medida que llegan.
+
+    Args:
+        "items": Un PaginatedList de PyGithub (cualquier otro iterable se recorre tal cual).
+        "max_workers": El numero maximo de paginas en vuelo; por defecto GITHUB_PAGE_PREFETCH.
+        "page_size": El per_page del cliente que creo el listado; por defecto GITHUB_PAGE_SIZE.
+
+    Returns:
+        Iterator: Los elementos del listado, en orden.
+    '''
+    if not isinstance(items, PaginatedList):
+        yield from items
+        return
+
+    first_page = items.get_page(0)
+    yield from first_page
+    if len(first_page) < page_size:
+        return
+
+    workers = max_workers or PAGE_PREFETCH_CONCURRENCY
+    if workers <= 1:
+        page_number = 1
+        while True:
+            page = items.get_page(page_number)
+            yield from page
+            if len(page) < page_size:
+                return
+            page_number += 1
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    next_page = 1
+    window = 1
+    try:
+        while True:
+            # Al final del listado sobran a lo sumo las paginas que quedaron en vuelo
+            while len(pending) < window:
+                context = contextvars.copy_context()
+                pending.append(executor.submit(context.run, items.get_page, next_page))
+                next_page += 1
+            page = pending.popleft().result()
+            yield from page
+            if len(page) < page_size:
+                return
+            window = min(window * 2, workers)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+import httpx
+from dotenv import load_dotenv
+from github import GithubException
+
+load_dotenv()
+
+# Peticiones que se guardan para los endpoints interactivos; los trabajos en segundo plano no las usan.
+RATE_LIMIT_RESERVE = int(os.getenv("RATE_LIMIT_RESERVE", "500"))
+# Por debajo de este presupuesto los trabajos en segundo plano reparten las peticiones hasta el reset.
+RATE_LIMIT_PACE_BELOW = int(os.getenv("RATE_LIMIT_PACE_BELOW", "1500"))
+# Segundos maximos que espera una peticion interactiva antes de fallar.
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "30"))
+# Reintentos de una peticion rechazada por el limite secundario.
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "2"))
+# Espera por defecto ante el limite secundario cuando GitHub no envia Retry-After.
+SECONDARY_LIMIT_BACKOFF = float(os.getenv("SECONDARY_LIMIT_BACKOFF", "60"))
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Prioridad de las peticiones del contexto actual; el actualizador de snapshots usa BACKGROUND.
+request_priority: ContextVar[str] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+class RateLimitExceeded(Exception):
+    '''
+    Se lanza cuando una peticion interactiva tendria que esperar mas de RATE_LIMIT_MAX_WAIT.
+    '''
+
+    def __init__(self, wait: float):
+        self.wait = wait
+        super().__init__(f"Limite de peticiones de GitHub agotado, reintente en {int(wait) + 1} segundos")
+
+
+def rate_limit_error(error: BaseException) -> Optional[RateLimitExceeded]:
+    '''
+    Reconoce los errores por el limite de peticiones de GitHub que siguen fallando despues de
+    los reintentos: un RateLimitExceeded, o un 403/429 del cliente asincrono (httpx) o de PyGithub.
+
+    Args:
+        "error": El error que se quiere revisar.
+
+    Returns:
+        RateLimitExceeded: El error con los segundos a esperar, o None si no es por el limite
+        (por ejemplo un 403 de permisos).
+    '''
+    if isinstance(error, RateLimitExceeded):
+        return error
+    if isinstance(error, httpx.HTTPStatusError):
+        status, headers, body = error.response.status_code, error.response.headers, error.response.text
+    elif isinstance(error, GithubException):
+        status, headers, body = error.status, error.headers or {}, str(error.data)
+    else:
+        return None
+    if status not in (403, 429):
+        return None
+
+    headers = {name.lower(): value for name, value in headers.items()}
+    if "retry-after" in headers:
+        wait = float(headers["retry-after"])
+    elif headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+        wait = max(0.0, float(headers["x-ratelimit-reset"]) - time.time())
+    elif status == 429 or "rate limit" in body.lower():
+        wait = SECONDARY_LIMIT_BACKOFF
+    else:
+        return None
+    return RateLimitExceeded(wait)
+
+
+def raise_if_rate_limited(error: BaseException):
+    # Los routers convierten cualquier error en un 500; el limite de GitHub debe llegar como 429
+    limited = rate_limit_error(error)
+    if limited is not None:
+        raise limited from error
+
+
+@dataclass
+class RateLimitBudget:
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset: float = 0.0
+    blocked_until: float = 0.0
+    next_slot: float = 0.0
+    secondary_hits: int = 0
+
+
+class RateLimiter:
+    '''
+    Planificador por token de todas las peticiones a GitHub. Lleva el presupuesto con las
+    cabeceras X-RateLimit-* de cada respuesta, reparte las peticiones de los trabajos en
+    segundo plano hasta el reset (token bucket) y bloquea el token cuando GitHub responde
+    con el limite primario o secundario.
+    '''
+
+    def __init__(self, reserve: int = RATE_LIMIT_RESERVE, pace_below: int = RATE_LIMIT_PACE_BELOW,
+                 max_wait: float = RATE_LIMIT_MAX_WAIT, retries: int = RATE_LIMIT_RETRIES):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.max_wait = max_wait
+        self.retries = retries
+        self.budgets: Dict[str, RateLimitBudget] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(authorization: Optional[str], resource: str = "core") -> str:
+        # El presupuesto es del token y del recurso (GitHub lleva limites separados para
+        # core, search y graphql), sin importar el esquema ("token" o "Bearer");
+        # se guarda un resumen del token y no el token
+        token = (authorization or "").split(" ")[-1]
+        return f"{hashlib.sha256(token.encode()).hexdigest()[:12]}:{resource}"
+
+    @staticmethod
+    def resource(path: str) -> str:
+        '''
+        Obtiene el recurso del limite de peticiones al que se descuenta una ruta.
+
+        Args:
+            "path": La ruta o URL de la peticion.
+
+        Returns:
+            String: "search", "graphql" o "core".
+        '''
+        path = path.split("?", 1)[0]
+        if "/search/" in path:
+            return "search"
+        if path.endswith("/graphql"):
+            return "graphql"
+        return "core"
+
+    def budget(self, key: str) -> RateLimitBudget:
+        return self.budgets.setdefault(key, RateLimitBudget())
+
+    def reserve_slot(self, key: str, priority: Optional[str] = None) -> float:
+        '''
+        Reserva una peticion en el presupuesto del token y calcula cuanto debe esperar.
+
+        Args:
+            "key": La llave del token (ver RateLimiter.key).
+            "priority": INTERACTIVE o BACKGROUND; por defecto la del contexto actual.
+
+        Returns:
+            Float: Los segundos que se debe esperar antes de enviar la peticion.
+        '''
+        priority = priority or request_priority.get()
+        now = time.time()
+        with self.lock:
+            budget = self.budget(key)
+            if budget.reset and now >= budget.reset:
+                # Empezo una nueva ventana: el presupuesto real llega con la siguiente respuesta
+                budget.remaining = None
+                budget.reset = 0.0
+            wait = max(0.0, budget.blocked_until - now)
+            if budget.remaining is not None:
+                until_reset = max(0.0, budget.reset - now)
+                if budget.remaining <= 0:
+                    wait = max(wait, until_reset)
+                elif priority == BACKGROUND and budget.remaining <= self.reserve:
+                    wait = max(wait, until_reset)
+                elif priority == BACKGROUND and budget.remaining < self.pace_below:
+                    spacing = until_reset / (budget.remaining - self.reserve)
+                    slot = max(now, budget.next_slot)
+                    budget.next_slot = slot + spacing
+                    wait = max(wait, slot - now)
+                budget.remaining -= 1
+        if priority == INTERACTIVE and wait > self.max_wait:
+            raise RateLimitExceeded(wait)
+        return wait
+
+    def update(self, key: str, status: int, headers: Mapping[str, str], body: str = "") -> Optional[float]:
+        '''
+        Actualiza el presupuesto con las cabeceras de una respuesta.
+
+        Args:
+            "key": La llave del token.
+            "status": El codigo de estado de la respuesta.
+            "headers": Las cabeceras de la respuesta.
+            "body": El cuerpo, para reconocer el limite secundario cuando no hay Retry-After.
+
+        Returns:
+            Float: Los segundos a esperar antes de reintentar si la respuesta fue un rechazo
+            por limite, o None si la respuesta no fue un rechazo.
+        '''
+        headers = {name.lower(): value for name, value in headers.items()}
+        now = time.time()
+        with self.lock:
+            budget = self.budget(key)
+            if "x-ratelimit-remaining" in headers:
+                budget.remaining = int(headers["x-ratelimit-remaining"])
+                budget.limit = int(headers.get("x-ratelimit-limit", budget.limit or 0)) or budget.limit
+                budget.reset = float(headers.get("x-ratelimit-reset", budget.reset))
+
+            if status not in (403, 429):
+                budget.secondary_hits = 0
+                return None
+
+            if "retry-after" in headers:
+                wait = float(headers["retry-after"])
+            elif budget.remaining == 0 and budget.reset:
+                wait = max(0.0, budget.reset - now)
+            elif "rate limit" in body.lower():
+                # Limite secundario sin Retry-After: se espera cada vez mas
+                wait = SECONDARY_LIMIT_BACKOFF * 2 ** budget.secondary_hits
+            else:
+                # Un 403 de permisos no tiene que ver con el limite
+                return None
+            budget.secondary_hits += 1
+            budget.blocked_until = max(budget.blocked_until, now + wait)
+            return wait
+
+    def should_retry(self, attempt: int, wait: Optional[float], priority: Optional[str] = None) -> bool:
+        if wait is None or attempt >= self.retries:
+            return False
+        return (priority or request_priority.get()) == BACKGROUND or wait <= self.max_wait
+
+    def acquire(self, key: str):
+        wait = self.reserve_slot(key)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, key: str):
+        wait = self.reserve_slot(key)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def score(self, key: str, default: float) -> float:
+        '''
+        Estima el presupuesto disponible de un token para elegir entre varios tokens.
+
+        Args:
+            "key": La llave del token.
+            "default": El valor para un token del que aun no hay cabeceras.
+
+        Returns:
+            Float: Las peticiones restantes, o un valor negativo si el token esta bloqueado.
+        '''
+        now = time.time()
+        with self.lock:
+            budget = self.budgets.get(key)
+            if budget is None:
+                return default
+            if budget.blocked_until > now:
+                return -(budget.blocked_until - now)
+            if budget.remaining is None or (budget.reset and now >= budget.reset):
+                return default
+            return budget.remaining
+
+    def remaining(self, key: str) -> Optional[int]:
+        with self.lock:
+            return self.budget(key).remaining
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self.lock:
+            return {
+                key: {
+                    "limit": budget.limit,
+                    "remaining": budget.remaining,
+                    "reset_in": round(max(0.0, budget.reset - now), 1) if budget.reset else None,
+                    "blocked_for": round(max(0.0, budget.blocked_until - now), 1),
+                }
+                for key, budget in self.budgets.items()
+            }
+
+    def clear(self):
+        with self.lock:
+            self.budgets.clear()
+
+
+# Crear una instancia del planificador compartido por los clientes de GitHub
+rate_limiter = RateLimiter()
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+from app.services.rate_limiter import BACKGROUND, request_priority
+
+load_dotenv()
+
+# Segundos que el indice se considera al dia antes de buscar repositorios nuevos o actualizados.
+REPOSITORY_INDEX_TTL = int(os.getenv("REPOSITORY_INDEX_TTL", "300"))
+# Segundos despues de los cuales el indice se reconstruye completo (repositorios borrados o renombrados).
+REPOSITORY_INDEX_FULL_TTL = int(os.getenv("REPOSITORY_INDEX_FULL_TTL", "3600"))
+
+
+class RepositoryIndex:
+    '''
+    Indice en memoria de los repositorios por nombre y por "propietario/nombre".
+    Se llena una vez con el listado completo y despues se actualiza de forma incremental
+    pidiendo solo los repositorios actualizados desde la ultima vez. Los listados se hacen
+    en un hilo aparte: una busqueda nunca espera el listado de la organizacion.
+    '''
+
+    def __init__(self, list_repositories: Callable, fetch_repository: Callable[[str], Optional[object]],
+                 ttl: int = REPOSITORY_INDEX_TTL, full_ttl: int = REPOSITORY_INDEX_FULL_TTL):
+        self.list_repositories = list_repositories
+        self.fetch_repository = fetch_repository
+        self.ttl = ttl
+        self.full_ttl = full_ttl
+        self.by_name: Dict[str, object] = {}
+        self.by_full_name: Dict[str, object] = {}
+        self.refreshed_at: Optional[float] = None
+        self.rebuilt_at: Optional[float] = None
+        self.last_updated_at: Optional[datetime] = None
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    @staticmethod
+    def full_name(repository) -> str:
+        return f"{repository.owner.login}/{repository.name}"
+
+    def add(self, repository):
+        full_name = self.full_name(repository)
+        self.by_full_name[full_name] = repository
+        # Si dos propietarios tienen un repositorio con el mismo nombre, se queda el primero del listado
+        current = self.by_name.get(repository.name)
+        if current is None or self.full_name(current) == full_name:
+            self.by_name[repository.name] = repository
+
+        updated_at = getattr(repository, "updated_at", None)
+        if isinstance(updated_at, datetime) and (self.last_updated_at is None or updated_at > self.last_updated_at):
+            self.last_updated_at = updated_at
+
+    def is_fresh(self) -> bool:
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at < self.ttl
+
+    def rebuild(self):
+        # El listado se pide sin el candado; solo el cambio de los diccionarios lo toma
+        listing = list(self.list_repositories())
+        with self.lock:
+            self.by_name = {}
+            self.by_full_name = {}
+            self.last_updated_at = None
+            for repository in listing:
+                self.add(repository)
+            self.rebuilt_at = self.refreshed_at = time.monotonic()
+
+    def refresh(self):
+        '''
+        Actualiza el indice. La primera vez (o cuando vence REPOSITORY_INDEX_FULL_TTL) lista todos
+        los repositorios; las demas veces lista por fecha de actualizacion y se detiene al llegar
+        a los repositorios que ya estaban en el indice. Si otro hilo ya esta actualizando el
+        indice no se espera: se busca en el indice actual (o directo en GitHub).
+        '''
+        if self.is_fresh() or not self.refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if self.is_fresh():
+                return
+            if self.rebuilt_at is None or self.last_updated_at is None or time.monotonic() - self.rebuilt_at >= self.full_ttl:
+                self.rebuild()
+                return
+
+            watermark = self.last_updated_at
+            updated = []
+            for repository in self.list_repositories(sort="updated", direction="desc"):
+                if repository.updated_at < watermark:
+                    break
+                updated.append(repository)
+            with self.lock:
+                for repository in updated:
+                    self.add(repository)
+                self.refreshed_at = time.monotonic()
+        finally:
+            self.refresh_lock.release()
+
+    def refresh_in_background(self):
+        '''
+        Actualiza el indice en un hilo aparte si vencio y no se esta actualizando ya.
+        '''
+        if self.is_fresh() or self.refresh_lock.locked():
+            return
+        threading.Thread(target=self.background_refresh, daemon=True).start()
+
+    def background_refresh(self):
+        # El listado cede el presupuesto de peticiones a los endpoints interactivos
+        request_priority.set(BACKGROUND)
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error al actualizar el indice de repositorios: {e}")
+            # Se vuelve a intentar cuando vence REPOSITORY_INDEX_TTL, no en cada busqueda
+            self.refreshed_at = time.monotonic()
+
+    def discard(self, repository):
+        '''
+        Quita del indice un repositorio que ya no existe, se renombro o ya no es accesible.
+
+        Args:
+            "repository": El repositorio que devolvio el indice.
+        '''
+        full_name = self.full_name(repository)
+        with self.lock:
+            if self.by_full_name.get(full_name) is repository:
+                del self.by_full_name[full_name]
+            if self.by_name.get(repository.name) is repository:
+                del self.by_name[repository.name]
+
+    def get(self, repo_name: str) -> Optional[object]:
+        if "/" in repo_name:
+            return self.by_full_name.get(repo_name)
+        return self.by_name.get(repo_name)
+
+    def find(self, repo_name: str) -> Optional[object]:
+        '''
+        Busca un repositorio por nombre o por "propietario/nombre". Si no esta en el indice
+        (por ejemplo mientras se llena por primera vez) se pide directamente a GitHub y se
+        agrega al indice. Si el indice vencio se actualiza en segundo plano.
+
+        Args:
+            "repo_name": El nombre o el nombre completo del repositorio.
+
+        Returns:
+            Repository: El repositorio encontrado o None si no existe.
+        '''
+        self.refresh_in_background()
+        repository = self.get(repo_name)
+        if repository is None:
+            repository = self.fetch_repository(repo_name)
+            if repository is not None:
+                with self.lock:
+                    self.add(repository)
+        return repository
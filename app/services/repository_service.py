@@ -1,35 +1,118 @@
-from typing import List, Tuple
+import asyncio
+import os
+from functools import cached_property
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
 from datetime import datetime
+from dotenv import load_dotenv
 from fastapi import HTTPException, APIRouter
-from github import Github
+from github import Github, UnknownObjectException
+from starlette.concurrency import run_in_threadpool
 from token_1 import my_git
+from app.services.concurrency import MAX_WORKERS, gather_bounded, map_in_pool, stream_bounded
+from app.services.github_async import GITHUB_PAGE_SIZE, async_github, parse_github_date
+from app.services.graphql_service import GraphQLRepositoryBackend
+from app.services.metadata_store import MetadataStore, metadata_store
+from app.services.pagination import iterate_pages
+from app.services.rate_limiter import raise_if_rate_limited
+from app.services.search_counter import SearchCounter
+from app.services.repository_index import RepositoryIndex
 from app.models.repository_model import (
     Repositories,
     RepositoriesStats,
     Repository,
-    RepositoryStats
+    RepositoryStats,
+    RepositorySnapshot
 )
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+load_dotenv()
+
+# Backend para los conteos de las estadisticas: "rest" (una peticion por conteo), "graphql" (una consulta
+# por lote) o "search" (los conteos de pull requests e issues salen de la API de busqueda).
+STATS_BACKEND = os.getenv("STATS_BACKEND", "rest")
+ORG_NAME = os.getenv("ORG_NAME")
+
+# Campos que el modo rapido calcula solo con las paginas del listado y por eso son aproximados,
+# y campos que el listado no trae y el modo rapido deja vacios.
+FAST_REPOSITORIES_APPROXIMATE = ["lastUseDate", "state"]
+FAST_STATISTICS_APPROXIMATE = ["repositoriesActives", "repositoriesInactives", "issues", "percentages_languages"]
+FAST_STATISTICS_OMITTED = ["prsOpen", "prsClosed", "prsDependabot", "collaborators"]
+# Campos del resumen de un repositorio que necesitan consultar su ultimo commit.
+COMMIT_FIELDS = {"lastUseDate", "state"}
+
 repository_router = APIRouter()
 
+T = TypeVar("T")
+
 class RepositoryService:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, stats_backend: Optional[str] = None, store: Optional[MetadataStore] = None):
         self.github_client = my_git
-
-    def get_repositories_from_github(self) -> List:
+        self.async_client = async_github
+        self.store = store or metadata_store
+        self.max_workers = max_workers or MAX_WORKERS
+        self.stats_backend = stats_backend or STATS_BACKEND
+        self.graphql_backend = GraphQLRepositoryBackend(self.async_client, self.calculate_state)
+        self.search_counter = SearchCounter(self.async_client)
+        self.repository_index = RepositoryIndex(self.get_repositories_from_github, self.fetch_repository)
+
+    @cached_property
+    def user(self):
+        # El usuario autenticado se obtiene al primer uso y se reutiliza en cada peticion
+        return self.github_client.get_user()
+
+    def get_repositories_from_github(self, **params) -> List:
         '''
         Obtiene los repositorios mediante la api de Github.
 
+        Args:
+            "params": Parametros opcionales del listado, por ejemplo sort="updated".
+
         Returns:
             List: Una lista de diccionarios, donde cada diccionario contiene la información de un repositorio.
         '''
         try:
-            user = self.github_client.get_user()
-            return user.get_repos()
+            return self.user.get_repos(**params)
         except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener los repositorios: {e}")
 
+    def fetch_repository(self, repo_name: str):
+        '''
+        Obtiene un repositorio directamente por su nombre completo, sin listar los repositorios.
+        Si solo se tiene el nombre se prueba con el usuario autenticado y con la organizacion.
+
+        Args:
+            "repo_name": El nombre o el nombre completo ("propietario/nombre") del repositorio.
+
+        Returns:
+            Repository: El repositorio o None si no existe.
+        '''
+        if "/" in repo_name:
+            candidates = [repo_name]
+        else:
+            candidates = [f"{self.user.login}/{repo_name}"]
+            if ORG_NAME:
+                candidates.append(f"{ORG_NAME}/{repo_name}")
+
+        for full_name in candidates:
+            try:
+                return self.github_client.get_repo(full_name)
+            except UnknownObjectException:
+                continue
+        return None
+
+    def find_repository(self, repo_name: str):
+        '''
+        Busca un repositorio en el indice por nombre, sin recorrer todo el listado de repositorios.
+
+        Args:
+            "repo_name": El nombre o el nombre completo ("propietario/nombre") del repositorio.
+
+        Returns:
+            Repository: El repositorio o None si no existe.
+        '''
+        return self.repository_index.find(repo_name)
+
     def get_last_commit_date(self, repository) -> datetime:
         '''
         Obtiene la fecha del ultimo commit realizado en un repositorio.
@@ -58,35 +141,145 @@ class RepositoryService:
             String: El estado de un repositorio (solo en el proyecto).
         '''
         try:
-            fecha_actual = datetime.now()
             date_last_commit = self.get_last_commit_date(repository)
-            if date_last_commit:
-                diferencia_meses = (fecha_actual.year - date_last_commit.year) * 12 + fecha_actual.month - date_last_commit.month
-                return "Inactivo" if diferencia_meses >= 5 else "Activo"
-            return "No hay commits"
+            return self.calculate_state(date_last_commit)
         except Exception as e:
             print(f"Error al obtener estado del repositorio: {str(e)}")
             return "No hay commits"
 
-    def count_state_repositories(self, repos) -> Tuple[int, int]:
+    def calculate_state(self, date_last_commit) -> str:
+        '''
+        Calcula el estado de un repositorio a partir de la fecha de su ultimo commit.
+
+        Args:
+            "date_last_commit": La fecha del ultimo commit o None si no tiene commits.
+
+        Returns:
+            String: El estado de un repositorio (solo en el proyecto).
+        '''
+        if date_last_commit:
+            fecha_actual = datetime.now()
+            diferencia_meses = (fecha_actual.year - date_last_commit.year) * 12 + fecha_actual.month - date_last_commit.month
+            return "Inactivo" if diferencia_meses >= 5 else "Activo"
+        return "No hay commits"
+
+    def count_state_repositories(self, snapshots: List[RepositorySnapshot]) -> Tuple[int, int]:
         '''
         Cuenta el total de los repositorios con su respectivo estado.
 
         Args:
-            "repos": Necesita tener una lista de repositorios para contar.
+            "snapshots": Necesita tener una lista de snapshots de repositorios para contar,
+            el estado ya viene calculado en cada snapshot y no se consulta de nuevo a GitHub.
             
         Returns:
             Tuple: Una tupla con el conteo de los repositorios.
         '''
         active_count = inactive_count = 0
-        for repository in repos:
-            state = self.get_repository_state(repository)
-            if state == "Activo":
+        for snapshot in snapshots:
+            if snapshot.state == "Activo":
                 active_count += 1
-            elif state == "Inactivo":
+            elif snapshot.state == "Inactivo":
                 inactive_count += 1
         return active_count, inactive_count
 
+    def collect_repository_snapshot(self, repository) -> RepositorySnapshot:
+        '''
+        Recolecta en una sola pasada los datos de un repositorio que necesitan las estadisticas.
+        Los pulls se listan una sola vez (state="all") y de ahi se derivan los abiertos, cerrados
+        y los de dependabot; los issues se cuentan con totalCount sin recorrerlos.
+
+        Args:
+            "repository": Necesita tener un repositorio para recolectar sus datos.
+
+        Returns:
+            RepositorySnapshot: Un modelo con los datos del repositorio.
+        '''
+        prs_open = prs_closed = prs_dependabot = 0
+        for pr in iterate_pages(repository.get_pulls(state="all")):
+            if pr.state == "open":
+                prs_open += 1
+            else:
+                prs_closed += 1
+            if pr.user and pr.user.login.startswith("dependabot"):
+                prs_dependabot += 1
+
+        collaborators = []
+        try:
+            collaborators = [collaborator.login for collaborator in iterate_pages(repository.get_collaborators())]
+        except Exception as e:
+            print(f"error: {e}")
+
+        date_last_commit = self.get_last_commit_date(repository)
+
+        return RepositorySnapshot(
+            name=repository.name,
+            owner=repository.owner.login,
+            createDate=repository.created_at,
+            lastUseDate=date_last_commit,
+            state=self.calculate_state(date_last_commit),
+            prsOpen=prs_open,
+            prsClosed=prs_closed,
+            prsDependabot=prs_dependabot,
+            issues=repository.get_issues().totalCount,
+            collaborators=collaborators,
+            languages=repository.get_languages(),
+        )
+
+    def build_statistics(self, snapshots: List[RepositorySnapshot]) -> RepositoriesStats:
+        '''
+        Arma las estadisticas totales a partir de los snapshots de los repositorios.
+
+        Args:
+            "snapshots": Necesita tener la lista de snapshots de los repositorios.
+
+        Returns:
+            RepositoriesStats: Un modelo que contiene los conteos de los detalles de un repositorio.
+        '''
+        total_bytes_by_language = {}
+        collaborators_count = set()
+        for snapshot in snapshots:
+            collaborators_count.update(snapshot.collaborators)
+            for lang, bytes_count in snapshot.languages.items():
+                total_bytes_by_language[lang] = total_bytes_by_language.get(lang, 0) + bytes_count
+
+        total_bytes = sum(total_bytes_by_language.values())
+        languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in total_bytes_by_language.items()}
+        percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
+
+        active_e_inactive_count = self.count_state_repositories(snapshots)
+
+        return RepositoriesStats(
+            repositories=len(snapshots),
+            repositoriesActives=active_e_inactive_count[0],
+            repositoriesInactives=active_e_inactive_count[1],
+            prsOpen=sum(snapshot.prsOpen for snapshot in snapshots),
+            prsClosed=sum(snapshot.prsClosed for snapshot in snapshots),
+            prsDependabot=sum(snapshot.prsDependabot for snapshot in snapshots),
+            collaborators=len(collaborators_count),
+            issues=sum(snapshot.issues for snapshot in snapshots),
+            percentages_languages=percentages,
+        )
+
+    def build_repository_summary(self, repository) -> Repositories:
+        '''
+        Arma el resumen de un repositorio para el listado de repositorios.
+
+        Args:
+            "repository": Necesita tener un repositorio para armar su resumen.
+
+        Returns:
+            Repositories: Un modelo con el nombre, propietario, estado y fechas del repositorio.
+        '''
+        # El estado se calcula con la misma fecha del ultimo commit, sin pedir los commits dos veces
+        date_last_commit = self.get_last_commit_date(repository)
+        return Repositories(
+            owner=repository.owner.login,
+            name=repository.name,
+            createDate=repository.created_at,
+            lastUseDate=date_last_commit,
+            state=self.calculate_state(date_last_commit)
+        )
+
     def get_repositories(self) -> List[Repositories]:
         '''
         Obtiene todos los repositorios.
@@ -97,17 +290,9 @@ class RepositoryService:
         '''
         try:
             repos = self.get_repositories_from_github()
-            repositories = []
-            for repository in repos:
-                repositories.append(Repositories(
-                    owner=repository.owner.login,
-                    name=repository.name,
-                    createDate=repository.created_at,
-                    lastUseDate=self.get_last_commit_date(repository),
-                    state=self.get_repository_state(repository)
-                ))
-            return repositories
+            return map_in_pool(self.build_repository_summary, repos, self.max_workers)
         except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener los repositorios: {e}")
 
     def get_statistics_of_repositories(self) -> RepositoriesStats:
@@ -118,63 +303,500 @@ class RepositoryService:
             RepositoriesStats: Un modelo que contiene los conteos de los detalles de un repositorio.
         '''
         try:
-            repos = self.get_repositories_from_github()
-            total_bytes_by_language = {}
-            prs_open_count = []
-            prs_closed_count = []
-            collaborators_count = set()
-            issues_list = []
-            dependabot_pr_count = 0
-            total_repos = repos.totalCount
-
-            for repository in repos:
-                issues = repository.get_issues()
-                for issue in issues:
-                    issues_list.append(issue.title)
-
-                prs_open = repository.get_pulls(state="open")
-                prs_open_count.extend(prs_open)
-
-                prs_closed = repository.get_pulls(state="closed")
-                prs_closed_count.extend(prs_closed)
-                try:
-                    collaborators = repository.get_collaborators()
-                    for collaborator in collaborators:
-                        collaborators_count.add(collaborator.login)
-                except Exception as e:
-                    print(f"error: {e}")
-                pull_requests = repository.get_pulls(state="all")
-                dependabot_prs = [pr for pr in pull_requests if pr.user.login.startswith("dependabot")]
-                dependabot_pr_count += len(dependabot_prs)
-
-                langs = repository.get_languages()
-                for lang, bytes_count in langs.items():
-                    if lang in total_bytes_by_language:
-                        total_bytes_by_language[lang] += bytes_count
-                    else:
-                        total_bytes_by_language[lang] = bytes_count
-
-            total_bytes = sum(total_bytes_by_language.values())
-            languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in total_bytes_by_language.items()}
-            percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
-
-            active_e_inactive_count = self.count_state_repositories(repos)
-
-            return RepositoriesStats(
-                repositories=total_repos,
-                repositoriesActives=active_e_inactive_count[0],
-                repositoriesInactives=active_e_inactive_count[1],
-                prsOpen=len(prs_open_count),
-                prsClosed=len(prs_closed_count),
-                prsDependabot=dependabot_pr_count,
-                collaborators=len(collaborators_count),
-                issues=len(issues_list),
-                percentages_languages=percentages,
-            )
+            repos = list(self.get_repositories_from_github())
+            full_names = [f"{repository.owner.login}/{repository.name}" for repository in repos]
+            stored = self.store.get_repository_snapshots(full_names)
+            missing = [repository for full_name, repository in zip(full_names, repos) if full_name not in stored]
+            fetched = map_in_pool(self.collect_repository_snapshot, missing, self.max_workers)
+            self.store.save_repository_snapshots(fetched)
+            return self.build_statistics(self.merge_snapshots(full_names, stored, fetched))
         except Exception as e:
+            raise_if_rate_limited(e)
             print(f"Error en get_statistics_of_repositories: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas del repositorio: {e}")
 
+    def merge_snapshots(self, full_names: List[str], stored: Dict[str, RepositorySnapshot], fetched: List[RepositorySnapshot]) -> List[RepositorySnapshot]:
+        '''
+        Junta los snapshots guardados con los recien consultados en el orden del listado.
+
+        Args:
+            "full_names": Los nombres completos de los repositorios en el orden del listado.
+            "stored": Los snapshots que seguian al dia en el almacen.
+            "fetched": Los snapshots consultados a GitHub.
+
+        Returns:
+            List: Los snapshots de los repositorios que existen, en el orden del listado.
+        '''
+        snapshots = {**stored, **{f"{snapshot.owner}/{snapshot.name}": snapshot for snapshot in fetched}}
+        return [snapshots[full_name] for full_name in full_names if full_name in snapshots]
+
+    async def get_last_commit_date_async(self, repository: dict) -> Optional[datetime]:
+        '''
+        Obtiene de forma asincrona la fecha del ultimo commit de un repositorio.
+
+        Args:
+            "repository": El repositorio tal como lo devuelve la API REST de GitHub.
+
+        Returns:
+            Datetime: La fecha del ultimo commit o None si no tiene commits.
+        '''
+        try:
+            commits = await self.async_client.get_json(f"/repos/{repository['full_name']}/commits", {"per_page": 1})
+            return parse_github_date(commits[0]["commit"]["committer"]["date"]) if commits else None
+        except Exception as e:
+            print(f"Error al obtener commits del repositorio: {str(e)}")
+            return None
+
+    async def build_repository_summary_async(self, repository: dict) -> Repositories:
+        '''
+        Arma de forma asincrona el resumen de un repositorio para el listado de repositorios.
+        El estado se calcula con la misma fecha del ultimo commit, sin pedirla dos veces.
+
+        Args:
+            "repository": El repositorio tal como lo devuelve la API REST de GitHub.
+
+        Returns:
+            Repositories: Un modelo con el nombre, propietario, estado y fechas del repositorio.
+        '''
+        date_last_commit = await self.get_last_commit_date_async(repository)
+        return Repositories(
+            owner=repository["owner"]["login"],
+            name=repository["name"],
+            createDate=parse_github_date(repository["created_at"]),
+            lastUseDate=date_last_commit,
+            state=self.calculate_state(date_last_commit)
+        )
+
+    async def collect_repository_snapshot_async(self, repository: dict, with_counts: bool = True) -> RepositorySnapshot:
+        '''
+        Version asincrona de collect_repository_snapshot: las consultas del repositorio
+        se hacen al mismo tiempo.
+
+        Args:
+            "repository": El repositorio tal como lo devuelve la API REST de GitHub.
+            "with_counts": Si es False no se listan los pull requests ni se cuentan los issues
+            (quedan en 0), para cuando los conteos salen de la API de busqueda.
+
+        Returns:
+            RepositorySnapshot: Un modelo con los datos del repositorio.
+        '''
+        full_name = repository["full_name"]
+
+        async def get_collaborators() -> List[str]:
+            try:
+                return [collaborator["login"] async for collaborator in self.async_client.paginate(f"/repos/{full_name}/collaborators")]
+            except Exception as e:
+                print(f"error: {e}")
+                return []
+
+        async def get_pulls() -> List[dict]:
+            if not with_counts:
+                return []
+            return [pr async for pr in self.async_client.paginate(f"/repos/{full_name}/pulls", {"state": "all"})]
+
+        async def count_issues() -> int:
+            if not with_counts:
+                return 0
+            return await self.async_client.count(f"/repos/{full_name}/issues")
+
+        pulls, collaborators, issues, languages, date_last_commit = await asyncio.gather(
+            get_pulls(),
+            get_collaborators(),
+            count_issues(),
+            self.async_client.get_json(f"/repos/{full_name}/languages"),
+            self.get_last_commit_date_async(repository),
+        )
+
+        prs_open = sum(1 for pr in pulls if pr["state"] == "open")
+        prs_dependabot = sum(1 for pr in pulls if pr.get("user") and pr["user"]["login"].startswith("dependabot"))
+
+        return RepositorySnapshot(
+            name=repository["name"],
+            owner=repository["owner"]["login"],
+            createDate=parse_github_date(repository["created_at"]),
+            lastUseDate=date_last_commit,
+            state=self.calculate_state(date_last_commit),
+            prsOpen=prs_open,
+            prsClosed=len(pulls) - prs_open,
+            prsDependabot=prs_dependabot,
+            issues=issues,
+            collaborators=collaborators,
+            languages=languages,
+        )
+
+    async def summarize_repository_async(self, repository: dict, snapshot: Optional[RepositorySnapshot] = None) -> Repositories:
+        '''
+        Arma el resumen de un repositorio desde su snapshot guardado si sigue al dia,
+        o consultando su ultimo commit si no.
+
+        Args:
+            "repository": El repositorio tal como lo devuelve la API REST de GitHub.
+            "snapshot": El snapshot guardado del repositorio o None.
+
+        Returns:
+            Repositories: Un modelo con el nombre, propietario, estado y fechas del repositorio.
+        '''
+        if snapshot is None:
+            return await self.build_repository_summary_async(repository)
+        return Repositories(
+            owner=snapshot.owner,
+            name=snapshot.name,
+            createDate=snapshot.createDate,
+            lastUseDate=snapshot.lastUseDate,
+            state=snapshot.state
+        )
+
+    async def get_repositories_page_async(self, fields: List[str], limit: int, offset: int = 0, fast: bool = False) -> Tuple[List[dict], Optional[int]]:
+        '''
+        Obtiene una pagina del listado de repositorios con solo los campos pedidos.
+        Las paginas de GitHub se leen una por una y se deja de paginar cuando la pagina esta
+        llena; el ultimo commit solo se consulta si se pidio lastUseDate o state.
+
+        Args:
+            "fields": Los campos del modelo Repositories que se quieren en la respuesta.
+            "limit": El numero maximo de repositorios de la pagina.
+            "offset": La posicion en el listado donde empieza la pagina.
+            "fast": Si es True lastUseDate y state salen del listado (ver get_repositories_fast_async).
+
+        Returns:
+            Tuple: Los repositorios de la pagina (diccionarios con los campos pedidos) y la
+            posicion de la siguiente pagina, o None si no hay mas repositorios.
+        '''
+        try:
+            page_size = GITHUB_PAGE_SIZE
+            page = offset // page_size + 1
+            skip = offset % page_size
+            repos = []
+            exhausted = False
+            while len(repos) <= limit:
+                params = {"per_page": page_size, "page": page} if page > 1 else {"per_page": page_size}
+                data = await self.async_client.get_json("/user/repos", params)
+                repos.extend(data[skip:])
+                skip = 0
+                if len(data) < page_size:
+                    exhausted = True
+                    break
+                page += 1
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener los repositorios: {e}")
+
+        next_offset = None if exhausted and len(repos) <= limit else offset + limit
+        repos = repos[:limit]
+
+        if fast or not COMMIT_FIELDS.intersection(fields):
+            summaries = [
+                {
+                    "owner": repository["owner"]["login"],
+                    "name": repository["name"],
+                    "createDate": parse_github_date(repository["created_at"]),
+                    "lastUseDate": parse_github_date(repository.get("pushed_at")),
+                    "state": self.calculate_listing_state(repository),
+                }
+                for repository in repos
+            ]
+        else:
+            stored = self.store.get_repository_snapshots(repository["full_name"] for repository in repos)
+            summaries = [
+                summary.model_dump()
+                for summary in await gather_bounded(lambda repository: self.summarize_repository_async(repository, stored.get(repository["full_name"])), repos)
+            ]
+        return [{field: summary[field] for field in fields} for summary in summaries], next_offset
+
+    async def stream_repositories_async(self, fast: bool = False) -> AsyncIterator[Repositories]:
+        '''
+        Entrega los resumenes de los repositorios a medida que estan listos, sin esperar a
+        todo el listado. Las paginas del listado se leen mientras se consultan los repositorios
+        y solo hay GITHUB_MAX_ASYNC_WORKERS repositorios en memoria a la vez.
+
+        Args:
+            "fast": Si es True los resumenes salen solo del listado (ver get_repositories_fast_async).
+
+        Returns:
+            AsyncIterator: Los resumenes de los repositorios en el orden en que terminan.
+        '''
+        async def summarize(repository: dict) -> Repositories:
+            if fast:
+                return Repositories(
+                    owner=repository["owner"]["login"],
+                    name=repository["name"],
+                    createDate=parse_github_date(repository["created_at"]),
+                    lastUseDate=parse_github_date(repository.get("pushed_at")),
+                    state=self.calculate_listing_state(repository)
+                )
+            return await self.summarize_repository_async(repository, self.store.get_repository_snapshot(repository["full_name"]))
+
+        async for summary in stream_bounded(summarize, self.async_client.paginate("/user/repos")):
+            yield summary
+
+    async def get_repositories_async(self) -> List[Repositories]:
+        '''
+        Version asincrona de get_repositories usada por el router.
+
+        Returns:
+            List: Una lista de repositorios con sus detalles.
+        '''
+        try:
+            repos = [repository async for repository in self.async_client.paginate("/user/repos")]
+            stored = self.store.get_repository_snapshots(repository["full_name"] for repository in repos)
+            return await gather_bounded(lambda repository: self.summarize_repository_async(repository, stored.get(repository["full_name"])), repos)
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener los repositorios: {e}")
+
+    async def get_statistics_of_repositories_async(self) -> RepositoriesStats:
+        '''
+        Version asincrona de get_statistics_of_repositories usada por el router.
+
+        Returns:
+            RepositoriesStats: Un modelo que contiene los conteos de los detalles de un repositorio.
+        '''
+        try:
+            repos = [repository async for repository in self.async_client.paginate("/user/repos")]
+            if self.stats_backend == "search":
+                return await self.get_statistics_with_search(repos)
+            return self.build_statistics(await self.get_repository_snapshots_async(repos))
+        except Exception as e:
+            raise_if_rate_limited(e)
+            print(f"Error en get_statistics_of_repositories_async: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas del repositorio: {e}")
+
+    async def get_repository_snapshots_async(self, repos: List[dict]) -> List[RepositorySnapshot]:
+        '''
+        Obtiene los snapshots de una lista de repositorios: los que siguen al dia salen del almacen
+        y solo los demas se consultan a GitHub (y se guardan para la siguiente consulta).
+
+        Args:
+            "repos": Los repositorios tal como los devuelve la API REST de GitHub.
+
+        Returns:
+            List: Los snapshots de los repositorios en el orden recibido.
+        '''
+        full_names = [repository["full_name"] for repository in repos]
+        stored = self.store.get_repository_snapshots(full_names)
+        missing = [repository for repository in repos if repository["full_name"] not in stored]
+        if self.stats_backend == "graphql":
+            fetched = await self.graphql_backend.fetch_snapshots(
+                [(repository["owner"]["login"], repository["name"]) for repository in missing]
+            )
+        else:
+            fetched = await gather_bounded(self.collect_repository_snapshot_async, missing)
+        self.store.save_repository_snapshots(fetched)
+        return self.merge_snapshots(full_names, stored, fetched)
+
+    async def get_statistics_with_search(self, repos: List[dict]) -> RepositoriesStats:
+        '''
+        Arma las estadisticas totales con los conteos de la API de busqueda: los pull requests
+        e issues de todos los repositorios se cuentan con pocas busquedas por lotes, y por cada
+        repositorio solo se piden los colaboradores, los lenguajes y el ultimo commit.
+
+        Args:
+            "repos": Los repositorios tal como los devuelve la API REST de GitHub.
+
+        Returns:
+            RepositoriesStats: Un modelo que contiene los conteos de los detalles de un repositorio.
+        '''
+        totals, snapshots = await asyncio.gather(
+            self.search_counter.count_totals([f"repo:{repository['full_name']}" for repository in repos]),
+            gather_bounded(lambda repository: self.collect_repository_snapshot_async(repository, with_counts=False), repos),
+        )
+        return self.build_statistics(snapshots).model_copy(update=totals)
+
+    def calculate_listing_state(self, repository: dict) -> str:
+        '''
+        Calcula el estado aproximado de un repositorio con los datos del listado: se usa la
+        fecha del ultimo push (de cualquier rama) en lugar del ultimo commit, y los
+        repositorios archivados cuentan como inactivos.
+
+        Args:
+            "repository": El repositorio tal como lo devuelve la API REST de GitHub.
+
+        Returns:
+            String: El estado aproximado del repositorio.
+        '''
+        if repository.get("archived"):
+            return "Inactivo"
+        return self.calculate_state(parse_github_date(repository.get("pushed_at")))
+
+    async def get_repositories_fast_async(self) -> List[Repositories]:
+        '''
+        Modo rapido de get_repositories: el estado y la fecha de ultimo uso salen del listado
+        (pushed_at), sin consultar los commits de cada repositorio.
+
+        Returns:
+            List: Una lista de repositorios con sus detalles aproximados.
+        '''
+        try:
+            return [
+                Repositories(
+                    owner=repository["owner"]["login"],
+                    name=repository["name"],
+                    createDate=parse_github_date(repository["created_at"]),
+                    lastUseDate=parse_github_date(repository.get("pushed_at")),
+                    state=self.calculate_listing_state(repository)
+                )
+                async for repository in self.async_client.paginate("/user/repos")
+            ]
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener los repositorios: {e}")
+
+    async def get_statistics_fast_async(self) -> RepositoriesStats:
+        '''
+        Modo rapido de get_statistics_of_repositories: todo sale de las paginas del listado.
+        Los issues son open_issues_count (incluye pull requests abiertos, igual que la API REST)
+        y los lenguajes se aproximan con el lenguaje principal de cada repositorio pesado por
+        su tamano. Los conteos de pull requests y colaboradores no estan en el listado y quedan vacios.
+
+        Returns:
+            RepositoriesStats: Un modelo con los conteos aproximados.
+        '''
+        try:
+            repos = [repository async for repository in self.async_client.paginate("/user/repos")]
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas del repositorio: {e}")
+
+        states = [self.calculate_listing_state(repository) for repository in repos]
+        size_by_language = {}
+        for repository in repos:
+            if repository.get("language"):
+                size_by_language[repository["language"]] = size_by_language.get(repository["language"], 0) + repository.get("size", 0)
+        total_size = sum(size_by_language.values())
+        percentages = [f"{lang}: {(size / total_size) * 100:.2f}%" for lang, size in size_by_language.items()] if total_size else []
+
+        return RepositoriesStats(
+            repositories=len(repos),
+            repositoriesActives=states.count("Activo"),
+            repositoriesInactives=states.count("Inactivo"),
+            prsOpen=None,
+            prsClosed=None,
+            prsDependabot=None,
+            collaborators=None,
+            issues=sum(repository.get("open_issues_count", 0) for repository in repos),
+            percentages_languages=percentages,
+        )
+
+    def build_repository_stats(self, snapshot: RepositorySnapshot) -> RepositoryStats:
+        '''
+        Arma las estadisticas de un repositorio a partir de su snapshot.
+
+        Args:
+            "snapshot": El snapshot del repositorio.
+
+        Returns:
+            RepositoryStats: Un modelo que contiene los atributos del repositorio.
+        '''
+        total_bytes = sum(snapshot.languages.values())
+        languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in snapshot.languages.items()}
+        percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
+
+        return RepositoryStats(
+            collaborators=len(snapshot.collaborators),
+            prsOpen=snapshot.prsOpen,
+            prsClosed=snapshot.prsClosed,
+            prsDependabot=snapshot.prsDependabot,
+            issues=snapshot.issues,
+            branches=snapshot.branches,
+            percentagesLanguages=percentages,
+        )
+
+    async def get_statistics_by_detail_async(self, repo_name: str) -> RepositoryStats:
+        '''
+        Version asincrona de get_statistics_by_detail usada por el router. Con el backend
+        GraphQL todos los conteos del repositorio salen de una sola consulta; con el backend
+        REST se usa la version sincrona en el pool de hilos.
+
+        Args:
+            "repo_name": Necesita tener el nombre del repositorio, 
+            para obtener las estadisticas del repositorio.
+
+        Returns:
+            RepositoryStats: Un modelo que contiene los atributos del repositorio.
+        '''
+        if self.stats_backend == "search":
+            return await self.get_statistics_by_detail_with_search(repo_name)
+        if self.stats_backend != "graphql":
+            return await run_in_threadpool(self.get_statistics_by_detail, repo_name)
+
+        try:
+            repository = await run_in_threadpool(self.find_repository, repo_name)
+            if not repository:
+                raise HTTPException(status_code=404, detail=f"El repositorio '{repo_name}' no existe")
+            # Los snapshots del listado REST no traen ramas; esos no sirven para el detalle
+            snapshot = self.store.get_repository_snapshot(f"{repository.owner.login}/{repository.name}")
+            if snapshot is not None and snapshot.branches is not None:
+                return self.build_repository_stats(snapshot)
+            snapshots = await self.graphql_backend.fetch_snapshots([(repository.owner.login, repository.name)])
+            if not snapshots:
+                raise HTTPException(status_code=404, detail=f"El repositorio '{repo_name}' no existe")
+            self.store.save_repository_snapshots(snapshots)
+            return self.build_repository_stats(snapshots[0])
+        except StarletteHTTPException as e:
+            raise e
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas detalladas del repositorio: {e}")
+
+    async def get_statistics_by_detail_with_search(self, repo_name: str) -> RepositoryStats:
+        '''
+        Muestra las estadisticas de un repositorio contando los pull requests e issues con la
+        API de busqueda y los colaboradores y ramas con una peticion de un elemento por pagina.
+
+        Args:
+            "repo_name": Necesita tener el nombre del repositorio.
+
+        Returns:
+            RepositoryStats: Un modelo que contiene los atributos del repositorio.
+        '''
+        try:
+            repository = await run_in_threadpool(self.find_repository, repo_name)
+            if not repository:
+                raise HTTPException(status_code=404, detail=f"El repositorio '{repo_name}' no existe")
+            full_name = f"{repository.owner.login}/{repository.name}"
+            totals, collaborators, branches, languages = await asyncio.gather(
+                self.search_counter.count_totals([f"repo:{full_name}"]),
+                self.async_client.count(f"/repos/{full_name}/collaborators"),
+                self.async_client.count(f"/repos/{full_name}/branches"),
+                self.async_client.get_json(f"/repos/{full_name}/languages"),
+            )
+            total_bytes = sum(languages.values())
+            percentages = [f"{lang}: {(bytes_count / total_bytes) * 100:.2f}%" for lang, bytes_count in languages.items()]
+            return RepositoryStats(
+                collaborators=collaborators,
+                branches=branches,
+                percentagesLanguages=percentages,
+                **totals,
+            )
+        except StarletteHTTPException as e:
+            raise e
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas detalladas del repositorio: {e}")
+
+    def find_and_build(self, repo_name: str, build: Callable[[Any], T]) -> T:
+        '''
+        Busca un repositorio y arma una respuesta con el. Si el indice tenia un repositorio que
+        despues se borro, se renombro o dejo de ser accesible, GitHub responde 404 al usarlo:
+        se quita del indice y se busca una vez mas.
+
+        Args:
+            "repo_name": El nombre o el nombre completo ("propietario/nombre") del repositorio.
+            "build": La funcion que recibe el repositorio y arma la respuesta.
+
+        Returns:
+            La respuesta armada; lanza HTTPException 404 si el repositorio no existe.
+        '''
+        for _ in range(2):
+            repository = self.find_repository(repo_name)
+            if not repository:
+                break
+            try:
+                return build(repository)
+            except UnknownObjectException:
+                self.repository_index.discard(repository)
+        raise HTTPException(status_code=404, detail=f"El repositorio '{repo_name}' no existe")
+
     def get_repository_detail(self, repo_name: str) -> Repository:
         '''
         Muestra los detalles del repositorio.
@@ -186,54 +808,54 @@ class RepositoryService:
             Repository: Un modelo que contiene los atributos del repositorio.
         '''
         try:
-            repos = self.get_repositories_from_github()
+            return self.find_and_build(repo_name, self.build_repository_detail)
+        except StarletteHTTPException as e:
+            raise e
         except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener los detalles del repositorio: {e}")
 
-        for repository in repos:
-            if repository.name == repo_name:
-                collaborators_list = [collaborator.login for collaborator in repository.get_collaborators()]
-
-                prs_open_list = [
-                    f"El pull #{pr.number}: {pr.title}. Asignado a: {pr.assignee.login if pr.assignee else 'N/A'}, fue creado el: {pr.created_at}"
-                    for pr in repository.get_pulls(state="open")
-                ]
-
-                prs_closed_list = [
-                    f"El pull #{pr.number}: {pr.title}. Asignado a: {pr.assignee.login if pr.assignee else 'N/A'}, fue creado el: {pr.created_at}"
-                    for pr in repository.get_pulls(state="closed")
-                ]
-
-                branches_details = [
-                    f"Nombre de rama: {br.name} --- Propietario: {repository.owner.login}"
-                    for br in repository.get_branches()
-                ]
-
-                issues_list = []
-                for iss in repository.get_issues():
-                    labels = [label.name for label in iss.labels]
-                    issues_list.append(
-                        f"El problema #{iss.number} Titulo: {iss.title} --- Descripción: {iss.body} --- Tipo: {', '.join(labels)}"
-                    )
-
-                langs = repository.get_languages()
-                total_bytes = sum(langs.values())
-                languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in langs.items()}
-                percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
-
-                return Repository(
-                    name=repository.name,
-                    description=repository.description,
-                    collaborators=collaborators_list,
-                    prsOpen=prs_open_list,
-                    prsClosed=prs_closed_list,
-                    prsDependabot=[],  # No se usa Dependabot
-                    issuesDetails=issues_list,
-                    branchesDetails=branches_details,
-                    languagesPercentage=percentages
-                )
+    def build_repository_detail(self, repository) -> Repository:
+        collaborators_list = [collaborator.login for collaborator in iterate_pages(repository.get_collaborators())]
+
+        prs_open_list = [
+            f"El pull #{pr.number}: {pr.title}. Asignado a: {pr.assignee.login if pr.assignee else 'N/A'}, fue creado el: {pr.created_at}"
+            for pr in iterate_pages(repository.get_pulls(state="open"))
+        ]
+
+        prs_closed_list = [
+            f"El pull #{pr.number}: {pr.title}. Asignado a: {pr.assignee.login if pr.assignee else 'N/A'}, fue creado el: {pr.created_at}"
+            for pr in iterate_pages(repository.get_pulls(state="closed"))
+        ]
+
+        branches_details = [
+            f"Nombre de rama: {br.name} --- Propietario: {repository.owner.login}"
+            for br in iterate_pages(repository.get_branches())
+        ]
+
+        issues_list = []
+        for iss in iterate_pages(repository.get_issues()):
+            labels = [label.name for label in iss.labels]
+            issues_list.append(
+                f"El problema #{iss.number} Titulo: {iss.title} --- Descripción: {iss.body} --- Tipo: {', '.join(labels)}"
+            )
 
-        raise HTTPException(status_code=404, detail=f"El repositorio '{repo_name}' no existe")
+        langs = repository.get_languages()
+        total_bytes = sum(langs.values())
+        languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in langs.items()}
+        percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
+
+        return Repository(
+            name=repository.name,
+            description=repository.description,
+            collaborators=collaborators_list,
+            prsOpen=prs_open_list,
+            prsClosed=prs_closed_list,
+            prsDependabot=[],  # No se usa Dependabot
+            issuesDetails=issues_list,
+            branchesDetails=branches_details,
+            languagesPercentage=percentages
+        )
 
     def get_statistics_by_detail(self, repo_name: str) -> RepositoryStats:
         '''
@@ -247,44 +869,43 @@ class RepositoryService:
             RepositoryStats: Un modelo que contiene los atributos del repositorio.
         '''
         try:
-            repos = self.get_repositories_from_github()
-            found_repo = next((repo for repo in repos if repo.name == repo_name), None)
-            if not found_repo:
-                raise HTTPException(status_code=404, detail=f"El repositorio '{repo_name}' no existe")
-
-            total_bytes_by_language = {}
-            percentages = []
-            dependabot_pr_count = 0
-            collaborators_total = found_repo.get_collaborators().totalCount
-            prs_open_total = found_repo.get_pulls(state="open").totalCount
-            prs_closed_total = found_repo.get_pulls(state="closed").totalCount
-            issues_total = found_repo.get_issues().totalCount
-            branches_total = found_repo.get_branches().totalCount
-            pull_requests = found_repo.get_pulls(state="all")
-            dependabot_prs = [pr for pr in pull_requests if pr.user.login.startswith("dependabot")]
-            dependabot_pr_count = len(dependabot_prs)
-
-            langs = found_repo.get_languages()
-            for lang, bytes_count in langs.items():
-                total_bytes_by_language[lang] = total_bytes_by_language.get(lang, 0) + bytes_count
-
-            total_bytes = sum(total_bytes_by_language.values())
-            languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in total_bytes_by_language.items()}
-            percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
-
-            return RepositoryStats(
-                collaborators=collaborators_total,
-                prsOpen=prs_open_total,
-                prsClosed=prs_closed_total,
-                prsDependabot=dependabot_pr_count,
-                issues=issues_total,
-                branches=branches_total,
-                percentagesLanguages=percentages,
-            )
+            return self.find_and_build(repo_name, self.build_statistics_by_detail)
         except StarletteHTTPException as e:
             raise e
         except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas detalladas del repositorio: {e}")
 
+    def build_statistics_by_detail(self, found_repo) -> RepositoryStats:
+        total_bytes_by_language = {}
+        percentages = []
+        dependabot_pr_count = 0
+        collaborators_total = found_repo.get_collaborators().totalCount
+        prs_open_total = found_repo.get_pulls(state="open").totalCount
+        prs_closed_total = found_repo.get_pulls(state="closed").totalCount
+        issues_total = found_repo.get_issues().totalCount
+        branches_total = found_repo.get_branches().totalCount
+        pull_requests = found_repo.get_pulls(state="all")
+        dependabot_prs = [pr for pr in iterate_pages(pull_requests) if pr.user.login.startswith("dependabot")]
+        dependabot_pr_count = len(dependabot_prs)
+
+        langs = found_repo.get_languages()
+        for lang, bytes_count in langs.items():
+            total_bytes_by_language[lang] = total_bytes_by_language.get(lang, 0) + bytes_count
+
+        total_bytes = sum(total_bytes_by_language.values())
+        languages_percentages = {lang: (bytes_count / total_bytes) * 100 for lang, bytes_count in total_bytes_by_language.items()}
+        percentages = [f"{lang}: {percentage:.2f}%" for lang, percentage in languages_percentages.items()]
+
+        return RepositoryStats(
+            collaborators=collaborators_total,
+            prsOpen=prs_open_total,
+            prsClosed=prs_closed_total,
+            prsDependabot=dependabot_pr_count,
+            issues=issues_total,
+            branches=branches_total,
+            percentagesLanguages=percentages,
+        )
+
 
 repository_service = RepositoryService()
@@ -0,0 +1,85 @@
+import os
+from typing import Dict, List
+from dotenv import load_dotenv
+from app.services.concurrency import gather_bounded
+from app.services.github_async import AsyncGithubClient
+
+load_dotenv()
+
+# Calificadores (repo:, org:, user:) que se juntan en una misma busqueda.
+SEARCH_BATCH_SIZE = int(os.getenv("SEARCH_BATCH_SIZE", "20"))
+# Busquedas en vuelo al mismo tiempo; la API de busqueda castiga la concurrencia alta.
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "2"))
+
+# Consultas de cada conteo. "is:open" cuenta issues y pull requests abiertos,
+# igual que get_issues().totalCount en la API REST.
+COUNT_QUERIES = {
+    "prsOpen": "is:pr is:open",
+    "prsClosed": "is:pr is:closed",
+    "prsDependabot": "is:pr author:app/dependabot",
+    "issues": "is:open",
+}
+
+
+class SearchCounter:
+    '''
+    Cuenta pull requests e issues con la API de busqueda: cada consulta devuelve total_count
+    en una sola peticion, sin descargar los elementos. Varios repositorios se juntan en la
+    misma consulta con calificadores repo: (GitHub los combina con OR). Las busquedas se
+    descuentan del limite "search" del planificador (ver rate_limiter).
+    '''
+
+    def __init__(self, client: AsyncGithubClient, batch_size: int = SEARCH_BATCH_SIZE):
+        self.client = client
+        self.batch_size = batch_size
+
+    async def count(self, query: str) -> int:
+        '''
+        Cuenta los resultados de una busqueda de issues y pull requests.
+
+        Args:
+            "query": La consulta, por ejemplo "repo:owner/repo is:pr is:open".
+
+        Returns:
+            Int: El total de resultados.
+        '''
+        result = await self.client.get_json("/search/issues", {"q": query, "per_page": 1})
+        if result.get("incomplete_results"):
+            print(f"La busqueda no termino a tiempo y el conteo puede estar incompleto: {query}")
+        return result["total_count"]
+
+    def build_queries(self, scopes: List[str]) -> List[tuple]:
+        '''
+        Arma las consultas de todos los conteos por lotes de calificadores.
+
+        Args:
+            "scopes": Los calificadores, por ejemplo ["repo:owner/repo1", "repo:owner/repo2"] u ["org:Grupo-ASD"].
+
+        Returns:
+            List: Tuplas (conteo, consulta).
+        '''
+        queries = []
+        for start in range(0, len(scopes), self.batch_size):
+            batch = " ".join(scopes[start:start + self.batch_size])
+            for field, query in COUNT_QUERIES.items():
+                queries.append((field, f"{query} {batch}"))
+        return queries
+
+    async def count_totals(self, scopes: List[str]) -> Dict[str, int]:
+        '''
+        Obtiene los totales de pull requests abiertos, cerrados, de dependabot e issues.
+
+        Args:
+            "scopes": Los calificadores de los repositorios u organizaciones a contar.
+
+        Returns:
+            Dict: Los totales por conteo (prsOpen, prsClosed, prsDependabot, issues).
+        '''
+        totals = {field: 0 for field in COUNT_QUERIES}
+        if not scopes:
+            return totals
+        queries = self.build_queries(scopes)
+        counts = await gather_bounded(lambda item: self.count(item[1]), queries, SEARCH_MAX_CONCURRENCY)
+        for (field, _), count in zip(queries, counts):
+            totals[field] += count
+        return totals
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Segundos que se reutiliza el usuario autenticado de una sesion antes de volver a crearlo.
+SESSION_USER_TTL = int(os.getenv("SESSION_USER_TTL", "300"))
+# Numero maximo de sesiones guardadas; al superarlo se descarta la menos usada.
+SESSION_USER_MAX_ENTRIES = int(os.getenv("SESSION_USER_MAX_ENTRIES", "1000"))
+
+
+@dataclass
+class SessionUser:
+    client: Any
+    user: Any
+    created_at: float
+
+
+class SessionUserCache:
+    '''
+    Guarda por sesion el cliente de GitHub y el usuario autenticado que usa get_current_user,
+    para que cada pagina no cree un cliente nuevo ni vuelva a pedir /user. Las llaves son el
+    hash del token de la sesion, nunca el token.
+    '''
+
+    def __init__(self, ttl: int = SESSION_USER_TTL, max_entries: int = SESSION_USER_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, SessionUser]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(str(token).encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[SessionUser]:
+        '''
+        Obtiene el cliente y el usuario guardados de una sesion.
+
+        Args:
+            "token": El token de acceso de la sesion.
+
+        Returns:
+            SessionUser: El cliente y el usuario o None si no estaban guardados o vencieron.
+        '''
+        key = self.key(token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry.created_at > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def store(self, token: str, client: Any, user: Any) -> SessionUser:
+        entry = SessionUser(client, user, time.time())
+        with self.lock:
+            self.entries[self.key(token)] = entry
+            self.entries.move_to_end(self.key(token))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, token: Optional[str]):
+        # Al cerrar sesion el usuario no debe seguir disponible aunque el token siga valido en GitHub
+        if not token:
+            return
+        with self.lock:
+            self.entries.pop(self.key(token), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"ttl": self.ttl, "entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+# Crear una instancia compartida por las rutas con sesion
+session_user_cache = SessionUserCache()
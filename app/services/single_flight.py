@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    '''
+    Junta las peticiones identicas que llegan mientras otra igual se esta calculando: la
+    primera ejecuta el calculo y las demas esperan ese mismo resultado (o error) en lugar
+    de repetir las consultas a GitHub. Las claves incluyen el endpoint, sus parametros y,
+    en las rutas del usuario logueado, su token.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tasks: Dict[tuple, asyncio.Task] = {}
+        self.futures: Dict[tuple, Future] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def key(self, endpoint: str, *params: Any, token: Optional[str] = None) -> tuple:
+        '''
+        Arma la clave de una peticion.
+
+        Args:
+            "endpoint": El nombre del endpoint.
+            "params": Los parametros que cambian la respuesta.
+            "token": El token del usuario en las rutas que responden segun el usuario; se guarda su hash.
+
+        Returns:
+            Tuple: La clave de la peticion.
+        '''
+        if token is not None:
+            params = (*params, hashlib.sha256(token.encode()).hexdigest()[:12])
+        return (endpoint, *params)
+
+    def record(self, key: tuple, coalesced: bool):
+        with self.lock:
+            counters = self.counters.setdefault(key[0], {"executions": 0, "coalesced": 0})
+            counters["coalesced" if coalesced else "executions"] += 1
+
+    async def run(self, key: tuple, func: Callable[[], Awaitable[Any]]) -> Any:
+        '''
+        Ejecuta una corrutina una sola vez por clave mientras este en vuelo.
+
+        Args:
+            "key": La clave de la peticion (ver key).
+            "func": La funcion que crea la corrutina del calculo.
+
+        Returns:
+            Any: El resultado del calculo compartido.
+        '''
+        task = self.tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            self.record(key, coalesced=False)
+            # El calculo corre en su propia tarea: si quien lo inicio se cancela, los demas siguen esperandolo
+            task = asyncio.ensure_future(func())
+            self.tasks[key] = task
+            task.add_done_callback(lambda done: self.tasks.pop(key, None) if self.tasks.get(key) is done else None)
+        else:
+            self.record(key, coalesced=True)
+        return await asyncio.shield(task)
+
+    def run_sync(self, key: tuple, func: Callable[[], Any]) -> Any:
+        '''
+        Igual que run, para los endpoints sincronos que FastAPI ejecuta en hilos.
+
+        Args:
+            "key": La clave de la peticion (ver key).
+            "func": La funcion del calculo.
+
+        Returns:
+            Any: El resultado del calculo compartido.
+        '''
+        with self.lock:
+            future = self.futures.get(key)
+            leader = future is None
+            if leader:
+                future = self.futures[key] = Future()
+        self.record(key, coalesced=not leader)
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                self.futures.pop(key, None)
+        return future.result()
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "in_flight": len(self.tasks) + len(self.futures),
+                "endpoints": {endpoint: dict(counters) for endpoint, counters in self.counters.items()},
+            }
+
+
+# Crear una instancia compartida por los routers
+single_flight = SingleFlight()
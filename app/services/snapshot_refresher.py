@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from app.services.rate_limiter import BACKGROUND, request_priority
+from app.services.single_flight import single_flight
+
+load_dotenv()
+
+# Segundos entre cada reconstruccion de los snapshots; 0 desactiva la tarea en segundo plano.
+SNAPSHOT_REFRESH_INTERVAL = int(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "300"))
+# Antiguedad maxima para servir un snapshot; si la tarea se detuvo, se vuelve a calcular en la peticion.
+SNAPSHOT_MAX_AGE = int(os.getenv("SNAPSHOT_MAX_AGE", str(SNAPSHOT_REFRESH_INTERVAL * 3 or 900)))
+
+
+@dataclass
+class Snapshot:
+    value: Any
+    built_at: float = field(default_factory=time.time)
+
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-Snapshot-Age": str(int(self.age())),
+            "X-Snapshot-Built-At": datetime.fromtimestamp(self.built_at, timezone.utc).isoformat(),
+        }
+
+
+class SnapshotRefresher:
+    '''
+    Reconstruye periodicamente, en segundo plano, las respuestas costosas (estadisticas de
+    repositorios, de usuarios y los equipos) y las reemplaza de una sola vez, para que las
+    peticiones se respondan con el ultimo snapshot sin esperar a GitHub.
+    '''
+
+    def __init__(self, interval: int = SNAPSHOT_REFRESH_INTERVAL, max_age: int = SNAPSHOT_MAX_AGE):
+        self.interval = interval
+        self.max_age = max_age
+        self.builders: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self.snapshots: Dict[str, Snapshot] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, builder: Callable[[], Awaitable[Any]]):
+        self.builders[name] = builder
+
+    def get(self, name: str) -> Optional[Snapshot]:
+        '''
+        Obtiene el ultimo snapshot de una respuesta.
+
+        Args:
+            "name": El nombre con el que se registro la respuesta.
+
+        Returns:
+            Snapshot: El snapshot o None si no existe o es mas viejo que max_age.
+        '''
+        snapshot = self.snapshots.get(name)
+        if snapshot is None or snapshot.age() > self.max_age:
+            return None
+        return snapshot
+
+    async def refresh(self, name: str) -> Snapshot:
+        '''
+        Reconstruye una respuesta y la deja como el snapshot actual. Si falla se conserva
+        el snapshot anterior.
+
+        Args:
+            "name": El nombre con el que se registro la respuesta.
+
+        Returns:
+            Snapshot: El nuevo snapshot.
+        '''
+        # Las peticiones que llegan mientras se reconstruye esperan la misma reconstruccion
+        return await single_flight.run(single_flight.key("snapshot", name), lambda: self.build(name))
+
+    async def build(self, name: str) -> Snapshot:
+        value = await self.builders[name]()
+        # Se reemplaza la referencia completa: los lectores ven el snapshot viejo o el nuevo, nunca uno a medias
+        snapshot = Snapshot(value)
+        self.snapshots[name] = snapshot
+        return snapshot
+
+    async def get_or_refresh(self, name: str) -> Snapshot:
+        return self.get(name) or await self.refresh(name)
+
+    async def refresh_all(self):
+        names = list(self.builders)
+        # Las peticiones de la actualizacion ceden el presupuesto a los endpoints interactivos
+        token = request_priority.set(BACKGROUND)
+        try:
+            results = await asyncio.gather(*(self.refresh(name) for name in names), return_exceptions=True)
+        finally:
+            request_priority.reset(token)
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                print(f"Error al actualizar el snapshot {name}: {result}")
+
+    async def run(self):
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def invalidate(self, name: str):
+        # La siguiente peticion vuelve a armar la respuesta (normalmente desde el almacen local)
+        self.snapshots.pop(name, None)
+
+    def clear(self):
+        self.snapshots.clear()
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "running": self.task is not None and not self.task.done(),
+            "snapshots": {name: round(snapshot.age(), 1) for name, snapshot in self.snapshots.items()},
+        }
+
+
+# Crear una instancia del actualizador compartido por los routers
+snapshot_refresher = SnapshotRefresher()
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from app.models.teams_model import Team
+
+load_dotenv()
+
+# Segundos que se sirven los equipos desde el grafo en memoria antes de volver a cargarlos.
+TEAM_GRAPH_TTL = int(os.getenv("TEAM_GRAPH_TTL", "900"))
+
+
+class TeamGraph:
+    '''
+    Grafo en memoria de los equipos de la organizacion y sus miembros, indexado en los dos
+    sentidos: los miembros de cada equipo y los equipos de cada usuario. Se reemplaza completo
+    cada vez que se cargan los equipos y deja de servirse cuando vence TEAM_GRAPH_TTL.
+    '''
+
+    def __init__(self, ttl: int = TEAM_GRAPH_TTL):
+        self.ttl = ttl
+        self.teams: Dict[int, Team] = {}
+        self.teams_by_member: Dict[str, List[int]] = {}
+        self.teams_by_slug: Dict[str, int] = {}
+        self.loaded_at: Optional[float] = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(login: str) -> str:
+        # Los logins de GitHub no distinguen mayusculas
+        return login.lower()
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.time() - self.loaded_at <= self.ttl
+
+    def load(self, teams: List[Team]):
+        '''
+        Reemplaza el grafo con una lista de equipos.
+
+        Args:
+            "teams": Los equipos con sus miembros.
+        '''
+        teams_by_id = {team.id: team for team in teams}
+        teams_by_member: Dict[str, List[int]] = {}
+        for team in teams:
+            for member in team.members:
+                teams_by_member.setdefault(self.key(member.login), []).append(team.id)
+        teams_by_slug = {team.slug: team.id for team in teams if team.slug}
+        # Los indices se arman aparte y se cambian juntos: quien lee nunca ve un grafo a medias
+        with self.lock:
+            self.teams = teams_by_id
+            self.teams_by_member = teams_by_member
+            self.teams_by_slug = teams_by_slug
+            self.loaded_at = time.time()
+
+    def get_teams(self) -> Optional[List[Team]]:
+        '''
+        Obtiene todos los equipos del grafo.
+
+        Returns:
+            List: Los equipos o None si el grafo no esta cargado o vencio.
+        '''
+        with self.lock:
+            if not self.is_fresh():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(self.teams.values())
+
+    def get_team(self, slug: str) -> Optional[Team]:
+        '''
+        Obtiene un equipo por su slug.
+
+        Args:
+            "slug": El slug del equipo.
+
+        Returns:
+            Team: El equipo o None si no existe, el grafo no esta cargado o vencio.
+        '''
+        with self.lock:
+            if not self.is_fresh():
+                self.misses += 1
+                return None
+            self.hits += 1
+            team_id = self.teams_by_slug.get(slug)
+            return self.teams[team_id] if team_id is not None else None
+
+    def teams_of(self, login: str) -> Optional[List[Team]]:
+        '''
+        Obtiene los equipos a los que pertenece un usuario.
+
+        Args:
+            "login": El login del usuario.
+
+        Returns:
+            List: Los equipos del usuario (vacia si no esta en ninguno) o None si el grafo no esta cargado o vencio.
+        '''
+        with self.lock:
+            if not self.is_fresh():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [self.teams[team_id] for team_id in self.teams_by_member.get(self.key(login), [])]
+
+    def invalidate(self):
+        # Los equipos se vuelven a cargar (desde el almacen) en la siguiente consulta
+        with self.lock:
+            self.loaded_at = None
+
+    def clear(self):
+        with self.lock:
+            self.teams = {}
+            self.teams_by_member = {}
+            self.teams_by_slug = {}
+            self.loaded_at = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "ttl": self.ttl,
+                "teams": len(self.teams),
+                "members": len(self.teams_by_member),
+                "age": round(time.time() - self.loaded_at, 1) if self.loaded_at is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Crear una instancia compartida por el servicio de equipos y los webhooks
+team_graph = TeamGraph()
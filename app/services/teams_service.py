@@ -1,9 +1,19 @@
+import asyncio
 from typing import List
 from datetime import datetime, timedelta
 from fastapi import HTTPException, APIRouter
 from github import Github
 from token_1 import my_git
-from app.models.teams_model import TeamsResponse, Team, Member
+from app.models.teams_model import TeamsResponse, Team, Member, TeamStats, UserTeamsResponse
+from app.services.activity_engine import ActivityEngine
+from app.services.concurrency import gather_bounded, map_in_pool
+from app.services.github_async import async_github
+from app.services.metadata_store import metadata_store
+from app.services.pagination import iterate_pages
+from app.services.rate_limiter import raise_if_rate_limited
+from app.services.repository_service import repository_service
+from app.services.single_flight import single_flight
+from app.services.team_graph import team_graph
 import os
 from dotenv import load_dotenv
 
@@ -17,25 +27,150 @@ class TeamsService:
 
     def __init__(self):
         self.github_client = my_git
+        self.async_client = async_github
+        self.store = metadata_store
+        self.team_graph = team_graph
+        self.repository_service = repository_service
+        self.activity_engine = ActivityEngine(self.async_client)
 
     def get_teams(self) -> TeamsResponse:
         try:
             org = self.github_client.get_organization(ORG_NAME)
-            teams = org.get_teams()
-            teams_list = []
-
-            for team in teams:
-                members = team.get_members()
-                members_list = [Member(id=member.id, login=member.login) for member in members]
-                members_count = len(members_list)
-                teams_list.append(Team(id=team.id, name=team.name, members_count=members_count, members=members_list))
-                
+            teams = iterate_pages(org.get_teams())
+
+            def build_team(team) -> Team:
+                members_list = [Member(id=member.id, login=member.login) for member in iterate_pages(team.get_members())]
+                return Team(id=team.id, name=team.name, slug=team.slug, members_count=len(members_list), members=members_list)
+
+            # Los miembros de cada equipo se piden al mismo tiempo en lugar de uno por uno
+            teams_list = map_in_pool(build_team, teams)
+            self.store.save_teams(teams_list)
+            self.team_graph.load(teams_list)
+
             total_teams = len(teams_list)
 
             return TeamsResponse(total_teams=total_teams, teams=teams_list)
         except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener los equipos: {e}")
+
+    async def get_teams_async(self) -> TeamsResponse:
+        try:
+            teams_list = await self.load_team_graph()
+            return TeamsResponse(total_teams=len(teams_list), teams=teams_list)
+        except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener los equipos: {e}")
 
+    async def get_user_teams_async(self, login: str) -> UserTeamsResponse:
+        '''
+        Obtiene los equipos de la organizacion a los que pertenece un usuario, desde el grafo de equipos.
+
+        Args:
+            "login": El login del usuario.
+
+        Returns:
+            UserTeamsResponse: El usuario y sus equipos.
+        '''
+        try:
+            teams_list = self.team_graph.teams_of(login)
+            if teams_list is None:
+                await self.load_team_graph()
+                teams_list = self.team_graph.teams_of(login) or []
+            return UserTeamsResponse(login=login, total_teams=len(teams_list), teams=teams_list)
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener los equipos del usuario: {e}")
+
+    async def get_team_statistics_async(self, slug: str, days: int = 1) -> TeamStats:
+        '''
+        Obtiene las estadisticas sumadas de los repositorios a los que un equipo tiene permisos.
+        Los conteos salen de los snapshots por repositorio que comparte con las estadisticas de
+        la organizacion (ver RepositoryService.get_repository_snapshots_async), asi que un
+        repositorio ya consultado no se vuelve a pedir a GitHub para otro equipo.
+
+        Args:
+            "slug": El slug del equipo.
+            "days": Los dias de acciones que se cuentan (1 es solo hoy).
+
+        Returns:
+            TeamStats: Los conteos de pull requests, issues, lenguajes y acciones de los repositorios del equipo.
+        '''
+        try:
+            await self.load_team_graph()
+            team = self.team_graph.get_team(slug)
+            if team is None:
+                raise HTTPException(status_code=404, detail=f"El equipo {slug} no existe")
+
+            repos = self.store.get_team_repositories(slug)
+            if repos is None:
+                repos = [repository async for repository in self.async_client.paginate(f"/orgs/{ORG_NAME}/teams/{slug}/repos")]
+                self.store.save_team_repositories(slug, repos)
+
+            async def get_actions(repository: dict):
+                # Los equipos que comparten un repositorio y se calculan al mismo tiempo cuentan sus acciones una sola vez
+                key = single_flight.key("repository_actions", repository["full_name"], days)
+                try:
+                    return await single_flight.run(key, lambda: self.activity_engine.get_actions(repository["full_name"], days))
+                except Exception as e:
+                    print(f"Error al obtener acciones para el repositorio {repository['name']}: {e}")
+                    return {}
+
+            snapshots, actions = await asyncio.gather(
+                self.repository_service.get_repository_snapshots_async(repos),
+                gather_bounded(get_actions, repos),
+            )
+
+            actions_by_day = {}
+            for repository_actions in actions:
+                for day, count in repository_actions.items():
+                    actions_by_day[day.isoformat()] = actions_by_day.get(day.isoformat(), 0) + count
+
+            statistics = self.repository_service.build_statistics(snapshots)
+            return TeamStats(
+                **statistics.model_dump(),
+                team=team.name,
+                slug=slug,
+                members_count=team.members_count,
+                window_days=days,
+                actions_per_day=actions_by_day[max(actions_by_day)] if actions_by_day else 0,
+                actions_by_day=actions_by_day,
+            )
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener las estadisticas del equipo: {e}")
+
+    async def load_team_graph(self) -> List[Team]:
+        '''
+        Obtiene los equipos del grafo en memoria; si vencio lo vuelve a cargar desde el almacen
+        local o, si este tambien vencio, desde GitHub.
+
+        Returns:
+            List: Los equipos con sus miembros.
+        '''
+        teams_list = self.team_graph.get_teams()
+        if teams_list is not None:
+            return teams_list
+
+        teams_list = self.store.get_teams()
+        if teams_list is None:
+            teams = [team async for team in self.async_client.paginate(f"/orgs/{ORG_NAME}/teams")]
+
+            async def build_team(team: dict) -> Team:
+                members_list = [
+                    Member(id=member["id"], login=member["login"])
+                    async for member in self.async_client.paginate(f"/orgs/{ORG_NAME}/teams/{team['slug']}/members")
+                ]
+                return Team(id=team["id"], name=team["name"], slug=team["slug"], members_count=len(members_list), members=members_list)
+
+            teams_list = await gather_bounded(build_team, teams)
+            self.store.save_teams(teams_list)
+
+        self.team_graph.load(teams_list)
+        return teams_list
+
 # Crear una instancia del servicio
 teams_service = TeamsService()
 
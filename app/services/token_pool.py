@@ -0,0 +1,139 @@
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from token_1 import mytoken
+from app.services.rate_limiter import rate_limiter
+
+load_dotenv()
+
+# Tokens adicionales (PATs o tokens de instalacion de una GitHub App) separados por comas.
+GITHUB_TOKENS = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+# Segundos que un token queda fuera del pool despues de un 401.
+TOKEN_COOLDOWN = float(os.getenv("TOKEN_COOLDOWN", "300"))
+# Presupuesto que se asume para un token del que aun no hay cabeceras.
+DEFAULT_TOKEN_BUDGET = 5000
+
+# Rutas que dependen del usuario del token y no se pueden responder con otro token.
+USER_SCOPED_PREFIXES = ("/user", "/notifications")
+
+
+class TokenPool:
+    '''
+    Reparte las peticiones del cliente de la aplicacion entre varios tokens para sumar sus
+    limites de peticiones. Cada peticion usa el token sano con mas presupuesto restante
+    segun el planificador (ver rate_limiter).
+    '''
+
+    def __init__(self, tokens: List[str], cooldown: float = TOKEN_COOLDOWN):
+        self.tokens = list(dict.fromkeys(token for token in tokens if token))
+        self.cooldown = cooldown
+        self.unhealthy_until: Dict[str, float] = {}
+        self.failures: Dict[str, int] = {}
+        self.requests: Dict[str, int] = {token: 0 for token in self.tokens}
+        self.rotation = itertools.count()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def split(authorization: Optional[str]):
+        if not authorization or " " not in authorization:
+            return None, None
+        scheme, token = authorization.split(" ", 1)
+        return scheme, token
+
+    def is_user_scoped(self, path: str) -> bool:
+        path = path.split("?", 1)[0]
+        # GitHub Enterprise sirve la API bajo /api/v3
+        if path.startswith("/api/v3"):
+            path = path[len("/api/v3"):]
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in USER_SCOPED_PREFIXES)
+
+    def is_healthy(self, token: str, now: float) -> bool:
+        return self.unhealthy_until.get(token, 0) <= now
+
+    def choose(self, exclude: Optional[str] = None) -> Optional[str]:
+        '''
+        Elige el token para la siguiente peticion.
+
+        Args:
+            "exclude": Un token que no se debe elegir, por ejemplo el que acaba de fallar.
+
+        Returns:
+            String: El token sano con mas presupuesto; si ninguno esta sano, el que se recupera primero.
+        '''
+        now = time.time()
+        with self.lock:
+            candidates = [token for token in self.tokens if token != exclude] or self.tokens
+            if not candidates:
+                return None
+            # Se empieza en un token distinto cada vez para repartir los empates
+            offset = next(self.rotation) % len(candidates)
+            candidates = candidates[offset:] + candidates[:offset]
+            healthy = [token for token in candidates if self.is_healthy(token, now)]
+            if not healthy:
+                return min(candidates, key=lambda token: self.unhealthy_until.get(token, 0))
+            return max(healthy, key=lambda token: rate_limiter.score(rate_limiter.key(token), DEFAULT_TOKEN_BUDGET))
+
+    def authorization(self, authorization: Optional[str], path: str, exclude: Optional[str] = None) -> Optional[str]:
+        '''
+        Cambia el token de la cabecera Authorization por el mejor token del pool.
+        Solo se cambian los tokens del pool (nunca el de un usuario que inicio sesion)
+        y no en las rutas que dependen del usuario del token.
+
+        Args:
+            "authorization": La cabecera Authorization original (por ejemplo "Bearer <token>").
+            "path": La ruta de la peticion.
+            "exclude": Un token que no se debe elegir.
+
+        Returns:
+            String: La cabecera Authorization que se debe enviar.
+        '''
+        scheme, token = self.split(authorization)
+        if token not in self.tokens or len(self.tokens) < 2 or self.is_user_scoped(path):
+            return authorization
+        chosen = self.choose(exclude)
+        with self.lock:
+            self.requests[chosen] += 1
+        return f"{scheme} {chosen}"
+
+    def report(self, authorization: Optional[str], status: int):
+        '''
+        Registra el resultado de una peticion; un 401 deja el token fuera del pool un tiempo.
+
+        Args:
+            "authorization": La cabecera Authorization que se envio.
+            "status": El codigo de estado de la respuesta.
+        '''
+        _, token = self.split(authorization)
+        if token not in self.tokens:
+            return
+        with self.lock:
+            if status == 401:
+                self.failures[token] = self.failures.get(token, 0) + 1
+                self.unhealthy_until[token] = time.time() + self.cooldown
+            elif status < 500:
+                self.failures[token] = 0
+                self.unhealthy_until.pop(token, None)
+
+    def should_retry(self, authorization: Optional[str], status: int, path: str) -> bool:
+        # Con otro token sano se puede repetir una peticion rechazada por un token vencido
+        _, token = self.split(authorization)
+        return status == 401 and token in self.tokens and len(self.tokens) > 1 and not self.is_user_scoped(path)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self.lock:
+            return {
+                rate_limiter.key(token): {
+                    "healthy": self.is_healthy(token, now),
+                    "failures": self.failures.get(token, 0),
+                    "requests": self.requests.get(token, 0),
+                }
+                for token in self.tokens
+            }
+
+
+# Crear una instancia del pool con el token principal y los tokens adicionales
+token_pool = TokenPool([mytoken] + GITHUB_TOKENS)
@@ -1,15 +1,33 @@
-from typing import List
-from datetime import datetime
+import heapq
+from functools import cached_property
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+from types import SimpleNamespace
 from fastapi import HTTPException
 from github import Github
+from github.PaginatedList import PaginatedList
 from token_1 import my_git
 from app.models.user_model import Event, UsersStats
+from app.services.activity_engine import ActivityEngine
+from app.services.concurrency import gather_bounded, map_in_pool
+from app.services.github_async import async_github, parse_github_date
+from app.services.metadata_store import metadata_store
+from app.services.pagination import iterate_pages
+from app.services.rate_limiter import raise_if_rate_limited
 
 class UserService:
 
     def __init__(self):
         self.github_client = my_git
-        self.user = self.github_client.get_user()
+        self.async_client = async_github
+        self.store = metadata_store
+        self.activity_engine = ActivityEngine(self.async_client)
+
+    @cached_property
+    def user(self):
+        # El usuario autenticado se obtiene al primer uso y no al importar la aplicacion
+        return self.github_client.get_user()
 
     def get_statistics_of_users(self) -> UsersStats:
         try:
@@ -18,9 +36,10 @@ class UserService:
             try:
                 repos = self.user.get_repos()
             except Exception as e:
+                raise_if_rate_limited(e)
                 raise HTTPException(status_code=500, detail=f"Error al obtener repositorios del usuario: {e}")
 
-            for repository in repos:
+            for repository in iterate_pages(repos):
                 owner = repository.owner.login
                 if owner not in user_stats:
                     user_stats[owner] = {
@@ -44,48 +63,179 @@ class UserService:
                 actions_today = 0
                 today = datetime.now().date()
                 try:
-                    actions_today += len([pr for pr in repository.get_pulls() if pr.created_at.date() == today])
-                    actions_today += len([issue for issue in repository.get_issues() if issue.created_at.date() == today])
-                    actions_today += len([commit for commit in repository.get_commits() if commit.commit.author.date.date() == today])
+                    actions_today += len([pr for pr in iterate_pages(repository.get_pulls()) if pr.created_at.date() == today])
+                    actions_today += len([issue for issue in iterate_pages(repository.get_issues()) if issue.created_at.date() == today])
+                    actions_today += len([commit for commit in iterate_pages(repository.get_commits()) if commit.commit.author.date.date() == today])
                 except Exception as e:
                     print(f"Error al obtener acciones para el repositorio {repository.name}: {e}")
                 user_stats[owner]["actions_per_day"] += actions_today
 
-            for owner, stats in user_stats.items():
-                total_bytes = sum(stats["languages"].values())
-                stats["languages"] = {lang: f"{(bytes_count / total_bytes) * 100:.2f}%" for lang, bytes_count in stats["languages"].items()}
-
-            return UsersStats(users_statistics=user_stats)
+            return self.build_users_stats(user_stats)
         except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas de usuarios: {e}")
 
-    def get_user_events(self, user: Github) -> List[Event]:
+    def build_users_stats(self, user_stats: dict) -> UsersStats:
+        for owner, stats in user_stats.items():
+            total_bytes = sum(stats["languages"].values())
+            stats["languages"] = {lang: f"{(bytes_count / total_bytes) * 100:.2f}%" for lang, bytes_count in stats["languages"].items()}
+
+        return UsersStats(users_statistics=user_stats)
+
+    async def get_statistics_of_users_async(self, days: int = 1) -> UsersStats:
+        '''
+        Obtiene por propietario los repositorios, los lenguajes y las acciones de los ultimos dias.
+
+        Args:
+            "days": El tamano de la ventana de acciones en dias; 1 es solo hoy.
+
+        Returns:
+            UsersStats: Las estadisticas por propietario; actions_per_day son las acciones de hoy
+            y actions_by_day las de cada dia de la ventana.
+        '''
         try:
-            events = []
-            for repo in user.get_repos():
+            try:
+                repos = [repository async for repository in self.async_client.paginate("/user/repos")]
+            except Exception as e:
+                raise_if_rate_limited(e)
+                raise HTTPException(status_code=500, detail=f"Error al obtener repositorios del usuario: {e}")
+
+            async def collect(repository: dict):
+                full_name = repository["full_name"]
+                langs = {}
                 try:
-                    repo_events = repo.get_events()
-                    events.extend(repo_events)
+                    langs = await self.async_client.get_json(f"/repos/{full_name}/languages")
                 except Exception as e:
-                    print(f"Error obteniendo eventos del repositorio {repo.name}: {e}")
+                    print(f"Error al obtener lenguajes para el repositorio {repository['name']}: {e}")
 
-            formatted_events = []
+                actions = {}
+                try:
+                    actions = await self.activity_engine.get_actions(full_name, days)
+                except Exception as e:
+                    print(f"Error al obtener acciones para el repositorio {repository['name']}: {e}")
+                return repository["owner"]["login"], langs, actions
 
-            for event in events:
+            user_stats = {}
+            for owner, langs, actions in await gather_bounded(collect, repos):
+                if owner not in user_stats:
+                    user_stats[owner] = {
+                        "repos_count": 0,
+                        "languages": {},
+                        "actions_per_day": 0,
+                        "actions_by_day": {},
+                    }
+                user_stats[owner]["repos_count"] += 1
+                for lang, bytes_count in langs.items():
+                    user_stats[owner]["languages"][lang] = user_stats[owner]["languages"].get(lang, 0) + bytes_count
+                for day, count in actions.items():
+                    user_stats[owner]["actions_by_day"][day.isoformat()] = user_stats[owner]["actions_by_day"].get(day.isoformat(), 0) + count
+                if actions:
+                    user_stats[owner]["actions_per_day"] += actions[max(actions)]
+
+            stats = self.build_users_stats(user_stats)
+            stats.window_days = days
+            return stats
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas de usuarios: {e}")
+
+    def get_user_events(self, user: Github, limit: Optional[int] = None, before: Optional[Tuple[str, int]] = None) -> List[Event]:
+        '''
+        Obtiene los eventos de los repositorios del usuario, del mas nuevo al mas viejo. Los
+        repositorios que consulta el poller de eventos se leen del registro local; los demas se
+        piden a GitHub. Todos ya vienen ordenados, asi que se mezclan pagina a pagina y se dejan
+        de pedir paginas en cuanto se completa el limite.
+
+        Args:
+            "user": El usuario logueado.
+            "limit": El numero maximo de eventos; None los trae todos.
+            "before": La llave (fecha, id) del ultimo evento de la pagina anterior (ver event_key).
+
+        Returns:
+            List: Los eventos ordenados por fecha de creacion descendente.
+        '''
+        try:
+            # Atributo perezoso del usuario: se lee una sola vez por peticion
+            disk = user.disk_usage
+            repos = list(iterate_pages(user.get_repos()))
+            polled = self.store.get_polled_repositories()
+            logged = [repo.full_name for repo in repos if repo.full_name in polled]
+            live = [repo for repo in repos if repo.full_name not in polled]
+            # La primera pagina de cada repositorio se pide en paralelo; las demas solo si hacen falta
+            streams = map_in_pool(lambda repo: self.repository_events(repo, before), live)
+            if logged:
+                streams.append(self.logged_events(logged, before, limit))
+            merged = heapq.merge(*streams, key=event_key, reverse=True)
+
+            formatted_events = []
+            for event in islice(merged, limit):
                 formatted_event = {
+                    "id": str(event.id),
                     "type": event.type,
                     "repo": event.repo.name,
                     "date": event.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                     "public": event.public,
                     "org": event.org.login if event.org else None,
-                    "disk": user.disk_usage
+                    "disk": disk
                 }
                 formatted_events.append(Event(**formatted_event))
 
             return formatted_events
         except Exception as e:
+            raise_if_rate_limited(e)
             raise HTTPException(status_code=500, detail=f"Error al obtener eventos del usuario: {e}")
 
+    def logged_events(self, repos: List[str], before: Optional[Tuple[str, int]], limit: Optional[int]) -> Iterator:
+        # Filas del registro local con los mismos atributos que los eventos de PyGithub
+        for row in self.store.get_events(repos=repos, before=before, limit=limit):
+            yield SimpleNamespace(
+                id=str(row["id"]),
+                type=row["type"],
+                repo=SimpleNamespace(name=row["repo"]),
+                created_at=datetime.strptime(row["created_at"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc),
+                public=bool(row["public"]),
+                org=SimpleNamespace(login=row["org"]) if row["org"] else None,
+            )
+
+    def repository_events(self, repo, before: Optional[Tuple[str, int]] = None) -> Iterator:
+        '''
+        Pide la primera pagina de eventos de un repositorio y devuelve un iterador que pide las
+        siguientes a medida que se recorren.
+
+        Args:
+            "repo": El repositorio de PyGithub.
+            "before": Solo se entregan los eventos anteriores a esta llave.
+
+        Returns:
+            Iterator: Los eventos del repositorio del mas nuevo al mas viejo.
+        '''
+        try:
+            events = repo.get_events()
+            first_page = events.get_page(0) if isinstance(events, PaginatedList) else list(events)
+        except Exception as e:
+            print(f"Error obteniendo eventos del repositorio {repo.name}: {e}")
+            return iter(())
+        return self.iterate_events(repo, events, first_page, before)
+
+    def iterate_events(self, repo, events, page: list, before: Optional[Tuple[str, int]]) -> Iterator:
+        index = 0
+        # Todas las paginas llenas tienen el tamano de la primera: una pagina mas corta es la ultima
+        # y no se pide otra; si la primera ya estaba incompleta la siguiente llega vacia
+        page_size = len(page)
+        try:
+            while page:
+                for event in page:
+                    if before is None or event_key(event) < before:
+                        yield event
+                if not isinstance(events, PaginatedList) or len(page) < page_size:
+                    return
+                index += 1
+                page = events.get_page(index)
+        except Exception as e:
+            print(f"Error obteniendo eventos del repositorio {repo.name}: {e}")
+
     def get_perfil_info(self, user: Github) -> dict:
             profile = {
                 "login": user.login,
@@ -102,5 +252,10 @@ class UserService:
             return profile
         
 
+def event_key(event) -> Tuple[str, int]:
+    # La fecha con el formato de Event.date ordena igual que la fecha; el id desempata
+    return event.created_at.strftime("%Y-%m-%d %H:%M:%S"), int(event.id)
+
+
 # Crear una instancia del servicio
 user_service = UserService()
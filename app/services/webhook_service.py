@@ -0,0 +1,216 @@
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+from dotenv import load_dotenv
+from app.models.repository_model import RepositorySnapshot
+from app.models.teams_model import Member, Team
+from app.services.github_async import parse_github_date
+from app.services.metadata_store import MetadataStore, metadata_store
+from app.services.snapshot_refresher import snapshot_refresher
+from app.services.team_graph import team_graph
+
+load_dotenv()
+
+# Secreto configurado en el webhook de GitHub para firmar las entregas.
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+# Entregas recordadas para ignorar las que GitHub reenvia.
+WEBHOOK_DELIVERY_HISTORY = int(os.getenv("WEBHOOK_DELIVERY_HISTORY", "1000"))
+
+
+
+class WebhookService:
+    '''
+    Aplica los eventos de los webhooks de GitHub como cambios incrementales sobre los snapshots
+    de repositorios y los equipos del almacen local, para que los conteos sigan al dia sin
+    volver a listar la organizacion. Los repositorios o equipos que no estan guardados se
+    ignoran: se consultan completos la proxima vez.
+    '''
+
+    def __init__(self, secret: Optional[str] = GITHUB_WEBHOOK_SECRET, store: Optional[MetadataStore] = None,
+                 history: int = WEBHOOK_DELIVERY_HISTORY):
+        self.secret = secret
+        self.store = store or metadata_store
+        self.history = history
+        self.deliveries: "OrderedDict[str, None]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def verify_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        '''
+        Verifica la cabecera X-Hub-Signature-256 de una entrega.
+
+        Args:
+            "body": El cuerpo de la peticion sin modificar.
+            "signature": El valor de la cabecera ("sha256=<hex>").
+
+        Returns:
+            Bool: True si la firma corresponde al cuerpo y al secreto configurado.
+        '''
+        if not self.secret or not signature or not signature.startswith("sha256="):
+            return False
+        expected = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature[len("sha256="):])
+
+    def is_duplicate(self, delivery_id: Optional[str]) -> bool:
+        # Los cambios no son idempotentes: una entrega repetida contaria dos veces
+        if not delivery_id:
+            return False
+        with self.lock:
+            if delivery_id in self.deliveries:
+                return True
+            self.deliveries[delivery_id] = None
+            while len(self.deliveries) > self.history:
+                self.deliveries.popitem(last=False)
+            return False
+
+    def forget(self, delivery_id: Optional[str]):
+        # Una entrega que fallo al aplicarse no cuenta como recibida: GitHub la puede reenviar
+        if not delivery_id:
+            return
+        with self.lock:
+            self.deliveries.pop(delivery_id, None)
+
+    def apply(self, event: str, payload: dict) -> dict:
+        '''
+        Aplica un evento al almacen local.
+
+        Args:
+            "event": El tipo de evento (cabecera X-GitHub-Event).
+            "payload": El cuerpo del evento.
+
+        Returns:
+            Dict: El evento, la accion y si se modificaron repositorios o equipos.
+        '''
+        action = payload.get("action")
+        handler = getattr(self, f"apply_{event}", None)
+        result = {"event": event, "action": action, "repositories": False, "teams": False}
+        if handler is not None:
+            result.update(handler(action, payload))
+        # Las respuestas precalculadas se vuelven a armar desde el almacen en la siguiente peticion
+        if result["repositories"]:
+            snapshot_refresher.invalidate("repositories_statistics")
+        if result["teams"]:
+            snapshot_refresher.invalidate("teams")
+            team_graph.invalidate()
+        return result
+
+    def apply_ping(self, action: Optional[str], payload: dict) -> dict:
+        return {}
+
+    def update_repository(self, payload: dict, update) -> dict:
+        full_name = payload["repository"]["full_name"]
+        return {"repositories": self.store.update_repository_snapshot(full_name, update)}
+
+    def apply_push(self, action: Optional[str], payload: dict) -> dict:
+        # Solo los push a la rama principal cambian la fecha del ultimo commit
+        default_branch = payload["repository"].get("default_branch")
+        head_commit = payload.get("head_commit")
+        if payload.get("ref") != f"refs/heads/{default_branch}" or not head_commit:
+            return {}
+        date_last_commit = parse_github_date(head_commit["timestamp"])
+
+        def update(snapshot: RepositorySnapshot) -> RepositorySnapshot:
+            return snapshot.model_copy(update={
+                "lastUseDate": date_last_commit,
+                "state": calculate_state(date_last_commit),
+            })
+
+        return self.update_repository(payload, update)
+
+    def apply_pull_request(self, action: Optional[str], payload: dict) -> dict:
+        pull_request = payload["pull_request"]
+        user = pull_request.get("user") or {}
+        is_dependabot = user.get("login", "").startswith("dependabot")
+        # Los pull requests abiertos tambien cuentan como issues, igual que la API REST
+        deltas = {
+            "opened": {"prsOpen": 1, "issues": 1, "prsDependabot": 1 if is_dependabot else 0},
+            "closed": {"prsOpen": -1, "prsClosed": 1, "issues": -1},
+            "reopened": {"prsOpen": 1, "prsClosed": -1, "issues": 1},
+        }.get(action)
+        if deltas is None:
+            return {}
+        return self.update_repository(payload, lambda snapshot: add_counts(snapshot, deltas))
+
+    def apply_issues(self, action: Optional[str], payload: dict) -> dict:
+        was_open = payload["issue"].get("state") == "open"
+        delta = {
+            "opened": 1,
+            "reopened": 1,
+            "closed": -1,
+            # Al borrar un issue abierto deja de contar; uno cerrado ya no contaba
+            "deleted": -1 if was_open else 0,
+            "transferred": -1 if was_open else 0,
+        }.get(action, 0)
+        if not delta:
+            return {}
+        return self.update_repository(payload, lambda snapshot: add_counts(snapshot, {"issues": delta}))
+
+    def apply_repository(self, action: Optional[str], payload: dict) -> dict:
+        repository = payload["repository"]
+        if action == "deleted":
+            self.store.delete_repository(repository["full_name"])
+            return {"repositories": True}
+        if action in ("renamed", "transferred"):
+            # El nombre completo cambio: el snapshot viejo se borra y el nuevo se consulta completo
+            changes = payload.get("changes", {})
+            old_name = changes.get("repository", {}).get("name", {}).get("from", repository["name"])
+            old_owner = changes.get("owner", {}).get("from", {})
+            old_owner = (old_owner.get("user") or old_owner.get("organization") or repository["owner"])["login"]
+            self.store.delete_repository(f"{old_owner}/{old_name}")
+            return {"repositories": True}
+        return {}
+
+    def apply_membership(self, action: Optional[str], payload: dict) -> dict:
+        team_id = payload["team"]["id"]
+        member = Member(id=payload["member"]["id"], login=payload["member"]["login"])
+
+        def update(teams: List[Team]) -> List[Team]:
+            updated = []
+            for team in teams:
+                if team.id == team_id:
+                    members = [current for current in team.members if current.id != member.id]
+                    if action == "added":
+                        members.append(member)
+                    team = team.model_copy(update={"members": members, "members_count": len(members)})
+                updated.append(team)
+            return updated
+
+        if action not in ("added", "removed"):
+            return {}
+        return {"teams": self.store.update_teams(update)}
+
+    def apply_team(self, action: Optional[str], payload: dict) -> dict:
+        team_payload = payload["team"]
+
+        def update(teams: List[Team]) -> List[Team]:
+            teams = [team for team in teams if team.id != team_payload["id"] or action != "deleted"]
+            if action == "created" and all(team.id != team_payload["id"] for team in teams):
+                teams.append(Team(id=team_payload["id"], name=team_payload["name"], slug=team_payload.get("slug"), members_count=0, members=[]))
+            if action == "edited":
+                teams = [team.model_copy(update={"name": team_payload["name"], "slug": team_payload.get("slug", team.slug)}) if team.id == team_payload["id"] else team for team in teams]
+            return teams
+
+        if action in ("added_to_repository", "removed_from_repository"):
+            # Los repositorios del equipo se vuelven a pedir en la siguiente consulta de sus estadisticas
+            self.store.delete_team_repositories(team_payload["slug"])
+            return {}
+        if action not in ("created", "deleted", "edited"):
+            return {}
+        return {"teams": self.store.update_teams(update)}
+
+
+def add_counts(snapshot: RepositorySnapshot, deltas: dict) -> RepositorySnapshot:
+    return snapshot.model_copy(update={field: max(0, getattr(snapshot, field) + delta) for field, delta in deltas.items()})
+
+
+def calculate_state(date_last_commit: Optional[datetime]) -> str:
+    # Importado aqui para no crear un import circular con repository_service
+    from app.services.repository_service import repository_service
+    return repository_service.calculate_state(date_last_commit)
+
+
+# Crear una instancia del servicio
+webhook_service = WebhookService()
@@ -0,0 +1,22 @@
+import os
+import pytest
+
+# Las pruebas usan un almacen en memoria para no leer ni dejar datos en metadata.db
+os.environ.setdefault("METADATA_DB_PATH", ":memory:")
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_state():
+    from app.services.metadata_store import metadata_store
+    from app.services.rate_limiter import rate_limiter
+    from app.services.session_cache import session_user_cache
+    from app.services.single_flight import single_flight
+    from app.services.snapshot_refresher import snapshot_refresher
+    from app.services.team_graph import team_graph
+    metadata_store.clear()
+    rate_limiter.clear()
+    snapshot_refresher.clear()
+    single_flight.clear()
+    session_user_cache.clear()
+    team_graph.clear()
+    yield
@@ -0,0 +1,116 @@
+import asyncio
+import httpx
+from datetime import date
+from app.services.activity_engine import ActivityEngine
+from app.services.github_async import AsyncGithubClient
+from app.services.metadata_store import MetadataStore
+from app.services.user_service import UserService
+
+BASE_URL = "https://api.github.test"
+TODAY = date(2024, 5, 10)
+
+PULLS_PAGE_1 = [{"created_at": "2024-05-10T09:00:00Z"}, {"created_at": "2024-05-09T18:00:00Z"}]
+PULLS_PAGE_2 = [{"created_at": "2024-05-01T10:00:00Z"}, {"created_at": "2024-04-30T10:00:00Z"}]
+ISSUES = [
+    {"created_at": "2024-05-10T11:00:00Z"},
+    # Creado antes de la ventana pero actualizado dentro de ella
+    {"created_at": "2024-04-01T11:00:00Z"},
+    # Los pull requests tambien salen en el listado de issues
+    {"created_at": "2024-05-10T09:00:00Z", "pull_request": {}},
+]
+COMMITS = [
+    {"commit": {"author": {"date": "2024-05-10T08:00:00Z"}}},
+    # 2024-05-08 20:30 en Bogota es 2024-05-09 en UTC
+    {"commit": {"author": {"date": "2024-05-08T20:30:00-05:00"}}},
+]
+
+
+def fake_github(calls, empty=False):
+    def handler(request):
+        calls.append(request)
+        path = request.url.path
+        if path.endswith("/pulls"):
+            if request.url.params.get("page") == "2":
+                return httpx.Response(200, json=PULLS_PAGE_2)
+            last = f"{BASE_URL}{path}?page=3"
+            return httpx.Response(200, json=PULLS_PAGE_1, headers={
+                "Link": f'<{BASE_URL}{path}?page=2>; rel="next", <{last}>; rel="last"',
+            })
+        if path.endswith("/issues"):
+            return httpx.Response(200, json=ISSUES)
+        if path.endswith("/commits"):
+            if empty:
+                return httpx.Response(409, json={"message": "Git Repository is empty."})
+            return httpx.Response(200, json=COMMITS)
+        if path == "/user/repos":
+            return httpx.Response(200, json=[{"name": "repo1", "full_name": "owner1/repo1", "owner": {"login": "owner1"}}])
+        if path.endswith("/languages"):
+            return httpx.Response(200, json={"Python": 100})
+        return httpx.Response(404, json={"message": "Not Found"})
+    return httpx.MockTransport(handler)
+
+
+def make_engine(calls, empty=False):
+    client = AsyncGithubClient("token", base_url=BASE_URL, transport=fake_github(calls, empty))
+    return ActivityEngine(client, MetadataStore(":memory:"))
+
+
+def test_counts_only_the_window():
+    calls = []
+    engine = make_engine(calls)
+
+    actions = asyncio.run(engine.get_actions("owner1/repo1", days=1, today=TODAY))
+
+    assert actions == {TODAY: 3}
+    requests = {call.url.path.rsplit("/", 1)[1]: call.url.params for call in calls}
+    assert requests["commits"]["since"] == "2024-05-10T00:00:00Z"
+    assert requests["commits"]["until"] == "2024-05-11T00:00:00Z"
+    assert requests["issues"]["since"] == "2024-05-10T00:00:00Z"
+    assert requests["pulls"]["sort"] == "created" and requests["pulls"]["direction"] == "desc"
+
+def test_pull_requests_stop_at_the_window():
+    calls = []
+    engine = make_engine(calls)
+
+    asyncio.run(engine.get_actions("owner1/repo1", days=2, today=TODAY))
+
+    # La pagina 2 empieza fuera de la ventana y la 3 no se pide
+    pages = [call.url.params.get("page") for call in calls if call.url.path.endswith("/pulls")]
+    assert pages == [None, "2"]
+
+def test_week_window_by_day_and_cached():
+    calls = []
+    engine = make_engine(calls)
+
+    week = asyncio.run(engine.get_actions("owner1/repo1", days=7, today=TODAY))
+    calls.clear()
+    again = asyncio.run(engine.get_actions("owner1/repo1", days=7, today=TODAY))
+
+    assert list(week) == [date(2024, 5, day) for day in range(4, 11)]
+    assert week[date(2024, 5, 9)] == 2
+    assert week[TODAY] == 3
+    assert sum(week.values()) == 5
+    assert again == week
+    # Los dias terminados salen del almacen: solo se vuelve a pedir hoy
+    assert all(call.url.params.get("since", "2024-05-10").startswith("2024-05-10") for call in calls)
+
+def test_empty_repository_has_no_commits():
+    calls = []
+    engine = make_engine(calls, empty=True)
+
+    assert asyncio.run(engine.get_actions("owner1/repo1", today=TODAY)) == {TODAY: 2}
+
+def test_get_statistics_of_users_with_window(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.services.activity_engine.utc_today", lambda: TODAY)
+    service = UserService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=fake_github(calls))
+    service.activity_engine = ActivityEngine(service.async_client, MetadataStore(":memory:"))
+
+    stats = asyncio.run(service.get_statistics_of_users_async(days=7))
+
+    owner = stats.users_statistics["owner1"]
+    assert stats.window_days == 7
+    assert owner.actions_per_day == 3
+    assert owner.actions_by_day["2024-05-09"] == 2
+    assert owner.languages == {"Python": "100.00%"}
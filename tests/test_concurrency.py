@@ -0,0 +1,83 @@
+import threading
+import time
+from app.services.concurrency import map_in_pool
+
+
+def test_map_in_pool_keeps_order():
+    def slow_square(number):
+        # Los primeros elementos tardan mas para que terminen en desorden
+        time.sleep(0.01 * (5 - number))
+        return number * number
+
+    results = map_in_pool(slow_square, range(5), max_workers=5)
+
+    assert results == [0, 1, 4, 9, 16]
+
+def test_map_in_pool_respects_max_workers():
+    lock = threading.Lock()
+    state = {"running": 0, "max_running": 0}
+
+    def work(item):
+        with lock:
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return item
+
+    results = map_in_pool(work, range(10), max_workers=3)
+
+    assert results == list(range(10))
+    assert state["max_running"] <= 3
+
+def test_map_in_pool_single_worker_runs_sequentially():
+    calls = []
+
+    results = map_in_pool(lambda item: calls.append(threading.current_thread()) or item, [1, 2, 3], max_workers=1)
+
+    assert results == [1, 2, 3]
+    assert all(thread is threading.current_thread() for thread in calls)
+
+def test_map_in_pool_propagates_errors():
+    def fail(item):
+        raise ValueError(f"Error con {item}")
+
+    try:
+        map_in_pool(fail, [1, 2], max_workers=2)
+        assert False, "Se esperaba una excepcion"
+    except ValueError as e:
+        assert "Error con" in str(e)
+
+def test_stream_bounded_yields_as_completed_with_limit():
+    import asyncio
+    from app.services.concurrency import stream_bounded
+
+    state = {"running": 0, "max_running": 0, "read": 0}
+
+    async def items():
+        for number in range(6):
+            state["read"] += 1
+            yield number
+
+    async def work(number):
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        # Los primeros elementos tardan mas para que terminen en desorden
+        await asyncio.sleep(0.01 * (6 - number))
+        state["running"] -= 1
+        return number
+
+    async def run():
+        stream = stream_bounded(work, items(), limit=2)
+        first = await stream.__anext__()
+        read_before_first = state["read"]
+        rest = [number async for number in stream]
+        return first, read_before_first, rest
+
+    first, read_before_first, rest = asyncio.run(run())
+
+    assert first == 1
+    assert read_before_first == 2
+    assert sorted([first] + rest) == list(range(6))
+    assert state["max_running"] == 2
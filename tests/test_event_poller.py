@@ -0,0 +1,97 @@
+import asyncio
+import httpx
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from app.services.event_poller import EventPoller
+from app.services.github_async import AsyncGithubClient
+from app.services.metadata_store import MetadataStore, metadata_store
+from app.services.user_service import UserService
+
+BASE_URL = "https://api.github.test"
+
+
+def make_event(event_id, created_at, repo="owner1/repo1", actor="user1"):
+    return {"id": str(event_id), "type": "PushEvent", "repo": {"name": repo}, "actor": {"login": actor},
+            "public": True, "created_at": created_at}
+
+
+def fake_github(feed, calls, poll_interval="120"):
+    def handler(request):
+        calls.append(request)
+        path = request.url.path
+        if path == "/user/repos":
+            return httpx.Response(200, json=[{"full_name": "owner1/repo1"}])
+        if path == "/repos/owner1/repo1/events":
+            page = int(request.url.params.get("page", "1"))
+            headers = {"X-Poll-Interval": poll_interval}
+            if page < len(feed):
+                headers["Link"] = f'<{BASE_URL}{path}?page={page + 1}>; rel="next"'
+            return httpx.Response(200, json=feed[page - 1], headers=headers)
+        return httpx.Response(404, json={"message": "Not Found"})
+    return httpx.MockTransport(handler)
+
+
+def make_poller(feed, calls, store):
+    client = AsyncGithubClient("token", base_url=BASE_URL, transport=fake_github(feed, calls))
+    return EventPoller(client, store, tick=0, org_name=None)
+
+
+def test_poll_appends_new_events_once():
+    calls = []
+    store = MetadataStore(":memory:")
+    feed = [[make_event(3, "2024-05-10T12:00:00Z"), make_event(2, "2024-05-10T11:00:00Z")], [make_event(1, "2024-05-09T10:00:00Z")]]
+    poller = make_poller(feed, calls, store)
+
+    assert asyncio.run(poller.poll_feed("/repos/owner1/repo1/events", "owner1/repo1", None)) == 3
+    feed[0].insert(0, make_event(4, "2024-05-10T13:00:00Z"))
+    calls.clear()
+    assert asyncio.run(poller.poll_feed("/repos/owner1/repo1/events", "owner1/repo1", 3)) == 1
+
+    # La primera pagina ya trae eventos guardados: no se pide la segunda
+    assert len(calls) == 1
+    assert [event["id"] for event in store.get_events()] == [4, 3, 2, 1]
+    assert store.get_event_feeds()["/repos/owner1/repo1/events"]["last_event_id"] == 4
+
+def test_poll_once_honors_poll_interval():
+    calls = []
+    store = MetadataStore(":memory:")
+    poller = make_poller([[make_event(1, "2024-05-10T12:00:00Z")]], calls, store)
+
+    asyncio.run(poller.poll_once())
+    calls.clear()
+    asyncio.run(poller.poll_once())
+
+    assert store.get_event_feeds()["/repos/owner1/repo1/events"]["poll_interval"] == 120
+    assert [call.url.path for call in calls] == ["/user/repos"]
+
+def test_get_events_by_repo_actor_and_cursor():
+    store = MetadataStore(":memory:")
+    store.save_events([
+        {"id": 1, "type": "PushEvent", "repo": "o/a", "actor": "ana", "public": True, "created_at": "2024-05-10 10:00:00"},
+        {"id": 2, "type": "PushEvent", "repo": "o/b", "actor": "luis", "public": True, "created_at": "2024-05-10 10:00:00"},
+        {"id": 3, "type": "PushEvent", "repo": "o/a", "actor": "luis", "public": True, "created_at": "2024-05-10 11:00:00"},
+    ])
+
+    assert [event["id"] for event in store.get_events(repos=["o/a"])] == [3, 1]
+    assert [event["id"] for event in store.get_events(actor="luis")] == [3, 2]
+    assert [event["id"] for event in store.get_events(before=("2024-05-10 10:00:00", 2))] == [1]
+    assert [event["id"] for event in store.get_events(limit=1)] == [3]
+
+def test_user_events_read_polled_repositories_from_the_log():
+    metadata_store.save_event_feed("/repos/owner1/repo1/events", "owner1/repo1", 3, 60)
+    metadata_store.save_events([
+        {"id": 3, "type": "PushEvent", "repo": "owner1/repo1", "actor": "user1", "public": True, "created_at": "2024-05-10 12:00:00"},
+        {"id": 1, "type": "IssuesEvent", "repo": "owner1/repo1", "actor": "user1", "public": True, "created_at": "2024-05-09 12:00:00"},
+    ])
+    polled = MagicMock(full_name="owner1/repo1")
+    live = MagicMock(full_name="owner1/repo2")
+    live_event = MagicMock(id="2", type="PullRequestEvent", created_at=datetime(2024, 5, 10, 8, tzinfo=timezone.utc), public=True, org=None)
+    live_event.repo.name = "owner1/repo2"
+    live.get_events.return_value = [live_event]
+    user = MagicMock(disk_usage=100)
+    user.get_repos.return_value = [polled, live]
+
+    events = UserService().get_user_events(user)
+
+    assert [(event.id, event.repo) for event in events] == [("3", "owner1/repo1"), ("2", "owner1/repo2"), ("1", "owner1/repo1")]
+    polled.get_events.assert_not_called()
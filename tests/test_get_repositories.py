@@ -25,11 +25,12 @@ def mock_github_user():
 
 @patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
 @patch('app.services.repository_service.RepositoryService.get_last_commit_date')
-@patch('app.services.repository_service.RepositoryService.get_repository_state')
-def test_get_repositories_success(mock_get_repository_state, mock_get_last_commit_date, mock_get_repositories_from_github, mock_github_user):
+@patch('app.services.repository_service.RepositoryService.calculate_state')
+def test_get_repositories_success(mock_calculate_state, mock_get_last_commit_date, mock_get_repositories_from_github, mock_github_user):
     mock_get_repositories_from_github.return_value = mock_github_user.get_repos()
-    mock_get_last_commit_date.side_effect = [datetime(2023, 1, 1), datetime(2023, 2, 1)]
-    mock_get_repository_state.side_effect = ["Activo", "Inactivo"]
+    # Los repositorios se procesan en paralelo, por eso los mocks responden segun el repositorio
+    mock_get_last_commit_date.side_effect = lambda repository: {"repo1": datetime(2023, 1, 1), "repo2": datetime(2023, 2, 1)}[repository.name]
+    mock_calculate_state.side_effect = lambda date_last_commit: {datetime(2023, 1, 1): "Activo", datetime(2023, 2, 1): "Inactivo"}[date_last_commit]
 
     service = RepositoryService()
     repositories = service.get_repositories()
@@ -48,6 +49,22 @@ def test_get_repositories_success(mock_get_repository_state, mock_get_last_commi
     assert repositories[1].lastUseDate == datetime(2023, 2, 1)
     assert repositories[1].state == "Inactivo"
 
+@patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
+def test_get_repositories_lists_commits_once(mock_get_repositories_from_github, mock_github_user):
+    repos = mock_github_user.get_repos()
+    for repo in repos:
+        commit = MagicMock()
+        commit.commit.committer.date = datetime(2023, 1, 1)
+        repo.get_commits.return_value = [commit]
+    mock_get_repositories_from_github.return_value = repos
+
+    service = RepositoryService()
+    service.get_repositories()
+
+    # La fecha del ultimo commit sirve para la fecha de uso y para el estado
+    for repo in repos:
+        repo.get_commits.assert_called_once_with()
+
 @patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
 def test_get_repositories_exception(mock_get_repositories_from_github):
     mock_get_repositories_from_github.side_effect = Exception("Error al obtener los repositorios")
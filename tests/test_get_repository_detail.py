@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from fastapi import HTTPException
 from faker import Faker
+from github import UnknownObjectException
 from app.services.repository_service import RepositoryService
 from app.models.repository_model import Repository
 
@@ -55,6 +56,7 @@ def test_get_repository_detail_success(mock_get_repositories_from_github, mock_r
     mock_get_repositories_from_github.return_value = mock_repositories
 
     service = RepositoryService()
+    service.repository_index.refresh()
     repo_detail = service.get_repository_detail("repo1")
 
     assert repo_detail.name == "repo1"
@@ -77,27 +79,34 @@ def test_get_repository_detail_success(mock_get_repositories_from_github, mock_r
     for percentage in percentages:
         assert percentage in repo_detail.languagesPercentage
 
+@patch('app.services.repository_service.RepositoryService.fetch_repository')
 @patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
-def test_get_repository_detail_not_found(mock_get_repositories_from_github, mock_repositories):
+def test_get_repository_detail_not_found(mock_get_repositories_from_github, mock_fetch_repository, mock_repositories):
     mock_get_repositories_from_github.return_value = mock_repositories
+    mock_fetch_repository.return_value = None
 
     service = RepositoryService()
+    service.repository_index.refresh()
     with pytest.raises(HTTPException) as exc_info:
         service.get_repository_detail("repo3")
 
+    mock_fetch_repository.assert_called_once_with("repo3")
     assert exc_info.value.status_code == 404
     assert str(exc_info.value.detail) == "El repositorio 'repo3' no existe"
 
+@patch('app.services.repository_service.RepositoryService.fetch_repository')
 @patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
-def test_get_repository_detail_exception(mock_get_repositories_from_github):
-    mock_get_repositories_from_github.side_effect = Exception("Error al obtener repositorios")
+def test_get_repository_detail_exception(mock_get_repositories_from_github, mock_fetch_repository):
+    mock_get_repositories_from_github.return_value = []
+    mock_fetch_repository.side_effect = Exception("Error al obtener el repositorio")
 
     service = RepositoryService()
+    service.repository_index.refresh()
     with pytest.raises(HTTPException) as exc_info:
         service.get_repository_detail("repo1")
 
     assert exc_info.value.status_code == 500
-    assert str(exc_info.value.detail) == "Error al obtener los detalles del repositorio: Error al obtener repositorios"
+    assert str(exc_info.value.detail) == "Error al obtener los detalles del repositorio: Error al obtener el repositorio"
 
 def test_languages_percentage_calculation():
     repo = MagicMock()
@@ -130,3 +139,34 @@ def test_languages_percentage_calculation():
     assert repo_detail.languagesPercentage == percentages
     assert "Python: 60.00%" in repo_detail.languagesPercentage
     assert "JavaScript: 40.00%" in repo_detail.languagesPercentage
+
+@patch('app.services.repository_service.RepositoryService.fetch_repository')
+@patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
+def test_get_repository_detail_retries_a_stale_repository(mock_get_repositories_from_github, mock_fetch_repository, mock_repositories):
+    # El repositorio del indice se renombro: GitHub responde 404 al usarlo
+    stale = mock_repositories[0]
+    stale.get_collaborators.side_effect = UnknownObjectException(404, {"message": "Not Found"}, {})
+    mock_get_repositories_from_github.return_value = mock_repositories
+    mock_fetch_repository.return_value = mock_repositories[1]
+
+    service = RepositoryService()
+    service.repository_index.refresh()
+    repo_detail = service.get_repository_detail("repo1")
+
+    assert repo_detail.name == "repo2"
+    mock_fetch_repository.assert_called_once_with("repo1")
+
+@patch('app.services.repository_service.RepositoryService.fetch_repository')
+@patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
+def test_get_repository_detail_deleted_repository(mock_get_repositories_from_github, mock_fetch_repository, mock_repositories):
+    mock_repositories[0].get_collaborators.side_effect = UnknownObjectException(404, {"message": "Not Found"}, {})
+    mock_get_repositories_from_github.return_value = mock_repositories
+    mock_fetch_repository.return_value = None
+
+    service = RepositoryService()
+    service.repository_index.refresh()
+    with pytest.raises(HTTPException) as exc_info:
+        service.get_repository_detail("repo1")
+
+    assert exc_info.value.status_code == 404
+    assert str(exc_info.value.detail) == "El repositorio 'repo1' no existe"
@@ -33,6 +33,7 @@ def test_get_statistics_by_detail_success(mock_get_repositories_from_github, moc
     mock_get_repositories_from_github.return_value = mock_repositories
 
     service = RepositoryService()
+    service.repository_index.refresh()
     stats = service.get_statistics_by_detail("repo1")
 
     assert stats.collaborators == 10
@@ -50,24 +51,31 @@ def test_get_statistics_by_detail_success(mock_get_repositories_from_github, moc
     assert f"Python: {python_percentage:.2f}%" in stats.percentagesLanguages
     assert f"JavaScript: {javascript_percentage:.2f}%" in stats.percentagesLanguages
 
+@patch('app.services.repository_service.RepositoryService.fetch_repository')
 @patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
-def test_get_statistics_by_detail_not_found(mock_get_repositories_from_github, mock_repositories):
+def test_get_statistics_by_detail_not_found(mock_get_repositories_from_github, mock_fetch_repository, mock_repositories):
     mock_get_repositories_from_github.return_value = mock_repositories
+    mock_fetch_repository.return_value = None
 
     service = RepositoryService()
+    service.repository_index.refresh()
     with pytest.raises(HTTPException) as exc_info:
         service.get_statistics_by_detail("repo3")
 
+    mock_fetch_repository.assert_called_once_with("repo3")
     assert exc_info.value.status_code == 404
     assert str(exc_info.value.detail) == "El repositorio 'repo3' no existe"
 
+@patch('app.services.repository_service.RepositoryService.fetch_repository')
 @patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
-def test_get_statistics_by_detail_exception(mock_get_repositories_from_github):
-    mock_get_repositories_from_github.side_effect = Exception("Error al obtener repositorios")
+def test_get_statistics_by_detail_exception(mock_get_repositories_from_github, mock_fetch_repository):
+    mock_get_repositories_from_github.return_value = []
+    mock_fetch_repository.side_effect = Exception("Error al obtener el repositorio")
 
     service = RepositoryService()
+    service.repository_index.refresh()
     with pytest.raises(HTTPException) as exc_info:
         service.get_statistics_by_detail("repo1")
 
     assert exc_info.value.status_code == 500
-    assert str(exc_info.value.detail) == "Error al obtener estadísticas detalladas del repositorio: Error al obtener repositorios"
+    assert str(exc_info.value.detail) == "Error al obtener estadísticas detalladas del repositorio: Error al obtener el repositorio"
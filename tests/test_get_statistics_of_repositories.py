@@ -11,10 +11,14 @@ def mock_repositories():
     repo1.name = "repo1"
     repo1.owner.login = "owner1"
     repo1.created_at = datetime(2023, 1, 1)
-    repo1.get_issues.return_value = [MagicMock(title="Issue 1"), MagicMock(title="Issue 2")]
-    repo1.get_pulls.side_effect = lambda state: (
-        [MagicMock(), MagicMock()] if state == "open" else [MagicMock(), MagicMock()]
-    ) if state != "all" else [MagicMock(user=MagicMock(login="dependabot")), MagicMock(user=MagicMock(login="dependabot"))]
+    repo1.get_issues.return_value.totalCount = 2
+    repo1.get_pulls.return_value = [
+        MagicMock(state="open", user=MagicMock(login="dependabot")),
+        MagicMock(state="open", user=MagicMock(login="user1")),
+        MagicMock(state="closed", user=MagicMock(login="dependabot")),
+        MagicMock(state="closed", user=MagicMock(login="user1")),
+    ]
+    repo1.get_commits.return_value = []
     repo1.get_collaborators.return_value = [MagicMock(login="collab1"), MagicMock(login="collab2")]
     repo1.get_languages.return_value = {"Python": 1000, "JavaScript": 2000}
 
@@ -22,10 +26,13 @@ def mock_repositories():
     repo2.name = "repo2"
     repo2.owner.login = "owner2"
     repo2.created_at = datetime(2023, 2, 1)
-    repo2.get_issues.return_value = [MagicMock(title="Issue 3")]
-    repo2.get_pulls.side_effect = lambda state: (
-        [MagicMock()] if state == "open" else [MagicMock(), MagicMock()]
-    ) if state != "all" else [MagicMock(user=MagicMock(login="dependabot")), MagicMock(user=MagicMock(login="dependabot"))]
+    repo2.get_issues.return_value.totalCount = 1
+    repo2.get_pulls.return_value = [
+        MagicMock(state="open", user=MagicMock(login="user2")),
+        MagicMock(state="closed", user=MagicMock(login="dependabot[bot]")),
+        MagicMock(state="closed", user=MagicMock(login="dependabot[bot]")),
+    ]
+    repo2.get_commits.return_value = []
     repo2.get_collaborators.return_value = [MagicMock(login="collab2"), MagicMock(login="collab3")]
     repo2.get_languages.return_value = {"Python": 3000, "TypeScript": 500}
 
@@ -81,8 +88,9 @@ def test_get_statistics_of_repositories_collaborators_exception(mock_get_reposit
     repo_with_error.name = "repo_with_error"
     repo_with_error.owner.login = "owner_with_error"
     repo_with_error.created_at = datetime(2023, 3, 1)
-    repo_with_error.get_issues.return_value = []
+    repo_with_error.get_issues.return_value.totalCount = 0
     repo_with_error.get_pulls.side_effect = lambda state: []
+    repo_with_error.get_commits.return_value = []
     repo_with_error.get_collaborators.side_effect = Exception("Error al obtener colaboradores")
     repo_with_error.get_languages.return_value = {}
 
@@ -97,3 +105,38 @@ def test_get_statistics_of_repositories_collaborators_exception(mock_get_reposit
     assert stats.collaborators == 0  
     captured = capsys.readouterr()
     assert "Error al obtener colaboradores" in captured.out  
+
+@patch('app.services.repository_service.RepositoryService.get_repositories_from_github')
+def test_get_statistics_of_repositories_single_pass(mock_get_repositories_from_github, mock_repositories):
+    mock_get_repositories_from_github.return_value = mock_repositories
+    repo1, repo2 = list(mock_repositories.__iter__.return_value)
+    mock_repositories.__iter__.return_value = iter([repo1, repo2])
+
+    service = RepositoryService()
+    service.get_statistics_of_repositories()
+
+    for repository in (repo1, repo2):
+        repository.get_pulls.assert_called_once_with(state="all")
+        repository.get_issues.assert_called_once()
+        repository.get_commits.assert_called_once()
+        repository.get_collaborators.assert_called_once()
+        repository.get_languages.assert_called_once()
+
+def test_collect_repository_snapshot(mock_repositories):
+    repo1 = next(iter(mock_repositories))
+    commit = MagicMock()
+    commit.commit.committer.date = datetime.now()
+    repo1.get_commits.return_value = [commit]
+
+    service = RepositoryService()
+    snapshot = service.collect_repository_snapshot(repo1)
+
+    assert snapshot.name == "repo1"
+    assert snapshot.owner == "owner1"
+    assert snapshot.state == "Activo"
+    assert snapshot.prsOpen == 2
+    assert snapshot.prsClosed == 2
+    assert snapshot.prsDependabot == 2
+    assert snapshot.issues == 2
+    assert snapshot.collaborators == ["collab1", "collab2"]
+    assert snapshot.languages == {"Python": 1000, "JavaScript": 2000}
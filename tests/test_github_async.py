@@ -0,0 +1,207 @@
+import asyncio
+import httpx
+import pytest
+from datetime import datetime, timezone
+from app.services.github_async import AsyncGithubClient, parse_github_date
+from app.services.repository_service import RepositoryService
+from app.services.teams_service import TeamsService
+
+BASE_URL = "https://api.github.test"
+NOW = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_repository(name, owner="owner1"):
+    return {
+        "name": name,
+        "full_name": f"{owner}/{name}",
+        "owner": {"login": owner},
+        "created_at": "2023-01-01T00:00:00Z",
+    }
+
+
+def fake_github(routes):
+    '''
+    Crea un transporte de httpx que responde como la API de GitHub usando un diccionario
+    de rutas a (json, cabeceras).
+    '''
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        key = request.url.path
+        if request.url.params.get("page"):
+            key += f"?page={request.url.params['page']}"
+        if key not in routes:
+            return httpx.Response(404, json={"message": "Not Found"})
+        body, headers = routes[key]
+        return httpx.Response(200, json=body, headers=headers)
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_parse_github_date():
+    assert parse_github_date("2023-01-01T10:00:00Z") == datetime(2023, 1, 1, 10, 0, tzinfo=timezone.utc)
+    assert parse_github_date(None) is None
+
+def test_paginate_follows_next_links():
+    transport, calls = fake_github({
+        "/user/repos": ([1, 2], {"Link": f'<{BASE_URL}/user/repos?page=2>; rel="next"'}),
+        "/user/repos?page=2": ([3], {}),
+    })
+    client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    async def run():
+        return [item async for item in client.paginate("/user/repos")]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+    assert len(calls) == 2
+    assert calls[0].headers["Authorization"] == "Bearer token"
+
+def test_count_uses_last_link():
+    transport, calls = fake_github({
+        "/repos/owner1/repo1/issues": ([{}], {"Link": f'<{BASE_URL}/repos/owner1/repo1/issues?per_page=1&page=42>; rel="last"'}),
+    })
+    client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    assert asyncio.run(client.count("/repos/owner1/repo1/issues")) == 42
+    assert len(calls) == 1
+    assert calls[0].url.params["per_page"] == "1"
+
+def test_request_error_raises():
+    transport, _ = fake_github({})
+    client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.get_json("/user/repos"))
+
+def test_get_statistics_of_repositories_async():
+    transport, calls = fake_github({
+        "/user/repos": ([make_repository("repo1"), make_repository("repo2")], {}),
+        "/repos/owner1/repo1/pulls": ([
+            {"state": "open", "user": {"login": "dependabot[bot]"}},
+            {"state": "closed", "user": {"login": "user1"}},
+        ], {}),
+        "/repos/owner1/repo2/pulls": ([{"state": "closed", "user": {"login": "user2"}}], {}),
+        "/repos/owner1/repo1/collaborators": ([{"login": "collab1"}, {"login": "collab2"}], {}),
+        "/repos/owner1/repo2/collaborators": ([{"login": "collab2"}], {}),
+        "/repos/owner1/repo1/issues": ([{}], {}),
+        "/repos/owner1/repo2/issues": ([], {}),
+        "/repos/owner1/repo1/languages": ({"Python": 3000}, {}),
+        "/repos/owner1/repo2/languages": ({"Python": 1000, "Go": 1000}, {}),
+        "/repos/owner1/repo1/commits": ([{"commit": {"committer": {"date": NOW}}}], {}),
+        "/repos/owner1/repo2/commits": ([{"commit": {"committer": {"date": "2020-01-01T00:00:00Z"}}}], {}),
+    })
+    service = RepositoryService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    stats = asyncio.run(service.get_statistics_of_repositories_async())
+
+    assert stats.repositories == 2
+    assert stats.repositoriesActives == 1
+    assert stats.repositoriesInactives == 1
+    assert stats.prsOpen == 1
+    assert stats.prsClosed == 2
+    assert stats.prsDependabot == 1
+    assert stats.collaborators == 2
+    assert stats.issues == 1
+    assert "Python: 80.00%" in stats.percentages_languages
+    assert "Go: 20.00%" in stats.percentages_languages
+    # 1 listado + 5 consultas por repositorio
+    assert len(calls) == 11
+
+def test_get_repositories_async():
+    transport, _ = fake_github({
+        "/user/repos": ([make_repository("repo1")], {}),
+        "/repos/owner1/repo1/commits": ([{"commit": {"committer": {"date": NOW}}}], {}),
+    })
+    service = RepositoryService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    repositories = asyncio.run(service.get_repositories_async())
+
+    assert len(repositories) == 1
+    assert repositories[0].name == "repo1"
+    assert repositories[0].owner == "owner1"
+    assert repositories[0].state == "Activo"
+
+def test_get_teams_async(monkeypatch):
+    monkeypatch.setattr("app.services.teams_service.ORG_NAME", "org1")
+    transport, _ = fake_github({
+        "/orgs/org1/teams": ([{"id": 1, "name": "Team A", "slug": "team-a"}], {}),
+        "/orgs/org1/teams/team-a/members": ([{"id": 10, "login": "user1"}, {"id": 11, "login": "user2"}], {}),
+    })
+    service = TeamsService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    response = asyncio.run(service.get_teams_async())
+
+    assert response.total_teams == 1
+    assert response.teams[0].members_count == 2
+    assert response.teams[0].members[0].login == "user1"
+
+def test_get_statistics_fast_uses_only_the_listing():
+    recent = NOW
+    transport, calls = fake_github({
+        "/user/repos": ([
+            dict(make_repository("repo1"), pushed_at=recent, open_issues_count=3, language="Python", size=300, archived=False),
+            dict(make_repository("repo2"), pushed_at="2020-01-01T00:00:00Z", open_issues_count=1, language="Go", size=100, archived=False),
+            dict(make_repository("repo3"), pushed_at=recent, open_issues_count=0, language=None, size=0, archived=True),
+        ], {}),
+    })
+    service = RepositoryService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    stats = asyncio.run(service.get_statistics_fast_async())
+    repositories = asyncio.run(service.get_repositories_fast_async())
+
+    assert len(calls) == 2
+    assert stats.repositories == 3
+    assert stats.repositoriesActives == 1
+    assert stats.repositoriesInactives == 2
+    assert stats.issues == 4
+    assert stats.prsOpen is None
+    assert stats.percentages_languages == ["Python: 75.00%", "Go: 25.00%"]
+    assert [repository.state for repository in repositories] == ["Activo", "Inactivo", "Inactivo"]
+
+def test_stream_repositories_async():
+    transport, calls = fake_github({
+        "/user/repos": ([make_repository("repo1"), make_repository("repo2")], {}),
+        "/repos/owner1/repo1/commits": ([{"commit": {"committer": {"date": NOW}}}], {}),
+        "/repos/owner1/repo2/commits": ([], {}),
+    })
+    service = RepositoryService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    async def run():
+        return [repository async for repository in service.stream_repositories_async()]
+
+    repositories = {repository.name: repository for repository in asyncio.run(run())}
+
+    assert repositories["repo1"].state == "Activo"
+    assert repositories["repo2"].state == "No hay commits"
+
+def test_get_repositories_page_skips_commit_lookups():
+    transport, calls = fake_github({
+        "/user/repos": ([make_repository("repo1"), make_repository("repo2"), make_repository("repo3")], {}),
+        "/repos/owner1/repo1/commits": ([], {}),
+        "/repos/owner1/repo2/commits": ([], {}),
+    })
+    service = RepositoryService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    names, next_offset = asyncio.run(service.get_repositories_page_async(["name"], limit=2))
+
+    assert names == [{"name": "repo1"}, {"name": "repo2"}]
+    assert next_offset == 2
+    assert [call.url.path for call in calls] == ["/user/repos"]
+
+    last_page, next_offset = asyncio.run(service.get_repositories_page_async(["name"], limit=2, offset=2))
+    assert last_page == [{"name": "repo3"}]
+    assert next_offset is None
+
+    calls.clear()
+    states, _ = asyncio.run(service.get_repositories_page_async(["name", "state"], limit=2))
+    assert states == [{"name": "repo1", "state": "No hay commits"}, {"name": "repo2", "state": "No hay commits"}]
+    assert sorted(call.url.path for call in calls if call.url.path.endswith("/commits")) == [
+        "/repos/owner1/repo1/commits", "/repos/owner1/repo2/commits",
+    ]
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import re
+import threading
+import httpx
+import pytest
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from app.services.github_async import AsyncGithubClient
+from app.services.graphql_service import GraphQLRepositoryBackend
+from app.services.repository_service import RepositoryService
+
+NOW = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# Datos que devuelve el servidor GraphQL de prueba por repositorio
+FAKE_REPOSITORIES = {
+    ("owner1", "repo1"): {
+        "createdAt": "2023-01-01T00:00:00Z",
+        "committedDate": NOW,
+        "collaborators": ["collab1", "collab2"],
+        "prsOpen": 2, "prsClosed": 3, "issues": 4, "branches": 5, "dependabot": 1,
+        "languages": {"Python": 3000, "JavaScript": 1000},
+    },
+    ("owner1", "repo2"): {
+        "createdAt": "2023-02-01T00:00:00Z",
+        "committedDate": "2020-01-01T00:00:00Z",
+        "collaborators": ["collab2"],
+        "prsOpen": 1, "prsClosed": 0, "issues": 0, "branches": 1, "dependabot": 2,
+        "languages": {"Python": 1000},
+    },
+    ("owner2", "repo3"): {
+        "createdAt": "2023-03-01T00:00:00Z",
+        "committedDate": None,
+        "collaborators": [],
+        "prsOpen": 0, "prsClosed": 1, "issues": 1, "branches": 1, "dependabot": 0,
+        "languages": {},
+    },
+}
+
+
+def collaborators_page(logins, start):
+    # Paginas de 100 colaboradores; el cursor es la posicion donde empieza la siguiente
+    end = start + 100
+    return {
+        "totalCount": len(logins),
+        "pageInfo": {"hasNextPage": end < len(logins), "endCursor": str(end)},
+        "nodes": [{"login": login} for login in logins[start:end]],
+    }
+
+
+def fake_repository_node(owner, name):
+    repository = FAKE_REPOSITORIES.get((owner, name))
+    if repository is None:
+        return None
+    target = {"committedDate": repository["committedDate"]} if repository["committedDate"] else None
+    return {
+        "name": name,
+        "owner": {"login": owner},
+        "createdAt": repository["createdAt"],
+        "defaultBranchRef": {"target": target} if target else None,
+        "collaborators": collaborators_page(repository["collaborators"], 0),
+        "prsOpen": {"totalCount": repository["prsOpen"]},
+        "prsClosed": {"totalCount": repository["prsClosed"]},
+        "issues": {"totalCount": repository["issues"]},
+        "refs": {"totalCount": repository["branches"]},
+        "languages": {"edges": [{"size": size, "node": {"name": lang}} for lang, size in repository["languages"].items()]},
+    }
+
+
+class StubGraphQLHandler(BaseHTTPRequestHandler):
+    '''
+    Servidor GraphQL local que entiende los alias rN/dN que arma GraphQLRepositoryBackend.
+    '''
+    queries = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubGraphQLHandler.queries.append(body)
+        variables = body["variables"]
+        data = {}
+        if "after" in variables:
+            logins = FAKE_REPOSITORIES[(variables["owner"], variables["name"])]["collaborators"]
+            data["repository"] = {"collaborators": collaborators_page(logins, int(variables["after"]))}
+        for index in re.findall(r"\br(\d+): repository\(", body["query"]):
+            owner, name = variables[f"o{index}"], variables[f"n{index}"]
+            data[f"r{index}"] = fake_repository_node(owner, name)
+            repository = FAKE_REPOSITORIES.get((owner, name))
+            data[f"d{index}"] = {"issueCount": repository["dependabot"] if repository else 0}
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def graphql_server():
+    StubGraphQLHandler.queries = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGraphQLHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_backend(base_url, batch_size=20):
+    service = RepositoryService()
+    return GraphQLRepositoryBackend(AsyncGithubClient("token", base_url=base_url), service.calculate_state, batch_size)
+
+
+def test_build_query_uses_variables():
+    backend = make_backend("http://localhost")
+
+    query, variables = backend.build_query([("owner1", "repo1"), ("owner1", "repo2")])
+
+    assert "r0: repository(owner: $o0, name: $n0)" in query
+    assert "d1: search(query: $q1, type: ISSUE)" in query
+    assert variables["o1"] == "owner1"
+    assert variables["n1"] == "repo2"
+    assert variables["q0"] == "repo:owner1/repo1 is:pr author:app/dependabot"
+
+def test_fetch_snapshots_in_batches(graphql_server):
+    backend = make_backend(graphql_server, batch_size=2)
+
+    snapshots = asyncio.run(backend.fetch_snapshots([("owner1", "repo1"), ("owner1", "repo2"), ("owner2", "repo3")]))
+
+    # 3 repositorios en lotes de 2: solo 2 peticiones
+    assert len(StubGraphQLHandler.queries) == 2
+    assert [snapshot.name for snapshot in snapshots] == ["repo1", "repo2", "repo3"]
+
+    repo1 = snapshots[0]
+    assert repo1.state == "Activo"
+    assert repo1.prsOpen == 2
+    assert repo1.prsClosed == 3
+    assert repo1.prsDependabot == 1
+    assert repo1.issues == 6  # 4 issues + 2 pull requests abiertos, igual que la API REST
+    assert repo1.branches == 5
+    assert repo1.collaborators == ["collab1", "collab2"]
+    assert repo1.languages == {"Python": 3000, "JavaScript": 1000}
+
+    assert snapshots[1].state == "Inactivo"
+    assert snapshots[2].state == "No hay commits"
+
+def test_fetch_snapshots_skips_missing_repositories(graphql_server):
+    backend = make_backend(graphql_server)
+
+    snapshots = asyncio.run(backend.fetch_snapshots([("owner1", "repo1"), ("owner9", "missing")]))
+
+    assert [snapshot.name for snapshot in snapshots] == ["repo1"]
+
+def test_get_statistics_of_repositories_with_graphql_backend(graphql_server):
+    listing = [
+        {"name": name, "owner": {"login": owner}, "full_name": f"{owner}/{name}", "created_at": "2023-01-01T00:00:00Z"}
+        for owner, name in FAKE_REPOSITORIES
+    ]
+
+    def rest_handler(request):
+        return httpx.Response(200, json=listing)
+
+    service = RepositoryService(stats_backend="graphql")
+    service.async_client = AsyncGithubClient("token", transport=httpx.MockTransport(rest_handler))
+    service.graphql_backend = make_backend(graphql_server)
+
+    stats = asyncio.run(service.get_statistics_of_repositories_async())
+
+    assert len(StubGraphQLHandler.queries) == 1
+    assert stats.repositories == 3
+    assert stats.repositoriesActives == 1
+    assert stats.repositoriesInactives == 1
+    assert stats.prsOpen == 3
+    assert stats.prsClosed == 4
+    assert stats.prsDependabot == 3
+    assert stats.collaborators == 2
+    assert stats.issues == 8
+    assert "Python: 80.00%" in stats.percentages_languages
+
+def test_get_statistics_by_detail_with_graphql_backend(graphql_server):
+    service = RepositoryService(stats_backend="graphql")
+    service.find_repository = lambda repo_name: SimpleNamespace(name=repo_name, owner=SimpleNamespace(login="owner1"))
+    service.graphql_backend = make_backend(graphql_server)
+
+    stats = asyncio.run(service.get_statistics_by_detail_async("repo2"))
+
+    assert stats.collaborators == 1
+    assert stats.prsOpen == 1
+    assert stats.prsDependabot == 2
+    assert stats.branches == 1
+    assert stats.percentagesLanguages == ["Python: 100.00%"]
+
+def test_collaborators_past_the_first_page(graphql_server, monkeypatch):
+    logins = [f"collab{number}" for number in range(250)]
+    monkeypatch.setitem(FAKE_REPOSITORIES, ("owner1", "big"), {**FAKE_REPOSITORIES[("owner1", "repo1")], "collaborators": logins})
+    backend = make_backend(graphql_server)
+
+    snapshots = asyncio.run(backend.fetch_snapshots([("owner1", "big"), ("owner1", "repo1")]))
+
+    assert snapshots[0].collaborators == logins
+    assert snapshots[1].collaborators == ["collab1", "collab2"]
+    # Una consulta por el lote y dos por las paginas siguientes del repositorio grande
+    assert len(StubGraphQLHandler.queries) == 3
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github import Auth, Github
+from app.services.github_async import AsyncGithubClient
+from app.services.http_cache import HttpCache, http_cache
+
+
+def test_store_and_conditional_headers():
+    cache = HttpCache(max_entries=10)
+    key = cache.key("https://api.github.com/user/repos", "token abc")
+
+    assert cache.conditional_headers(key) == {}
+    cache.store(key, {"ETag": '"v1"', "Content-Encoding": "gzip"}, b"[]")
+
+    assert cache.conditional_headers(key) == {"If-None-Match": '"v1"'}
+    assert "content-encoding" not in cache.get(key).headers
+
+def test_store_without_validators_is_ignored():
+    cache = HttpCache(max_entries=10)
+    key = cache.key("https://api.github.com/user/repos")
+
+    cache.store(key, {"Content-Type": "application/json"}, b"[]")
+
+    assert cache.get(key) is None
+
+def test_last_modified_is_used_without_etag():
+    cache = HttpCache(max_entries=10)
+    key = cache.key("https://api.github.com/user")
+
+    cache.store(key, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, b"{}")
+
+    assert cache.conditional_headers(key) == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+def test_key_depends_on_token():
+    assert HttpCache.key("https://api.github.com/user", "token a") != HttpCache.key("https://api.github.com/user", "token b")
+
+def test_lru_eviction():
+    cache = HttpCache(max_entries=2)
+    cache.store("a", {"ETag": "1"}, b"a")
+    cache.store("b", {"ETag": "2"}, b"b")
+    cache.get("a")
+    cache.store("c", {"ETag": "3"}, b"c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_revalidated_merges_headers_and_counts_hit():
+    cache = HttpCache(max_entries=10)
+    cache.store("a", {"ETag": "1", "X-RateLimit-Remaining": "10"}, b"body")
+    cache.record_miss()
+
+    entry = cache.revalidated("a", {"X-RateLimit-Remaining": "9"})
+
+    assert entry.body == b"body"
+    assert entry.headers["x-ratelimit-remaining"] == "9"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+    assert cache.revalidated("missing", {}) is None
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    '''
+    Servidor local que responde un repositorio con ETag y 304 si la peticion es condicional.
+    '''
+    requests = []
+
+    def do_GET(self):
+        ETagHandler.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("X-RateLimit-Remaining", "4999")
+            self.end_headers()
+            return
+        payload = json.dumps({"name": "repo1", "full_name": "owner1/repo1"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    ETagHandler.requests = []
+    http_cache.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pygithub_requests_are_conditional(etag_server):
+    github = Github(auth=Auth.Token("token"), base_url=etag_server, retry=None)
+    hits_before = http_cache.stats()["hits"]
+
+    first = github.get_repo("owner1/repo1")
+    second = github.get_repo("owner1/repo1")
+
+    assert first.name == second.name == "repo1"
+    assert "If-None-Match" not in ETagHandler.requests[0]
+    assert ETagHandler.requests[1]["If-None-Match"] == '"v1"'
+    assert http_cache.stats()["hits"] == hits_before + 1
+
+def test_async_client_requests_are_conditional(etag_server):
+    client = AsyncGithubClient("token", base_url=etag_server)
+
+    async def run():
+        first = await client.get_json("/repos/owner1/repo1")
+        second = await client.get_json("/repos/owner1/repo1")
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == {"name": "repo1", "full_name": "owner1/repo1"}
+    assert ETagHandler.requests[1]["If-None-Match"] == '"v1"'
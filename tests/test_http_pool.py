@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from github import Auth, Github
+from app.services.github_async import AsyncGithubClient
+from app.services.http_pool import HttpPool, http_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    '''
+    Servidor local con keep-alive que anota desde que conexion (puerto del cliente) llega cada peticion.
+    '''
+    protocol_version = "HTTP/1.1"
+    ports = []
+
+    def do_GET(self):
+        KeepAliveHandler.ports.append(self.client_address[1])
+        payload = json.dumps({"name": "repo1", "full_name": "owner1/repo1", "login": "user1"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def keep_alive_server():
+    KeepAliveHandler.ports = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pygithub_clients_share_connections(keep_alive_server):
+    # Como el cliente del servidor y el de la sesion de un usuario
+    server_client = Github(auth=Auth.Token("token"), base_url=keep_alive_server, retry=None)
+    session_client = Github(auth=Auth.Token("user-token"), base_url=keep_alive_server, retry=None)
+
+    server_client.get_repo("owner1/repo1")
+    session_client.get_repo("owner1/repo2")
+    server_client.get_repo("owner1/repo3")
+
+    assert len(KeepAliveHandler.ports) == 3
+    assert len(set(KeepAliveHandler.ports)) == 1
+    stats = http_pool.stats()["sync"][keep_alive_server]
+    assert stats["connections"] == 1
+    assert stats["requests"] >= 3
+
+def test_async_clients_share_one_transport(keep_alive_server):
+    first = AsyncGithubClient("token", base_url=keep_alive_server)
+    second = AsyncGithubClient("user-token", base_url=keep_alive_server)
+
+    async def run():
+        await first.get_json("/repos/owner1/repo1")
+        await first.aclose()
+        # Cerrar un cliente no cierra las conexiones compartidas
+        await second.get_json("/repos/owner1/repo2")
+        stats = http_pool.stats()["async"]
+        await second.aclose()
+        await http_pool.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert len(set(KeepAliveHandler.ports)) == 1
+    assert stats == {"connections": 1, "idle": 1}
+
+def test_pool_size_covers_requested_size():
+    pool = HttpPool(pool_size=16)
+
+    small = pool.session("https", "api.github.com", 443, pool_size=4)
+    large = HttpPool(pool_size=4).session("https", "api.github.com", 443, pool_size=32)
+
+    assert small is pool.session("https", "api.github.com", 443)
+    assert small.get_adapter("https://api.github.com")._pool_maxsize == 16
+    assert large.get_adapter("https://api.github.com")._pool_maxsize == 32
+
+def test_http2_requires_h2(monkeypatch):
+    monkeypatch.setattr("app.services.http_pool.http2_available", lambda: False)
+
+    assert HttpPool(http2=True).http2 is False
+
+def test_shared_adapter_only_retries_connection_errors():
+    retry = HttpPool().session("https", "api.github.com", 443).get_adapter("https://api.github.com").max_retries
+
+    # Los 403, 429 y 5xx los reintenta GithubConnection.send con el rate_limiter, no urllib3
+    assert not retry.is_retry("GET", 403, has_retry_after=True)
+    assert not retry.is_retry("GET", 429, has_retry_after=True)
+    assert not retry.is_retry("GET", 503, has_retry_after=True)
+    assert retry.total > 0
+
+def test_async_stats_without_pool_internals():
+    assert HttpPool.async_stats([object()]) == {"connections": None, "idle": None}
+    assert HttpPool.async_stats([]) == {"connections": 0, "idle": 0}
@@ -93,3 +93,40 @@ def test_auth_no_access_token(mock_authorize_access_token, mock_request_session)
     response = client.post("/auth")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
     assert "Token de acceso no obtenido" in response.json()["detail"]
+
+# Pruebas de la cache de usuarios por sesion
+@patch("app.routers.login_router.Github")
+def test_get_current_user_is_cached_per_session(mock_github, mock_github_user, mock_request_session):
+    mock_request_session.get.return_value = "fake_token"
+    mock_github.return_value.get_user.return_value = mock_github_user
+
+    first = client.get("/inicio")
+    second = client.get("/inicio")
+
+    assert first.status_code == second.status_code == status.HTTP_200_OK
+    mock_github.assert_called_once_with("fake_token", per_page=100, seconds_between_requests=None)
+    mock_github.return_value.get_user.assert_called_once()
+
+@patch("app.routers.login_router.Github")
+def test_logout_invalidates_cached_user(mock_github, mock_github_user, mock_request_session):
+    mock_request_session.get.return_value = "fake_token"
+    mock_github.return_value.get_user.return_value = mock_github_user
+
+    client.get("/inicio")
+    client.get("/logout")
+    client.get("/inicio")
+
+    assert mock_github.call_count == 2
+
+@patch("app.services.session_cache.time.time")
+def test_session_user_expires(mock_time):
+    from app.services.session_cache import SessionUserCache
+    cache = SessionUserCache(ttl=60)
+    mock_time.return_value = 1000
+    cache.store("fake_token", "client", "user")
+    assert "fake_token" not in cache.entries
+
+    mock_time.return_value = 1059
+    assert cache.get("fake_token").user == "user"
+    mock_time.return_value = 1061
+    assert cache.get("fake_token") is None
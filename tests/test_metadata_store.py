@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from app.models.repository_model import RepositorySnapshot
+from app.models.teams_model import Member, Team
+from app.services.metadata_store import MetadataStore
+from app.services.repository_service import RepositoryService
+
+
+def make_snapshot(name, owner="owner1", prs_open=1):
+    return RepositorySnapshot(
+        name=name,
+        owner=owner,
+        createDate=datetime(2023, 1, 1),
+        lastUseDate=None,
+        state="No hay commits",
+        prsOpen=prs_open,
+        prsClosed=0,
+        prsDependabot=0,
+        issues=2,
+        collaborators=["collab1"],
+        languages={"Python": 100},
+    )
+
+
+@pytest.fixture
+def store():
+    return MetadataStore(":memory:", max_age=60)
+
+
+def test_database_is_opened_on_first_use(tmp_path, monkeypatch):
+    path = tmp_path / "metadata.db"
+    monkeypatch.setenv("METADATA_DB_PATH", str(path))
+    store = MetadataStore()
+
+    # Crear el almacen no abre ni crea el archivo
+    assert not path.exists()
+    store.save_repository_snapshots([make_snapshot("repo1")])
+
+    assert path.exists()
+    assert store.stats()["path"] == str(path)
+    assert set(MetadataStore(str(path)).get_repository_snapshots(["owner1/repo1"])) == {"owner1/repo1"}
+
+def test_save_and_get_repository_snapshots(store):
+    store.save_repository_snapshots([make_snapshot("repo1"), make_snapshot("repo2", prs_open=5)])
+
+    snapshots = store.get_repository_snapshots(["owner1/repo1", "owner1/repo2", "owner1/repo3"])
+
+    assert set(snapshots) == {"owner1/repo1", "owner1/repo2"}
+    assert snapshots["owner1/repo2"].prsOpen == 5
+    assert snapshots["owner1/repo1"].languages == {"Python": 100}
+
+def test_stale_rows_are_not_returned(store):
+    store.save_repository_snapshots([make_snapshot("repo1")])
+
+    with patch("app.services.metadata_store.time.time", return_value=store.connection.execute("SELECT fetched_at FROM repositories").fetchone()[0] + 120):
+        assert store.get_repository_snapshot("owner1/repo1") is None
+        assert store.get_repository_snapshot("owner1/repo1", max_age=600) is not None
+
+def test_delete_repository(store):
+    store.save_repository_snapshots([make_snapshot("repo1")])
+
+    store.delete_repository("owner1/repo1")
+
+    assert store.get_repository_snapshot("owner1/repo1") is None
+
+def test_save_and_get_teams(store):
+    assert store.get_teams() is None
+    store.save_teams([Team(id=1, name="team1", members_count=1, members=[Member(id=1, login="user1")])])
+    store.save_teams([Team(id=2, name="team2", members_count=0, members=[])])
+
+    teams = store.get_teams()
+
+    assert [team.name for team in teams] == ["team2"]
+    assert store.stats()["teams"] == 1
+
+def test_statistics_only_fetch_stale_repositories(store):
+    repo1 = MagicMock()
+    repo1.name = "repo1"
+    repo1.owner.login = "owner1"
+    repo2 = MagicMock()
+    repo2.name = "repo2"
+    repo2.owner.login = "owner1"
+    store.save_repository_snapshots([make_snapshot("repo1", prs_open=3)])
+
+    service = RepositoryService(store=store)
+    with patch.object(service, "get_repositories_from_github", return_value=[repo1, repo2]), \
+         patch.object(service, "collect_repository_snapshot", return_value=make_snapshot("repo2")) as mock_collect:
+        stats = service.get_statistics_of_repositories()
+
+    mock_collect.assert_called_once_with(repo2)
+    assert stats.repositories == 2
+    assert stats.prsOpen == 4
+    assert store.get_repository_snapshot("owner1/repo2") is not None
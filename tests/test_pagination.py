@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+import httpx
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from github import Auth, Github
+from app.services.github_async import AsyncGithubClient
+from app.services.pagination import iterate_pages
+
+TOTAL_PULLS = 7
+
+
+class PullsHandler(BaseHTTPRequestHandler):
+    '''
+    Servidor local que pagina una lista de pull requests con cabeceras Link como GitHub.
+    '''
+    pages = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        PullsHandler.pages.append((per_page, page))
+        last = -(-TOTAL_PULLS // per_page)
+        items = [{"number": number} for number in range(1, TOTAL_PULLS + 1)][(page - 1) * per_page:page * per_page]
+        payload = json.dumps(items).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if page < last:
+            base = f"http://{self.headers['Host']}{url.path}?per_page={per_page}"
+            self.send_header("Link", f'<{base}&page={page + 1}>; rel="next", <{base}&page={last}>; rel="last"')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def pulls_server():
+    PullsHandler.pages = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PullsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_iterate_pages_keeps_order(pulls_server):
+    github = Github(auth=Auth.Token("token"), base_url=pulls_server, per_page=2, retry=None)
+    pulls = github.get_repo("owner1/repo1", lazy=True).get_pulls(state="all")
+
+    numbers = [pull.number for pull in iterate_pages(pulls, max_workers=3, page_size=2)]
+
+    assert numbers == list(range(1, TOTAL_PULLS + 1))
+    # Sin peticion del conteo total (per_page=1); la pagina 4 viene incompleta y termina el listado
+    assert all(per_page == 2 for per_page, _ in PullsHandler.pages)
+    assert {1, 2, 3, 4} <= {page for _, page in PullsHandler.pages} <= {1, 2, 3, 4, 5}
+
+def test_iterate_pages_sequential_stops_at_short_page(pulls_server):
+    github = Github(auth=Auth.Token("token"), base_url=pulls_server, per_page=2, retry=None)
+    pulls = github.get_repo("owner1/repo1", lazy=True).get_pulls(state="all")
+
+    numbers = [pull.number for pull in iterate_pages(pulls, max_workers=1, page_size=2)]
+
+    assert numbers == list(range(1, TOTAL_PULLS + 1))
+    assert PullsHandler.pages == [(2, 1), (2, 2), (2, 3), (2, 4)]
+
+def test_iterate_pages_single_page(pulls_server):
+    github = Github(auth=Auth.Token("token"), base_url=pulls_server, per_page=100, retry=None)
+    pulls = github.get_repo("owner1/repo1", lazy=True).get_pulls(state="all")
+
+    assert len(list(iterate_pages(pulls))) == TOTAL_PULLS
+    assert len(PullsHandler.pages) == 1
+
+def test_iterate_pages_accepts_plain_iterables():
+    assert list(iterate_pages([1, 2, 3])) == [1, 2, 3]
+
+def test_async_paginate_prefetches_pages(pulls_server):
+    client = AsyncGithubClient("token", base_url=pulls_server)
+
+    async def run():
+        items = [item["number"] async for item in client.paginate("/repos/owner1/repo1/pulls", {"per_page": 2})]
+        await client.aclose()
+        return items
+
+    assert asyncio.run(run()) == list(range(1, TOTAL_PULLS + 1))
+    assert sorted(PullsHandler.pages) == [(2, 1), (2, 2), (2, 3), (2, 4)]
+
+def test_async_paginate_uses_max_page_size():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.params["per_page"])
+        return httpx.Response(200, json=[])
+
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(handler))
+
+    async def run():
+        return [item async for item in client.paginate("/user/repos")]
+
+    assert asyncio.run(run()) == []
+    assert seen == ["100"]
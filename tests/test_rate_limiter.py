@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from github import Auth, Github, GithubException, RateLimitExceededException
+from app.main import app
+from app.services.github_async import AsyncGithubClient
+from app.services.rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, RateLimitExceeded, raise_if_rate_limited, rate_limit_error, rate_limiter
+
+
+def rate_headers(remaining, reset_in=600, limit=5000):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + reset_in)),
+    }
+
+
+def test_unknown_budget_does_not_wait():
+    limiter = RateLimiter()
+
+    assert limiter.reserve_slot("token", INTERACTIVE) == 0
+    assert limiter.reserve_slot("token", BACKGROUND) == 0
+
+def test_update_reads_headers():
+    limiter = RateLimiter()
+
+    assert limiter.update("token", 200, rate_headers(4000)) is None
+
+    assert limiter.remaining("token") == 4000
+    assert limiter.stats()["token"]["limit"] == 5000
+
+def test_background_waits_when_only_reserve_is_left():
+    limiter = RateLimiter(reserve=100, pace_below=200, max_wait=30)
+    limiter.update("token", 200, rate_headers(50, reset_in=600))
+
+    assert limiter.reserve_slot("token", BACKGROUND) > 500
+    # Los endpoints interactivos siguen usando la reserva
+    assert limiter.reserve_slot("token", INTERACTIVE) == 0
+
+def test_background_requests_are_paced():
+    limiter = RateLimiter(reserve=100, pace_below=1000, max_wait=30)
+    limiter.update("token", 200, rate_headers(700, reset_in=600))
+
+    first = limiter.reserve_slot("token", BACKGROUND)
+    second = limiter.reserve_slot("token", BACKGROUND)
+
+    assert first == 0
+    # 600 segundos repartidos entre 600 peticiones por encima de la reserva
+    assert second == pytest.approx(1, abs=0.1)
+
+def test_interactive_fails_fast_when_exhausted():
+    limiter = RateLimiter(max_wait=30)
+    limiter.update("token", 200, rate_headers(0, reset_in=600))
+
+    with pytest.raises(RateLimitExceeded):
+        limiter.reserve_slot("token", INTERACTIVE)
+
+def test_secondary_limit_blocks_token():
+    limiter = RateLimiter(max_wait=30)
+
+    wait = limiter.update("token", 403, {"Retry-After": "10"})
+
+    assert wait == 10
+    assert limiter.reserve_slot("token", INTERACTIVE) == pytest.approx(10, abs=0.5)
+    assert limiter.should_retry(0, wait, INTERACTIVE)
+    assert not limiter.should_retry(limiter.retries, wait, INTERACTIVE)
+
+def test_secondary_limit_without_retry_after_backs_off():
+    limiter = RateLimiter()
+
+    first = limiter.update("token", 403, rate_headers(4000), "You have exceeded a secondary rate limit")
+    second = limiter.update("token", 403, rate_headers(4000), "You have exceeded a secondary rate limit")
+
+    assert second == first * 2
+
+def test_permission_errors_are_not_rate_limits():
+    limiter = RateLimiter()
+
+    assert limiter.update("token", 403, rate_headers(4000), "Resource not accessible by integration") is None
+
+def test_async_client_retries_after_secondary_limit():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(403, headers={"Retry-After": "0"}, json={"message": "secondary rate limit"})
+        return httpx.Response(200, headers=rate_headers(4999), json={"ok": True})
+
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(handler))
+
+    assert asyncio.run(client.get_json("/user")) == {"ok": True}
+    assert len(calls) == 2
+    assert rate_limiter.remaining(rate_limiter.key("Bearer token")) == 4999
+
+def status_error(status, headers=None, body=""):
+    request = httpx.Request("GET", "https://api.github.test/user/repos")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, headers=headers or {}, text=body, request=request))
+
+def test_exhausted_responses_are_rate_limit_errors():
+    assert rate_limit_error(status_error(429, {"Retry-After": "30"})).wait == 30
+    assert 0 < rate_limit_error(status_error(403, rate_headers(0, reset_in=120))).wait <= 120
+    assert rate_limit_error(RateLimitExceededException(403, {"message": "API rate limit exceeded"}, {"Retry-After": "5"})).wait == 5
+    # Un 403 de permisos o un 404 siguen siendo errores normales
+    assert rate_limit_error(status_error(403, body="Resource not accessible by integration")) is None
+    assert rate_limit_error(status_error(404)) is None
+
+@pytest.mark.parametrize("error", [RateLimitExceeded(41.5), status_error(429, {"Retry-After": "42"})])
+def test_routers_answer_429_with_retry_after(error):
+    with patch("app.services.teams_service.teams_service.get_team_statistics_async", side_effect=error):
+        response = TestClient(app).get("/orgs/teams/backend/statistics")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "42"
+
+def test_services_do_not_hide_the_rate_limit():
+    with patch("app.services.teams_service.teams_service.async_client.paginate", side_effect=status_error(429, {"Retry-After": "7"})):
+        response = TestClient(app).get("/orgs/teams")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+
+class LimitedHandler(BaseHTTPRequestHandler):
+    '''
+    Servidor local que rechaza todas las peticiones por el limite de GitHub.
+    '''
+    protocol_version = "HTTP/1.1"
+    status = 403
+    headers_sent = {}
+    hits = 0
+
+    def do_GET(self):
+        LimitedHandler.hits += 1
+        payload = json.dumps({"message": "You have exceeded a secondary rate limit"}).encode()
+        self.send_response(LimitedHandler.status)
+        for name, value in LimitedHandler.headers_sent.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.parametrize("status, headers", [
+    (403, {"Retry-After": "60"}),
+    (429, rate_headers(0, reset_in=600)),
+])
+def test_pygithub_rejections_block_the_token(status, headers):
+    LimitedHandler.status, LimitedHandler.headers_sent, LimitedHandler.hits = status, headers, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LimitedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Con el retry por defecto de PyGithub: urllib3 no debe reintentar ni esperar el reset
+    github = Github(auth=Auth.Token("limited-token"), base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        start = time.monotonic()
+        with pytest.raises(GithubException) as exc_info:
+            github.get_repo("owner1/repo1")
+        with pytest.raises(RateLimitExceeded) as limited:
+            raise_if_rate_limited(exc_info.value)
+
+        assert time.monotonic() - start < 5
+        assert LimitedHandler.hits == 1
+        assert limited.value.wait > 30
+        assert rate_limiter.stats()[rate_limiter.key("token limited-token")]["blocked_for"] > 30
+        # El token queda bloqueado: la siguiente peticion falla sin llegar a GitHub
+        with pytest.raises(RateLimitExceeded):
+            github.get_repo("owner1/repo2")
+        assert LimitedHandler.hits == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -50,7 +50,7 @@ fake_statistics_by_detail = RepositoryStats(
     percentagesLanguages=["Python 60%", "JavaScript 40%"]
 )
 
-@patch("app.services.repository_service.RepositoryService.get_repositories")
+@patch("app.services.repository_service.RepositoryService.get_repositories_async")
 def test_get_repositories(mock_get_repositories, client):
     mock_get_repositories.return_value = fake_repositories
     response = client.get("/repositories")
@@ -68,7 +68,7 @@ def test_get_repositories(mock_get_repositories, client):
     actual_response = response.json()
     assert actual_response == expected_response
 
-@patch("app.services.repository_service.RepositoryService.get_statistics_of_repositories")
+@patch("app.services.repository_service.RepositoryService.get_statistics_of_repositories_async")
 def test_get_statistics_of_repositories(mock_get_statistics_of_repositories, client):
     mock_get_statistics_of_repositories.return_value = fake_repository_stats
     response = client.get("/repositories/statistics")
@@ -82,7 +82,7 @@ def test_get_repository_detail(mock_get_repository_detail, client):
     assert response.status_code == 200
     assert response.json() == fake_repository_detail.model_dump()
 
-@patch("app.services.repository_service.RepositoryService.get_statistics_by_detail")
+@patch("app.services.repository_service.RepositoryService.get_statistics_by_detail_async")
 def test_get_statistics_by_detail(mock_get_statistics_by_detail, client):
     mock_get_statistics_by_detail.return_value = fake_statistics_by_detail
     response = client.get("/repository/repo1/statistics")
@@ -90,14 +90,14 @@ def test_get_statistics_by_detail(mock_get_statistics_by_detail, client):
     assert response.json() == fake_statistics_by_detail.model_dump()
 
 # Pruebas de excepciones
-@patch("app.services.repository_service.RepositoryService.get_repositories")
+@patch("app.services.repository_service.RepositoryService.get_repositories_async")
 def test_get_repositories_exception(mock_get_repositories, client):
     mock_get_repositories.side_effect = Exception("Test Exception")
     response = client.get("/repositories")
     assert response.status_code == 500
     assert response.json() == {"detail": "Error al obtener repositorios: Test Exception"}
 
-@patch("app.services.repository_service.RepositoryService.get_statistics_of_repositories")
+@patch("app.services.repository_service.RepositoryService.get_statistics_of_repositories_async")
 def test_get_statistics_of_repositories_exception(mock_get_statistics_of_repositories, client):
     mock_get_statistics_of_repositories.side_effect = Exception("Test Exception")
     response = client.get("/repositories/statistics")
@@ -111,9 +111,75 @@ def test_get_repository_detail_exception(mock_get_repository_detail, client):
     assert response.status_code == 500
     assert response.json() == {"detail": "Error al obtener detalles del repositorio: Test Exception"}
 
-@patch("app.services.repository_service.RepositoryService.get_statistics_by_detail")
+@patch("app.services.repository_service.RepositoryService.get_statistics_by_detail_async")
 def test_get_statistics_by_detail_exception(mock_get_statistics_by_detail, client):
     mock_get_statistics_by_detail.side_effect = Exception("Test Exception")
     response = client.get("/repository/repo1/statistics")
     assert response.status_code == 500
     assert response.json() == {"detail": "Error al obtener estadísticas detalladas del repositorio: Test Exception"}
+
+@patch("app.services.repository_service.RepositoryService.get_statistics_of_repositories_async")
+@patch("app.services.repository_service.RepositoryService.get_statistics_fast_async")
+def test_get_statistics_of_repositories_fast(mock_get_statistics_fast, mock_get_statistics_of_repositories, client):
+    mock_get_statistics_fast.return_value = fake_repository_stats
+    response = client.get("/repositories/statistics?fast=true")
+    assert response.status_code == 200
+    assert "issues" in response.headers["x-approximate-fields"].split(",")
+    assert "prsOpen" in response.headers["x-omitted-fields"].split(",")
+    mock_get_statistics_of_repositories.assert_not_called()
+
+@patch("app.services.repository_service.RepositoryService.get_repositories_fast_async")
+def test_get_repositories_fast(mock_get_repositories_fast, client):
+    mock_get_repositories_fast.return_value = fake_repositories
+    response = client.get("/repositories?fast=true")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["x-approximate-fields"] == "lastUseDate,state"
+
+@patch("app.services.repository_service.RepositoryService.stream_repositories_async")
+def test_get_repositories_ndjson(mock_stream_repositories, client):
+    async def stream(fast):
+        for repository in fake_repositories:
+            yield repository
+    mock_stream_repositories.side_effect = stream
+    response = client.get("/repositories", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in response.text.splitlines() if line]
+    assert [Repositories.model_validate_json(line) for line in lines] == fake_repositories
+
+@patch("app.services.repository_service.RepositoryService.stream_repositories_async")
+def test_get_repositories_ndjson_error_line(mock_stream_repositories, client):
+    async def stream(fast):
+        yield fake_repositories[0]
+        raise Exception("Error de GitHub")
+    mock_stream_repositories.side_effect = stream
+    response = client.get("/repositories", headers={"Accept": "application/x-ndjson"})
+    lines = [line for line in response.text.splitlines() if line]
+    assert len(lines) == 2
+    assert "Error de GitHub" in lines[-1]
+
+@patch("app.services.repository_service.RepositoryService.get_repositories_page_async")
+def test_get_repositories_fields_and_cursor(mock_get_repositories_page, client):
+    mock_get_repositories_page.return_value = ([{"name": "repo1"}, {"name": "repo2"}], 2)
+    response = client.get("/repositories?fields=name&limit=2")
+    assert response.status_code == 200
+    assert response.json() == [{"name": "repo1"}, {"name": "repo2"}]
+    mock_get_repositories_page.assert_called_once_with(["name"], 2, 0, False)
+
+    next_cursor = response.headers["x-next-cursor"]
+    assert 'rel="next"' in response.headers["link"]
+    mock_get_repositories_page.return_value = ([{"name": "repo3"}], None)
+    response = client.get(f"/repositories?fields=name&limit=2&cursor={next_cursor}")
+    assert response.json() == [{"name": "repo3"}]
+    assert "x-next-cursor" not in response.headers
+    assert mock_get_repositories_page.call_args[0] == (["name"], 2, 2, False)
+
+def test_get_repositories_unknown_field(client):
+    response = client.get("/repositories?fields=name,stars")
+    assert response.status_code == 400
+    assert "stars" in response.json()["detail"]
+
+def test_get_repositories_invalid_cursor(client):
+    response = client.get("/repositories?cursor=no-es-un-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,150 @@
+import threading
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from app.services.repository_index import RepositoryIndex
+
+
+def make_repository(name, owner="owner1", updated_at=datetime(2024, 1, 1)):
+    repository = MagicMock()
+    repository.name = name
+    repository.owner.login = owner
+    repository.updated_at = updated_at
+    return repository
+
+
+@pytest.fixture
+def repositories():
+    return [
+        make_repository("repo1", updated_at=datetime(2024, 1, 1)),
+        make_repository("repo2", updated_at=datetime(2024, 1, 2)),
+        make_repository("repo1", owner="owner2", updated_at=datetime(2024, 1, 3)),
+    ]
+
+
+def test_find_by_name_and_full_name(repositories):
+    list_repositories = MagicMock(return_value=repositories)
+    index = RepositoryIndex(list_repositories, MagicMock(return_value=None))
+    index.refresh()
+
+    assert index.find("repo2") is repositories[1]
+    assert index.find("owner1/repo1") is repositories[0]
+    assert index.find("owner2/repo1") is repositories[2]
+    # Con el mismo nombre gana el primero del listado, igual que la busqueda lineal
+    assert index.find("repo1") is repositories[0]
+    # Mientras el indice esta al dia no se vuelve a listar
+    list_repositories.assert_called_once_with()
+
+def test_find_uses_direct_fetch_when_missing(repositories):
+    direct = make_repository("repo9")
+    fetch_repository = MagicMock(return_value=direct)
+    index = RepositoryIndex(MagicMock(return_value=repositories), fetch_repository)
+    index.refresh()
+
+    assert index.find("repo9") is direct
+    assert index.find("repo9") is direct
+    fetch_repository.assert_called_once_with("repo9")
+
+def test_find_returns_none_when_not_found(repositories):
+    index = RepositoryIndex(MagicMock(return_value=repositories), MagicMock(return_value=None))
+    index.refresh()
+
+    assert index.find("repo9") is None
+
+def test_incremental_refresh_stops_at_known_repositories(repositories):
+    new_repository = make_repository("repo4", updated_at=datetime(2024, 2, 1))
+    updated_listing = [new_repository] + sorted(repositories, key=lambda repository: repository.updated_at, reverse=True)
+    list_repositories = MagicMock(side_effect=[repositories, iter(updated_listing)])
+    index = RepositoryIndex(list_repositories, MagicMock(return_value=None), ttl=0)
+
+    index.refresh()
+    index.refresh()
+
+    assert index.get("repo4") is new_repository
+    list_repositories.assert_called_with(sort="updated", direction="desc")
+    assert index.last_updated_at == datetime(2024, 2, 1)
+
+def test_full_rebuild_after_full_ttl(repositories):
+    list_repositories = MagicMock(side_effect=[repositories, repositories[:1]])
+    index = RepositoryIndex(list_repositories, MagicMock(return_value=None), ttl=0, full_ttl=0)
+
+    index.refresh()
+    assert index.get("repo2") is repositories[1]
+    # Al reconstruir el indice desaparecen los repositorios que ya no estan en el listado
+    index.refresh()
+    assert index.get("repo2") is None
+    assert list_repositories.call_count == 2
+    assert list_repositories.call_args_list[1] == ((), {})
+
+def test_discard_drops_a_stale_entry(repositories):
+    renamed = make_repository("repo2")
+    fetch_repository = MagicMock(return_value=renamed)
+    index = RepositoryIndex(MagicMock(return_value=repositories), fetch_repository)
+    index.refresh()
+
+    stale = index.find("repo2")
+    index.discard(stale)
+
+    assert index.get("repo2") is None
+    assert index.get("owner1/repo2") is None
+    assert index.find("repo2") is renamed
+    fetch_repository.assert_called_once_with("repo2")
+
+def test_cold_index_is_built_in_the_background(repositories):
+    listing_started = threading.Event()
+    release_listing = threading.Event()
+
+    def listing():
+        listing_started.set()
+        release_listing.wait(5)
+        return repositories
+
+    direct = make_repository("repo2")
+    fetch_repository = MagicMock(return_value=direct)
+    index = RepositoryIndex(MagicMock(side_effect=listing), fetch_repository)
+
+    # La primera busqueda no espera el listado completo: va directo a GitHub
+    assert index.find("repo2") is direct
+    assert listing_started.wait(5)
+    assert index.find("owner1/repo2") is direct
+    release_listing.set()
+    with index.refresh_lock:
+        pass
+
+    assert index.is_fresh()
+    assert index.find("owner2/repo1") is repositories[2]
+    assert fetch_repository.call_count == 1
+
+def test_stale_index_is_served_while_it_refreshes(repositories):
+    listing_started = threading.Event()
+    release_listing = threading.Event()
+
+    def listing(**kwargs):
+        if not kwargs:
+            return repositories
+        listing_started.set()
+        release_listing.wait(5)
+        return iter([])
+
+    list_repositories = MagicMock(side_effect=listing)
+    index = RepositoryIndex(list_repositories, MagicMock(return_value=None), ttl=0)
+    index.refresh()
+
+    # Mientras otro hilo lista los repositorios, la busqueda usa el indice actual
+    assert index.find("repo2") is repositories[1]
+    assert listing_started.wait(5)
+    assert index.find("repo1") is repositories[0]
+    release_listing.set()
+    with index.refresh_lock:
+        pass
+    assert list_repositories.call_count == 2
+
+def test_failed_background_refresh_waits_for_the_ttl(repositories):
+    list_repositories = MagicMock(side_effect=Exception("Error al listar"))
+    index = RepositoryIndex(list_repositories, MagicMock(return_value=None))
+
+    index.background_refresh()
+    index.refresh_in_background()
+
+    assert index.is_fresh()
+    list_repositories.assert_called_once_with()
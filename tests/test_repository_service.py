@@ -153,57 +153,49 @@ def test_get_repository_state_exception(mock_get_last_commit_date):
     mock_get_last_commit_date.assert_called_once()
 
 # Pruebas para count_state_repositories
-@patch('app.services.repository_service.RepositoryService.get_repository_state')
-def test_count_state_repositories_all_active(mock_get_repository_state):
-    mock_get_repository_state.return_value = "Activo"
+def test_count_state_repositories_all_active():
     service = RepositoryService()
-    repos = [MagicMock(), MagicMock(), MagicMock()]
+    snapshots = [MagicMock(state="Activo"), MagicMock(state="Activo"), MagicMock(state="Activo")]
     
-    active_count, inactive_count = service.count_state_repositories(repos)
+    active_count, inactive_count = service.count_state_repositories(snapshots)
     
     assert active_count == 3
     assert inactive_count == 0
 
-@patch('app.services.repository_service.RepositoryService.get_repository_state')
-def test_count_state_repositories_all_inactive(mock_get_repository_state):
-    mock_get_repository_state.return_value = "Inactivo"
+def test_count_state_repositories_all_inactive():
     service = RepositoryService()
-    repos = [MagicMock(), MagicMock(), MagicMock()]
+    snapshots = [MagicMock(state="Inactivo"), MagicMock(state="Inactivo"), MagicMock(state="Inactivo")]
     
-    active_count, inactive_count = service.count_state_repositories(repos)
+    active_count, inactive_count = service.count_state_repositories(snapshots)
     
     assert active_count == 0
     assert inactive_count == 3
 
-@patch('app.services.repository_service.RepositoryService.get_repository_state')
-def test_count_state_repositories_mixed(mock_get_repository_state):
+def test_count_state_repositories_mixed():
     service = RepositoryService()
-    repos = [MagicMock(), MagicMock(), MagicMock()]
-    mock_get_repository_state.side_effect = ["Activo", "Inactivo", "Activo"]
+    snapshots = [MagicMock(state="Activo"), MagicMock(state="Inactivo"), MagicMock(state="Activo")]
     
-    active_count, inactive_count = service.count_state_repositories(repos)
+    active_count, inactive_count = service.count_state_repositories(snapshots)
     
     assert active_count == 2
     assert inactive_count == 1
 
-@patch('app.services.repository_service.RepositoryService.get_repository_state')
-def test_count_state_repositories_empty(mock_get_repository_state):
+def test_count_state_repositories_empty():
     service = RepositoryService()
-    repos = []
+    snapshots = []
     
-    active_count, inactive_count = service.count_state_repositories(repos)
+    active_count, inactive_count = service.count_state_repositories(snapshots)
     
     assert active_count == 0
     assert inactive_count == 0
 
 @patch('app.services.repository_service.RepositoryService.get_repository_state')
 def test_count_state_repositories_no_commits(mock_get_repository_state):
-    mock_get_repository_state.return_value = "No hay commits"
     service = RepositoryService()
-    repos = [MagicMock(), MagicMock()]
+    snapshots = [MagicMock(state="No hay commits"), MagicMock(state="No hay commits")]
     
-    active_count, inactive_count = service.count_state_repositories(repos)
+    active_count, inactive_count = service.count_state_repositories(snapshots)
     
     assert active_count == 0
     assert inactive_count == 0
-
+    mock_get_repository_state.assert_not_called()
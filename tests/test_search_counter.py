@@ -0,0 +1,107 @@
+import asyncio
+import time
+import httpx
+from types import SimpleNamespace
+from app.services.github_async import AsyncGithubClient
+from app.services.rate_limiter import rate_limiter
+from app.services.repository_service import RepositoryService
+from app.services.search_counter import SearchCounter
+
+# Totales por repositorio que devuelve la busqueda de prueba
+FAKE_COUNTS = {
+    "owner1/repo1": {"is:pr is:open": 2, "is:pr is:closed": 5, "is:pr author:app/dependabot": 1, "is:open": 4},
+    "owner1/repo2": {"is:pr is:open": 1, "is:pr is:closed": 0, "is:pr author:app/dependabot": 3, "is:open": 1},
+}
+
+
+def search_handler(calls):
+    def handler(request):
+        calls.append(request)
+        path = request.url.path
+        if path == "/search/issues":
+            query = request.url.params["q"]
+            repos = [part[len("repo:"):] for part in query.split() if part.startswith("repo:")]
+            filters = " ".join(part for part in query.split() if not part.startswith("repo:"))
+            total = sum(FAKE_COUNTS[repo][filters] for repo in repos)
+            return httpx.Response(200, json={"total_count": total, "incomplete_results": False, "items": []},
+                                  headers={"X-RateLimit-Remaining": "29", "X-RateLimit-Resource": "search",
+                                           "X-RateLimit-Reset": str(int(time.time() + 60))})
+        if path == "/user/repos":
+            return httpx.Response(200, json=[
+                {"name": name, "full_name": f"owner1/{name}", "owner": {"login": "owner1"}, "created_at": "2023-01-01T00:00:00Z"}
+                for name in ("repo1", "repo2")
+            ])
+        if path.endswith("/collaborators"):
+            return httpx.Response(200, json=[{"login": "collab1"}, {"login": "collab2"}])
+        if path.endswith("/branches"):
+            return httpx.Response(200, json=[{"name": "main"}])
+        if path.endswith("/languages"):
+            return httpx.Response(200, json={"Python": 300, "Go": 100})
+        if path.endswith("/commits"):
+            return httpx.Response(200, json=[])
+        return httpx.Response(404, json={"message": "Not Found"})
+    return handler
+
+
+def test_build_queries_in_batches():
+    counter = SearchCounter(client=None, batch_size=2)
+
+    queries = counter.build_queries(["repo:o/a", "repo:o/b", "repo:o/c"])
+
+    assert len(queries) == 8
+    assert ("prsDependabot", "is:pr author:app/dependabot repo:o/a repo:o/b") in queries
+    assert ("issues", "is:open repo:o/c") in queries
+
+def test_count_totals_sums_batches():
+    calls = []
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(search_handler(calls)))
+    counter = SearchCounter(client, batch_size=1)
+
+    totals = asyncio.run(counter.count_totals(["repo:owner1/repo1", "repo:owner1/repo2"]))
+
+    assert totals == {"prsOpen": 3, "prsClosed": 5, "prsDependabot": 4, "issues": 5}
+    assert len(calls) == 8
+    assert all(call.url.params["per_page"] == "1" for call in calls)
+
+def test_search_uses_its_own_budget():
+    calls = []
+    client = AsyncGithubClient("token", transport=httpx.MockTransport(search_handler(calls)))
+
+    asyncio.run(SearchCounter(client).count("repo:owner1/repo1 is:open"))
+
+    assert rate_limiter.remaining(rate_limiter.key("token", "search")) == 29
+    assert rate_limiter.remaining(rate_limiter.key("token")) is None
+
+def test_get_statistics_of_repositories_with_search_backend():
+    calls = []
+    service = RepositoryService(stats_backend="search")
+    service.async_client = AsyncGithubClient("token", transport=httpx.MockTransport(search_handler(calls)))
+    service.search_counter = SearchCounter(service.async_client)
+
+    stats = asyncio.run(service.get_statistics_of_repositories_async())
+
+    assert stats.repositories == 2
+    assert stats.prsOpen == 3
+    assert stats.prsClosed == 5
+    assert stats.prsDependabot == 4
+    assert stats.issues == 5
+    assert stats.collaborators == 2
+    assert "Python: 75.00%" in stats.percentages_languages
+    # No se listan pull requests ni issues
+    assert not any(call.url.path.startswith("/repos/") and call.url.path.endswith(("/pulls", "/issues")) for call in calls)
+
+def test_get_statistics_by_detail_with_search_backend():
+    calls = []
+    service = RepositoryService(stats_backend="search")
+    service.async_client = AsyncGithubClient("token", transport=httpx.MockTransport(search_handler(calls)))
+    service.search_counter = SearchCounter(service.async_client)
+    service.find_repository = lambda repo_name: SimpleNamespace(name=repo_name, owner=SimpleNamespace(login="owner1"))
+
+    stats = asyncio.run(service.get_statistics_by_detail_async("repo2"))
+
+    assert stats.prsOpen == 1
+    assert stats.prsDependabot == 3
+    assert stats.issues == 1
+    assert stats.collaborators == 2
+    assert stats.branches == 1
+    assert stats.percentagesLanguages == ["Python: 75.00%", "Go: 25.00%"]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.services.single_flight import SingleFlight
+from app.services.snapshot_refresher import SnapshotRefresher
+
+
+def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"repositories": 10}
+
+    async def main():
+        key = single_flight.key("repositories_statistics")
+        return await asyncio.gather(*(single_flight.run(key, compute) for _ in range(10)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight.stats() == {"in_flight": 0, "endpoints": {"repositories_statistics": {"executions": 1, "coalesced": 9}}}
+
+def test_different_params_do_not_coalesce():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def compute(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return name
+
+    async def main():
+        return await asyncio.gather(
+            single_flight.run(single_flight.key("repository_statistics", "repo1"), lambda: compute("repo1")),
+            single_flight.run(single_flight.key("repository_statistics", "repo2"), lambda: compute("repo2")),
+        )
+
+    assert asyncio.run(main()) == ["repo1", "repo2"]
+    assert sorted(calls) == ["repo1", "repo2"]
+
+def test_token_is_part_of_the_key():
+    single_flight = SingleFlight()
+
+    assert single_flight.key("perfil", token="a") != single_flight.key("perfil", token="b")
+    assert "a" not in single_flight.key("perfil", token="a")
+
+def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("GitHub no responde")
+
+    async def main():
+        key = single_flight.key("repositories")
+        results = await asyncio.gather(*(single_flight.run(key, fail) for _ in range(3)), return_exceptions=True)
+        # Una vez terminado, la siguiente peticion vuelve a ejecutar el calculo
+        await asyncio.gather(single_flight.run(key, fail), return_exceptions=True)
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 2
+
+def test_run_sync_coalesces_threads():
+    single_flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "perfil"
+
+    key = single_flight.key("perfil", token="token")
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(single_flight.run_sync, key, compute)
+        started.wait()
+        followers = [executor.submit(single_flight.run_sync, key, compute) for _ in range(4)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == ["perfil"] * 5
+    assert len(calls) == 1
+    assert single_flight.stats()["endpoints"]["perfil"] == {"executions": 1, "coalesced": 4}
+
+def test_run_sync_shares_errors():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError("sin token")
+
+    with pytest.raises(ValueError):
+        single_flight.run_sync(single_flight.key("perfil"), fail)
+    assert single_flight.stats()["in_flight"] == 0
+
+def test_snapshot_refresh_is_coalesced():
+    refresher = SnapshotRefresher(interval=0)
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "stats"
+
+    refresher.register("coalesced_statistics", build)
+
+    async def main():
+        return await asyncio.gather(*(refresher.get_or_refresh("coalesced_statistics") for _ in range(10)))
+
+    snapshots = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert {snapshot.value for snapshot in snapshots} == {"stats"}
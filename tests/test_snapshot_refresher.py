@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.snapshot_refresher import SnapshotRefresher
+
+
+def test_refresh_swaps_snapshot():
+    refresher = SnapshotRefresher(interval=60, max_age=60)
+    builder = AsyncMock(side_effect=[{"version": 1}, {"version": 2}])
+    refresher.register("stats", builder)
+
+    first = asyncio.run(refresher.get_or_refresh("stats"))
+    cached = asyncio.run(refresher.get_or_refresh("stats"))
+    second = asyncio.run(refresher.refresh("stats"))
+
+    assert first.value == {"version": 1}
+    assert cached is first
+    assert second.value == {"version": 2}
+    assert refresher.get("stats") is second
+    assert builder.await_count == 2
+
+def test_failed_refresh_keeps_previous_snapshot():
+    refresher = SnapshotRefresher(interval=60, max_age=60)
+    builder = AsyncMock(side_effect=[{"version": 1}, Exception("GitHub no responde")])
+    refresher.register("stats", builder)
+
+    asyncio.run(refresher.refresh_all())
+    asyncio.run(refresher.refresh_all())
+
+    assert refresher.get("stats").value == {"version": 1}
+
+def test_old_snapshots_are_not_served():
+    refresher = SnapshotRefresher(interval=60, max_age=0)
+    refresher.register("stats", AsyncMock(return_value={}))
+    snapshot = asyncio.run(refresher.refresh("stats"))
+    snapshot.built_at -= 1
+
+    assert refresher.get("stats") is None
+
+def test_background_task_builds_snapshots():
+    refresher = SnapshotRefresher(interval=60, max_age=60)
+    refresher.register("stats", AsyncMock(return_value={"version": 1}))
+
+    async def run():
+        refresher.start()
+        await asyncio.sleep(0.01)
+        await refresher.stop()
+
+    asyncio.run(run())
+
+    assert refresher.get("stats").value == {"version": 1}
+    assert refresher.task is None
+
+@patch("app.services.repository_service.RepositoryService.get_statistics_of_repositories_async")
+def test_statistics_endpoint_serves_snapshot(mock_get_statistics):
+    mock_get_statistics.return_value = {
+        "repositories": 1, "repositoriesActives": 1, "repositoriesInactives": 0, "prsOpen": 0,
+        "prsClosed": 0, "prsDependabot": 0, "collaborators": 0, "issues": 0, "percentages_languages": [],
+    }
+    client = TestClient(app)
+
+    first = client.get("/repositories/statistics")
+    second = client.get("/repositories/statistics")
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert "x-snapshot-age" in second.headers
+    assert "x-snapshot-built-at" in second.headers
+    mock_get_statistics.assert_called_once()
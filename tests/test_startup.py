@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Segundos que puede tardar "import app.main" en un proceso nuevo.
+STARTUP_TIME_BUDGET = float(os.getenv("STARTUP_TIME_BUDGET", "5"))
+
+# Se importa en un proceso aparte para medir el arranque en frio; un audit hook
+# registra cualquier conexion o resolucion de nombres durante el import.
+IMPORT_SCRIPT = """
+import json, sys, time
+network = []
+def hook(event, args):
+    if event in ("socket.connect", "socket.getaddrinfo", "socket.gethostbyname", "socket.sendto"):
+        network.append(event + " " + repr(args[1:] if event == "socket.connect" else args))
+sys.addaudithook(hook)
+start = time.perf_counter()
+import app.main
+print(json.dumps({"seconds": time.perf_counter() - start, "network": network}))
+"""
+
+
+def test_import_app_does_no_network_io_and_is_fast():
+    root = Path(__file__).resolve().parent.parent
+    env = {**os.environ, "METADATA_DB_PATH": ":memory:", "SNAPSHOT_REFRESH_INTERVAL": "0"}
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    startup = json.loads(result.stdout.strip().splitlines()[-1])
+    assert startup["network"] == []
+    assert startup["seconds"] < STARTUP_TIME_BUDGET
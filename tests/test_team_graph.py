@@ -0,0 +1,95 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.teams_model import Member, Team
+from app.services.github_async import AsyncGithubClient
+from app.services.metadata_store import metadata_store
+from app.services.team_graph import TeamGraph, team_graph
+from app.services.teams_service import TeamsService
+from app.services.webhook_service import webhook_service
+from tests.test_github_async import BASE_URL, fake_github
+
+client = TestClient(app)
+
+TEAMS = [
+    Team(id=1, name="backend", members_count=2, members=[Member(id=10, login="ana"), Member(id=11, login="Luis")]),
+    Team(id=2, name="frontend", members_count=1, members=[Member(id=11, login="Luis")]),
+]
+
+
+def test_reverse_lookup_by_member():
+    graph = TeamGraph()
+    graph.load(TEAMS)
+
+    assert [team.name for team in graph.teams_of("luis")] == ["backend", "frontend"]
+    assert [team.name for team in graph.teams_of("ana")] == ["backend"]
+    assert graph.teams_of("otro") == []
+    assert graph.stats()["members"] == 2
+
+def test_expires_after_ttl():
+    graph = TeamGraph(ttl=60)
+    graph.load(TEAMS)
+
+    with mock.patch("app.services.team_graph.time.time", return_value=time.time() + 61):
+        assert graph.get_teams() is None
+        assert graph.teams_of("ana") is None
+
+def test_user_teams_are_served_from_the_graph(monkeypatch):
+    monkeypatch.setattr("app.services.teams_service.ORG_NAME", "org1")
+    transport, calls = fake_github({
+        "/orgs/org1/teams": ([{"id": 1, "name": "backend", "slug": "backend"}, {"id": 2, "name": "frontend", "slug": "frontend"}], {}),
+        "/orgs/org1/teams/backend/members": ([{"id": 10, "login": "ana"}, {"id": 11, "login": "luis"}], {}),
+        "/orgs/org1/teams/frontend/members": ([{"id": 11, "login": "luis"}], {}),
+    })
+    service = TeamsService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+
+    first = asyncio.run(service.get_user_teams_async("luis"))
+    requests = len(calls)
+    second = asyncio.run(service.get_user_teams_async("ana"))
+    asyncio.run(service.get_teams_async())
+
+    assert [team.name for team in first.teams] == ["backend", "frontend"]
+    assert second.total_teams == 1
+    assert requests == 3
+    assert len(calls) == requests
+
+def test_sync_members_are_fetched_concurrently():
+    service = TeamsService()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def make_team(team_id):
+        team = mock.Mock(id=team_id)
+        team.name = team.slug = f"team{team_id}"
+
+        def get_members():
+            # Solo pasa si los tres equipos piden sus miembros al mismo tiempo
+            barrier.wait()
+            return [mock.Mock(id=team_id * 10, login=f"user{team_id}")]
+
+        team.get_members.side_effect = get_members
+        return team
+
+    with mock.patch.object(service.github_client, "get_organization") as get_organization:
+        get_organization.return_value.get_teams.return_value = [make_team(team_id) for team_id in range(1, 4)]
+        response = service.get_teams()
+
+    assert [team.name for team in response.teams] == ["team1", "team2", "team3"]
+    assert [team.name for team in team_graph.teams_of("user2")] == ["team2"]
+
+def test_membership_webhook_refreshes_the_graph():
+    metadata_store.save_teams(TEAMS)
+    team_graph.load(TEAMS)
+    payload = json.loads((Path(__file__).parent / "fixtures" / "webhooks" / "membership_added.json").read_text())
+    payload["team"]["id"] = 2
+
+    webhook_service.apply("membership", payload)
+    response = client.get("/orgs/members/collab3/teams")
+
+    assert response.status_code == 200
+    assert [team["name"] for team in response.json()["teams"]] == ["frontend"]
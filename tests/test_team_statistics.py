@@ -0,0 +1,126 @@
+import asyncio
+import json
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.teams_model import Member, Team
+from app.services.activity_engine import ActivityEngine
+from app.services.github_async import AsyncGithubClient
+from app.services.metadata_store import metadata_store
+from app.services.repository_service import RepositoryService
+from app.services.teams_service import TeamsService
+from app.services.webhook_service import webhook_service
+from tests.test_github_async import BASE_URL, fake_github
+
+client = TestClient(app)
+
+COMMITS = [{"commit": {"author": {"date": "2024-05-10T08:00:00Z"}, "committer": {"date": "2024-05-10T08:00:00Z"}}}]
+
+
+def make_repository(name):
+    return {"name": name, "full_name": f"org1/{name}", "owner": {"login": "org1"}, "created_at": "2023-01-01T00:00:00Z"}
+
+
+def repository_routes(name, pulls, issues, languages, collaborators):
+    return {
+        f"/repos/org1/{name}/pulls": (pulls, {}),
+        f"/repos/org1/{name}/issues": (issues, {}),
+        f"/repos/org1/{name}/commits": (COMMITS, {}),
+        f"/repos/org1/{name}/languages": (languages, {}),
+        f"/repos/org1/{name}/collaborators": ([{"login": login} for login in collaborators], {}),
+    }
+
+
+ROUTES = {
+    "/orgs/org1/teams": ([{"id": 1, "name": "Backend", "slug": "backend"}, {"id": 2, "name": "Frontend", "slug": "frontend"}], {}),
+    "/orgs/org1/teams/backend/members": ([{"id": 10, "login": "ana"}], {}),
+    "/orgs/org1/teams/frontend/members": ([{"id": 10, "login": "ana"}, {"id": 11, "login": "luis"}], {}),
+    # El repositorio api lo comparten los dos equipos
+    "/orgs/org1/teams/backend/repos": ([make_repository("api")], {}),
+    "/orgs/org1/teams/frontend/repos": ([make_repository("api"), make_repository("web")], {}),
+    **repository_routes(
+        "api",
+        [{"state": "open", "user": {"login": "dependabot[bot]"}, "created_at": "2024-05-10T09:00:00Z"},
+         {"state": "closed", "user": {"login": "ana"}, "created_at": "2024-05-01T09:00:00Z"}],
+        [{"created_at": "2024-05-10T11:00:00Z"}],
+        {"Python": 300},
+        ["ana"],
+    ),
+    **repository_routes(
+        "web",
+        [{"state": "open", "user": {"login": "luis"}, "created_at": "2024-05-10T10:00:00Z"}],
+        [],
+        {"TypeScript": 100},
+        ["luis"],
+    ),
+}
+
+
+def make_service(monkeypatch):
+    monkeypatch.setattr("app.services.teams_service.ORG_NAME", "org1")
+    monkeypatch.setattr("app.services.activity_engine.utc_today", lambda: date(2024, 5, 10))
+    transport, calls = fake_github(ROUTES)
+    service = TeamsService()
+    service.async_client = AsyncGithubClient("token", base_url=BASE_URL, transport=transport)
+    service.activity_engine = ActivityEngine(service.async_client)
+    service.repository_service = RepositoryService(stats_backend="rest")
+    service.repository_service.async_client = service.async_client
+    return service, calls
+
+
+def test_rolls_up_the_team_repositories(monkeypatch):
+    service, _ = make_service(monkeypatch)
+
+    backend = asyncio.run(service.get_team_statistics_async("backend"))
+    frontend = asyncio.run(service.get_team_statistics_async("frontend"))
+
+    assert (backend.team, backend.members_count, backend.repositories) == ("Backend", 1, 1)
+    assert (backend.prsOpen, backend.prsClosed, backend.prsDependabot, backend.issues) == (1, 1, 1, 1)
+    assert backend.actions_by_day == {"2024-05-10": 3}
+    assert (frontend.members_count, frontend.repositories, frontend.collaborators) == (2, 2, 2)
+    assert (frontend.prsOpen, frontend.prsClosed, frontend.prsDependabot) == (2, 1, 1)
+    assert frontend.percentages_languages == ["Python: 75.00%", "TypeScript: 25.00%"]
+    assert frontend.actions_per_day == 5
+
+def test_repository_aggregates_are_shared_between_teams(monkeypatch):
+    service, calls = make_service(monkeypatch)
+
+    asyncio.run(service.get_team_statistics_async("backend"))
+    asyncio.run(service.get_team_statistics_async("frontend"))
+    asyncio.run(service.get_team_statistics_async("frontend"))
+
+    paths = [call.url.path for call in calls]
+    # El snapshot de api se consulta una sola vez aunque lo usen los dos equipos
+    assert paths.count("/repos/org1/api/languages") == 1
+    assert paths.count("/repos/org1/web/languages") == 1
+    assert paths.count("/orgs/org1/teams/frontend/repos") == 1
+    assert paths.count("/orgs/org1/teams") == 1
+
+def test_unknown_team_returns_404():
+    metadata_store.save_teams([Team(id=1, name="Backend", slug="backend", members_count=1, members=[Member(id=10, login="ana")])])
+
+    response = client.get("/orgs/teams/otro/statistics")
+
+    assert response.status_code == 404
+
+def test_repository_permission_webhook_drops_the_team_repositories():
+    metadata_store.save_team_repositories("backend", [make_repository("api")])
+    payload = json.loads((Path(__file__).parent / "fixtures" / "webhooks" / "team_created.json").read_text())
+    payload.update(action="added_to_repository", team={"id": 1, "name": "Backend", "slug": "backend"})
+
+    webhook_service.apply("team", payload)
+
+    assert metadata_store.get_team_repositories("backend") is None
+
+def test_team_named_members_reaches_its_statistics():
+    get_statistics = AsyncMock(side_effect=HTTPException(status_code=404, detail="El equipo 'members' no existe"))
+
+    with patch("app.routers.teams_router.teams_service.get_team_statistics_async", new=get_statistics):
+        response = client.get("/orgs/teams/members/statistics")
+
+    # El slug "members" no se confunde con la busqueda de equipos de un usuario
+    assert response.json()["detail"] == "El equipo 'members' no existe"
+    get_statistics.assert_awaited_once_with("members", 1)
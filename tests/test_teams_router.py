@@ -10,7 +10,7 @@ client = TestClient(app)
 class TestTeamsRouter(unittest.TestCase):
 
 
-    @patch('app.services.teams_service.teams_service.get_teams')
+    @patch('app.services.teams_service.teams_service.get_teams_async')
     def test_get_teams_http_exception(self, mock_get_teams):
         # Configurar el mock para que lance una HTTPException
         mock_get_teams.side_effect = HTTPException(status_code=404, detail="Teams not found")
@@ -22,7 +22,7 @@ class TestTeamsRouter(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.json(), {"detail": "Teams not found"})
 
-    @patch('app.services.teams_service.teams_service.get_teams')
+    @patch('app.services.teams_service.teams_service.get_teams_async')
     def test_get_teams_general_exception(self, mock_get_teams):
         # Configurar el mock para que lance una excepción general
         mock_get_teams.side_effect = Exception("Unexpected error")
@@ -30,6 +30,7 @@ def test_get_teams_success(teams_service):
             team_mock = mock.Mock()
             team_mock.id = team_id
             team_mock.name = team_name
+            team_mock.slug = team_name
             team_mock.get_members.return_value = members
             fake_teams.append(team_mock)
 
@@ -0,0 +1,105 @@
+import asyncio
+import time
+import httpx
+from unittest.mock import patch
+from app.services.github_async import AsyncGithubClient
+from app.services.rate_limiter import rate_limiter
+from app.services.token_pool import TokenPool
+
+
+def set_remaining(token, remaining):
+    rate_limiter.update(rate_limiter.key(token), 200, {
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + 600)),
+    })
+
+
+def test_choose_token_with_most_budget():
+    pool = TokenPool(["token-a", "token-b", "token-c"])
+    set_remaining("token-a", 100)
+    set_remaining("token-b", 4000)
+    set_remaining("token-c", 2000)
+
+    assert pool.authorization("Bearer token-a", "/repos/owner1/repo1") == "Bearer token-b"
+
+def test_blocked_tokens_are_chosen_last():
+    pool = TokenPool(["token-a", "token-b"])
+    set_remaining("token-b", 4000)
+    rate_limiter.update(rate_limiter.key("token-b"), 403, {"Retry-After": "60"})
+    set_remaining("token-a", 10)
+
+    assert pool.choose() == "token-a"
+
+def test_unhealthy_tokens_are_skipped():
+    pool = TokenPool(["token-a", "token-b"])
+    pool.report("token token-a", 401)
+
+    assert all(pool.choose() == "token-b" for _ in range(4))
+    assert pool.stats()[rate_limiter.key("token-a")]["healthy"] is False
+
+    pool.report("token token-a", 200)
+    assert pool.stats()[rate_limiter.key("token-a")]["healthy"] is True
+
+def test_foreign_and_user_scoped_requests_keep_their_token():
+    pool = TokenPool(["token-a", "token-b"])
+
+    assert pool.authorization("Bearer user-token", "/repos/owner1/repo1") == "Bearer user-token"
+    assert pool.authorization("Bearer token-a", "/user/repos?per_page=100") == "Bearer token-a"
+    assert pool.authorization("Bearer token-a", "/api/v3/user") == "Bearer token-a"
+    assert pool.authorization(None, "/repos/owner1/repo1") is None
+
+def test_single_token_is_not_rewritten():
+    pool = TokenPool(["token-a"])
+
+    assert pool.authorization("Bearer token-a", "/repos/owner1/repo1") == "Bearer token-a"
+
+def test_async_client_retries_with_another_token_after_401():
+    pool = TokenPool(["token-a", "token-b"])
+    set_remaining("token-a", 4000)
+    set_remaining("token-b", 10)
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["Authorization"])
+        if request.headers["Authorization"] == "Bearer token-a":
+            return httpx.Response(401, json={"message": "Bad credentials"})
+        return httpx.Response(200, json={"name": "repo1"})
+
+    client = AsyncGithubClient("token-a", transport=httpx.MockTransport(handler))
+    with patch("app.services.github_async.token_pool", pool):
+        result = asyncio.run(client.get_json("/repos/owner1/repo1"))
+
+    assert result == {"name": "repo1"}
+    assert seen == ["Bearer token-a", "Bearer token-b"]
+    assert pool.choose() == "token-b"
+
+def test_cached_responses_are_keyed_by_the_token_sent():
+    pool = TokenPool(["token-a", "token-b"])
+    set_remaining("token-a", 4000)
+    set_remaining("token-b", 10)
+    seen = []
+
+    def handler(request):
+        token = request.headers["Authorization"].split(" ")[-1]
+        seen.append((token, request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == f'"{token}"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"token": token}, headers={"ETag": f'"{token}"'})
+
+    async def run():
+        client = AsyncGithubClient("token-a", transport=httpx.MockTransport(handler))
+        first = await client.get_json("/repos/owner1/cached-repo")
+        set_remaining("token-a", 10)
+        set_remaining("token-b", 4000)
+        second = await client.get_json("/repos/owner1/cached-repo")
+        set_remaining("token-a", 4000)
+        set_remaining("token-b", 10)
+        third = await client.get_json("/repos/owner1/cached-repo")
+        return first, second, third
+
+    with patch("app.services.github_async.token_pool", pool):
+        results = asyncio.run(run())
+
+    # El ETag guardado con token-a no se envia con token-b, y el 304 devuelve el cuerpo de token-a
+    assert seen == [("token-a", None), ("token-b", None), ("token-a", '"token-a"')]
+    assert [result["token"] for result in results] == ["token-a", "token-b", "token-a"]
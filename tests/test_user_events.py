@@ -0,0 +1,90 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from github import Auth, Github
+from app.services.user_service import UserService
+
+# Eventos de cada repositorio, del mas nuevo al mas viejo, como los devuelve GitHub
+EVENTS = {
+    "repo1": [(19, "2024-05-10T12:00:00Z"), (17, "2024-05-10T10:00:00Z"), (15, "2024-05-09T10:00:00Z"), (13, "2024-05-08T10:00:00Z"), (11, "2024-05-07T10:00:00Z")],
+    "repo2": [(18, "2024-05-10T11:00:00Z"), (16, "2024-05-10T10:00:00Z"), (14, "2024-05-08T12:00:00Z"), (12, "2024-05-07T12:00:00Z"), (10, "2024-05-01T10:00:00Z")],
+}
+
+
+class EventsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        EventsHandler.requests.append(self.path)
+        if url.path == "/user":
+            body = {"login": "user1", "disk_usage": 5000, "url": "/user"}
+        elif url.path == "/user/repos":
+            body = [{"name": name, "full_name": f"owner1/{name}", "url": f"/repos/owner1/{name}"} for name in EVENTS]
+        else:
+            name = url.path.split("/")[3]
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            body = [
+                {"id": str(event_id), "type": "PushEvent", "repo": {"name": f"owner1/{name}"},
+                 "created_at": created_at, "public": True, "org": None}
+                for event_id, created_at in EVENTS[name][(page - 1) * per_page:page * per_page]
+            ]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def github_user():
+    EventsHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EventsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    github = Github(auth=Auth.Token("user-token"), base_url=f"http://127.0.0.1:{server.server_address[1]}", per_page=2, retry=None, seconds_between_requests=None)
+    yield github.get_user()
+    server.shutdown()
+    server.server_close()
+
+
+def event_pages(name):
+    return [path for path in EventsHandler.requests if path.startswith(f"/repos/owner1/{name}/events")]
+
+
+def test_events_are_merged_newest_first(github_user):
+    events = UserService().get_user_events(github_user)
+
+    assert [event.id for event in events] == [str(event_id) for event_id in range(19, 9, -1)]
+    assert all(event.disk == 5000 for event in events)
+    assert EventsHandler.requests.count("/user") == 1
+    # La tercera pagina trae un solo evento: es la ultima y no se pide una cuarta vacia
+    assert len(event_pages("repo1")) == 3
+
+def test_stops_fetching_when_the_page_is_full(github_user):
+    events = UserService().get_user_events(github_user, limit=3)
+
+    assert [event.id for event in events] == ["19", "18", "17"]
+    # Con 2 eventos por pagina basta la primera pagina de cada repositorio
+    assert len(event_pages("repo1")) == 1
+    assert len(event_pages("repo2")) == 1
+
+    events = UserService().get_user_events(github_user, limit=5)
+
+    assert [event.id for event in events] == ["19", "18", "17", "16", "15"]
+    assert len(event_pages("repo1")) == 3
+    assert len(event_pages("repo2")) == 3
+
+def test_before_cursor_continues_after_the_last_event(github_user):
+    events = UserService().get_user_events(github_user, limit=3, before=("2024-05-10 10:00:00", 17))
+
+    assert [event.id for event in events] == ["16", "15", "14"]
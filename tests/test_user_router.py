@@ -51,13 +51,21 @@ def override_get_current_user():
 
 app.dependency_overrides[get_current_user] = override_get_current_user
 
-@patch("app.services.user_service.user_service.get_statistics_of_users")
+@patch("app.services.user_service.user_service.get_statistics_of_users_async")
 def test_get_statistics_of_users(mock_get_statistics_of_users, client):
     mock_get_statistics_of_users.return_value = fake_users_stats
     response = client.get("/users/statistics/")
     assert response.status_code == 200
     assert response.json() == fake_users_stats.model_dump()
 
+@patch("app.services.user_service.user_service.get_statistics_of_users_async")
+def test_get_statistics_of_users_week(mock_get_statistics_of_users, client):
+    mock_get_statistics_of_users.return_value = fake_users_stats
+    response = client.get("/users/statistics/?days=7")
+    assert response.status_code == 200
+    mock_get_statistics_of_users.assert_called_once_with(7)
+    assert "X-Snapshot-Age" not in response.headers
+
 @patch("app.services.user_service.user_service.get_user_events")
 def test_get_user_events(mock_get_user_events, client):
     mock_get_user_events.return_value = fake_events
@@ -65,6 +73,25 @@ def test_get_user_events(mock_get_user_events, client):
     assert response.status_code == 200
     assert response.json() == [event.model_dump() for event in fake_events]
 
+@patch("app.services.user_service.user_service.get_user_events")
+def test_get_user_events_next_cursor(mock_get_user_events, client):
+    events = [Event(id=str(number), type="PushEvent", repo="repo1", date=f"2023-07-2{number} 10:00:00", public=True, org=None, disk=100)
+              for number in (3, 2, 1)]
+    mock_get_user_events.return_value = events
+    response = client.get("/users/activity?limit=2")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == ["3", "2"]
+    assert mock_get_user_events.call_args.args[1:] == (3, None)
+
+    mock_get_user_events.return_value = events[2:]
+    response = client.get(f"/users/activity?limit=2&before={response.headers['X-Next-Cursor']}")
+    assert mock_get_user_events.call_args.args[1:] == (3, ("2023-07-22 10:00:00", 2))
+    assert "X-Next-Cursor" not in response.headers
+
+def test_get_user_events_invalid_cursor(client):
+    response = client.get("/users/activity?before=no-es-un-cursor")
+    assert response.status_code == 400
+
 @patch("app.services.user_service.user_service.get_perfil_info")
 def test_perfil_info(mock_get_perfil_info, client):
     mock_get_perfil_info.return_value = fake_profile_info
@@ -73,14 +100,14 @@ def test_perfil_info(mock_get_perfil_info, client):
     assert response.json() == fake_profile_info
 
 # Pruebas de excepciones
-@patch("app.services.user_service.user_service.get_statistics_of_users")
+@patch("app.services.user_service.user_service.get_statistics_of_users_async")
 def test_get_statistics_of_users_exception(mock_get_statistics_of_users, client):
     mock_get_statistics_of_users.side_effect = HTTPException(status_code=400, detail="Test HTTPException")
     response = client.get("/users/statistics/")
     assert response.status_code == 400
     assert response.json() == {"detail": "Test HTTPException"}
 
-@patch("app.services.user_service.user_service.get_statistics_of_users")
+@patch("app.services.user_service.user_service.get_statistics_of_users_async")
 def test_get_statistics_of_users_general_exception(mock_get_statistics_of_users, client):
     mock_get_statistics_of_users.side_effect = Exception("Test General Exception")
     response = client.get("/users/statistics/")
@@ -116,16 +116,18 @@ def test_get_user_events_success(user_service, mock_github_user):
     repo_mock.name = 'test_repo'
 
     event_mock_1 = MagicMock()
+    event_mock_1.id = '2'
     event_mock_1.type = 'PushEvent'
     event_mock_1.repo.name = 'test_repo'
-    event_mock_1.created_at = datetime.now()
+    event_mock_1.created_at = datetime(2024, 5, 10, 12, 0)
     event_mock_1.public = True
     event_mock_1.org.login = 'test_org'
 
     event_mock_2 = MagicMock()
+    event_mock_2.id = '1'
     event_mock_2.type = 'PullRequestEvent'
     event_mock_2.repo.name = 'test_repo'
-    event_mock_2.created_at = datetime.now()
+    event_mock_2.created_at = datetime(2024, 5, 10, 11, 0)
     event_mock_2.public = False
     event_mock_2.org = None
 
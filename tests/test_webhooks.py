@@ -0,0 +1,151 @@
+import hashlib
+import hmac
+import pytest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.repository_model import RepositorySnapshot
+from app.models.teams_model import Member, Team
+from app.services.metadata_store import metadata_store
+from app.services.snapshot_refresher import snapshot_refresher
+from app.services.webhook_service import webhook_service
+
+client = TestClient(app)
+
+SECRET = "webhook-secret"
+# Entregas reales de GitHub recortadas a los campos que se usan
+FIXTURES = Path(__file__).parent / "fixtures" / "webhooks"
+
+
+def make_snapshot(name, **counts):
+    return RepositorySnapshot(
+        name=name,
+        owner="owner1",
+        createDate=datetime(2023, 1, 1),
+        lastUseDate=None,
+        state="No hay commits",
+        prsOpen=counts.get("prsOpen", 2),
+        prsClosed=counts.get("prsClosed", 5),
+        prsDependabot=counts.get("prsDependabot", 1),
+        issues=counts.get("issues", 4),
+        collaborators=["collab1"],
+        languages={"Python": 100},
+    )
+
+
+def replay(event, fixture, delivery=None, secret=SECRET):
+    body = (FIXTURES / f"{fixture}.json").read_bytes()
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    headers = {"X-GitHub-Event": event, "X-Hub-Signature-256": signature, "Content-Type": "application/json"}
+    if delivery:
+        headers["X-GitHub-Delivery"] = delivery
+    return client.post("/webhooks/github", content=body, headers=headers)
+
+
+@pytest.fixture(autouse=True)
+def seeded_store():
+    metadata_store.save_repository_snapshots([make_snapshot("repo1"), make_snapshot("repo2")])
+    metadata_store.save_teams([Team(id=9000001, name="backend", members_count=1, members=[Member(id=2000001, login="collab1")])])
+    webhook_service.deliveries.clear()
+    with patch.object(webhook_service, "secret", SECRET):
+        yield
+
+
+def test_rejects_invalid_signature():
+    response = replay("pull_request", "pull_request_opened", secret="otro-secreto")
+
+    assert response.status_code == 401
+    assert metadata_store.get_repository_snapshot("owner1/repo1").prsOpen == 2
+
+def test_requires_configured_secret():
+    with patch.object(webhook_service, "secret", None):
+        response = replay("pull_request", "pull_request_opened")
+
+    assert response.status_code == 503
+
+def test_pull_request_opened_by_dependabot():
+    response = replay("pull_request", "pull_request_opened")
+
+    assert response.status_code == 200
+    assert response.json()["repositories"] is True
+    snapshot = metadata_store.get_repository_snapshot("owner1/repo1")
+    assert (snapshot.prsOpen, snapshot.prsClosed, snapshot.prsDependabot, snapshot.issues) == (3, 5, 2, 5)
+
+def test_pull_request_closed():
+    replay("pull_request", "pull_request_closed")
+
+    snapshot = metadata_store.get_repository_snapshot("owner1/repo1")
+    assert (snapshot.prsOpen, snapshot.prsClosed, snapshot.prsDependabot, snapshot.issues) == (1, 6, 1, 3)
+
+def test_issue_opened():
+    replay("issues", "issues_opened")
+
+    assert metadata_store.get_repository_snapshot("owner1/repo2").issues == 5
+
+def test_push_updates_last_use_date():
+    replay("push", "push")
+
+    snapshot = metadata_store.get_repository_snapshot("owner1/repo2")
+    assert snapshot.lastUseDate.isoformat() == "2024-05-02T11:30:00-05:00"
+    assert snapshot.state != "No hay commits"
+
+def test_repository_deleted():
+    replay("repository", "repository_deleted")
+
+    assert metadata_store.get_repository_snapshot("owner1/repo2") is None
+    assert metadata_store.get_repository_snapshot("owner1/repo1") is not None
+
+def test_membership_added():
+    response = replay("membership", "membership_added")
+
+    assert response.json()["teams"] is True
+    team = metadata_store.get_teams()[0]
+    assert team.members_count == 2
+    assert [member.login for member in team.members] == ["collab1", "collab3"]
+
+def test_team_created():
+    replay("team", "team_created")
+
+    assert [team.name for team in metadata_store.get_teams()] == ["backend", "frontend"]
+
+def test_duplicate_delivery_is_applied_once():
+    replay("issues", "issues_opened", delivery="d-1")
+    response = replay("issues", "issues_opened", delivery="d-1")
+
+    assert response.json()["duplicate"] is True
+    assert metadata_store.get_repository_snapshot("owner1/repo2").issues == 5
+
+def test_failed_delivery_can_be_redelivered():
+    with patch.object(webhook_service, "apply_issues", side_effect=Exception("sin almacen")):
+        assert replay("issues", "issues_opened", delivery="d-2").status_code == 500
+    response = replay("issues", "issues_opened", delivery="d-2")
+
+    assert response.json()["duplicate"] is False
+    assert metadata_store.get_repository_snapshot("owner1/repo2").issues == 5
+
+def test_invalid_json_is_not_recorded_as_delivered():
+    body = b"{no es json"
+    signature = "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    headers = {"X-GitHub-Event": "issues", "X-Hub-Signature-256": signature, "X-GitHub-Delivery": "d-3"}
+
+    assert client.post("/webhooks/github", content=body, headers=headers).status_code == 400
+    assert "d-3" not in webhook_service.deliveries
+
+def test_event_invalidates_snapshot():
+    snapshot_refresher.snapshots["repositories_statistics"] = object()
+    snapshot_refresher.snapshots["teams"] = object()
+
+    replay("pull_request", "pull_request_closed")
+
+    assert "repositories_statistics" not in snapshot_refresher.snapshots
+    assert "teams" in snapshot_refresher.snapshots
+
+def test_unknown_repository_is_ignored():
+    metadata_store.delete_repository("owner1/repo1")
+
+    response = replay("pull_request", "pull_request_opened")
+
+    assert response.status_code == 200
+    assert response.json()["repositories"] is False